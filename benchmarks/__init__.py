@@ -0,0 +1 @@
+"""Benchmarks for the formatter, the linter and whole runs."""
@@ -0,0 +1,143 @@
+"""Run the benchmarks and compare them with a baseline.
+
+uv run python -m benchmarks --compare benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import click
+from click import echo, style
+
+from benchmarks.suite import BENCHMARKS, PROFILES, compare, load, run, save
+
+_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.option(
+    "--profile",
+    "profiles",
+    type=click.Choice(PROFILES),
+    multiple=True,
+    help="Profiles to measure. [default: all of them]",
+)
+@click.option(
+    "--sections",
+    type=click.IntRange(min=1),
+    default=50,
+    show_default=True,
+    help="Sections per template, about 15 lines each.",
+)
+@click.option(
+    "--files",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Templates checked by the end-to-end run.",
+)
+@click.option(
+    "--repeat",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    help="Runs per benchmark; the fastest counts.",
+)
+@click.option(
+    "--compare",
+    "baseline",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    help="Results to compare with, such as benchmarks/baseline.json.",
+)
+@click.option(
+    "--tolerance",
+    type=click.FloatRange(min=0, max=1),
+    default=0.1,
+    show_default=True,
+    help="Slowdown allowed before a benchmark counts as a regression.",
+)
+@click.option(
+    "--save",
+    "output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    help=f"Write the results to a file, such as {_BASELINE.name}.",
+)
+def main(
+    profiles: tuple[str, ...],
+    sections: int,
+    files: int,
+    repeat: int,
+    baseline: Path | None,
+    tolerance: float,
+    output: Path | None,
+) -> None:
+    """Measure formatter, linter and end-to-end throughput per profile."""
+    results = run(
+        profiles or PROFILES,
+        sections,
+        files,
+        repeat,
+        lambda profile: echo(f"Measuring {profile}...", err=True),
+    )
+    if output is not None:
+        save(output, results)
+
+    if baseline is None:
+        echo(f"\n{'profile':<12}" + "".join(f"{x:>14}" for x in BENCHMARKS))
+        for profile, benchmarks in results["results"].items():
+            echo(
+                f"{profile:<12}"
+                + "".join(
+                    f"{benchmarks[x] / 1024:>9.1f} KiB/s" for x in BENCHMARKS
+                )
+            )
+        return
+
+    previous = load(baseline)
+    meta = previous.get("meta", {})
+    differs = [
+        name
+        for name in ("sections", "files", "python", "platform")
+        if meta.get(name) != results["meta"][name]
+    ]
+    if differs:
+        echo(
+            style(
+                "\nThe baseline was measured with a different"
+                f" {', '.join(differs)}, so the numbers may not be"
+                " comparable.",
+                fg="yellow",
+            )
+        )
+
+    regressions = 0
+    echo(f"\n{'profile':<12}{'benchmark':<12}{'baseline':>14}{'current':>14}")
+    for change in compare(previous, results):
+        regressed = change.regressed(tolerance)
+        regressions += regressed
+        echo(
+            f"{change.profile:<12}{change.benchmark:<12}"
+            f"{change.baseline / 1024:>9.1f} KiB/s"
+            f"{change.current / 1024:>9.1f} KiB/s  "
+            + style(
+                f"{change.ratio - 1:+.1%}",
+                fg="red" if regressed else "green",
+                bold=regressed,
+            )
+        )
+    if regressions:
+        echo(
+            style(
+                f"\n{regressions} benchmarks more than {tolerance:.0%} slower"
+                " than the baseline.",
+                fg="red",
+                bold=True,
+            )
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""Synthetic templates for the benchmarks.
+
+A template is built from sections like the ones real projects are made of:
+nested containers with many attributes, conditionals and loops, links and
+form fields with template variables in their attributes, inline scripts and
+styles, translation blocks and regions turned off with djlint:off. Each
+profile writes them in its own syntax. Line breaks and indentation are
+scrambled, so the formatter has the same work to do as on a messy template.
+
+The same seed always builds the same template, so runs can be compared.
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+from typing import TYPE_CHECKING
+
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
+if TYPE_CHECKING:
+    from typing import Final
+
+
+class Dialect(NamedTuple):
+    """How a template language writes each construct."""
+
+    # the {name} placeholders are filled in per use
+    variable: str
+    if_open: str
+    if_close: str
+    loop_open: str
+    loop_close: str
+    trans_open: str
+    trans_close: str
+    off: str
+    on: str
+
+
+_DJANGO: Final = Dialect(
+    variable="{{ {name}|default:'' }}",
+    if_open="{% if {name} %}",
+    if_close="{% endif %}",
+    loop_open="{% for item in {name} %}",
+    loop_close="{% endfor %}",
+    trans_open="{% blocktrans trimmed %}",
+    trans_close="{% endblocktrans %}",
+    off="{# djlint:off #}",
+    on="{# djlint:on #}",
+)
+_JINJA: Final = Dialect(
+    variable="{{ {name} | default('') }}",
+    if_open="{% if {name} %}",
+    if_close="{% endif %}",
+    loop_open="{% for item in {name} %}",
+    loop_close="{% endfor %}",
+    trans_open="{% trans %}",
+    trans_close="{% endtrans %}",
+    off="{# djlint:off #}",
+    on="{# djlint:on #}",
+)
+_LIQUID: Final = Dialect(
+    variable="{{ {name} | escape }}",
+    if_open="{% if {name} %}",
+    if_close="{% endif %}",
+    loop_open="{% for item in {name} %}",
+    loop_close="{% endfor %}",
+    trans_open="{% capture label %}",
+    trans_close="{% endcapture %}",
+    off="{% comment %} djlint:off {% endcomment %}",
+    on="{% comment %} djlint:on {% endcomment %}",
+)
+_HANDLEBARS: Final = Dialect(
+    variable="{{{name}}}",
+    if_open="{{#if {name}}}",
+    if_close="{{/if}}",
+    loop_open="{{#each {name}}}",
+    loop_close="{{/each}}",
+    trans_open='{{#t "{name}"}}',
+    trans_close="{{/t}}",
+    off="{{!-- djlint:off --}}",
+    on="{{!-- djlint:on --}}",
+)
+_GOLANG: Final = Dialect(
+    variable="{{ .{name} }}",
+    if_open="{{ if .{name} }}",
+    if_close="{{ end }}",
+    loop_open="{{ range .{name} }}",
+    loop_close="{{ end }}",
+    trans_open='{{ with i18n "{name}" }}',
+    trans_close="{{ end }}",
+    off="{{/* djlint:off */}}",
+    on="{{/* djlint:on */}}",
+)
+_ANGULAR: Final = Dialect(
+    variable="{{ {name} }}",
+    if_open='<ng-container *ngIf="{name}">',
+    if_close="</ng-container>",
+    loop_open='<ng-container *ngFor="let item of {name}">',
+    loop_close="</ng-container>",
+    trans_open='<span i18n="@@{name}">',
+    trans_close="</span>",
+    off="<!-- djlint:off -->",
+    on="<!-- djlint:on -->",
+)
+_HTML: Final = Dialect(
+    variable="{name}",
+    if_open="<section>",
+    if_close="</section>",
+    loop_open="<ul>",
+    loop_close="</ul>",
+    trans_open='<span lang="fr">',
+    trans_close="</span>",
+    off="<!-- djlint:off -->",
+    on="<!-- djlint:on -->",
+)
+
+DIALECTS: Final = {
+    "all": _DJANGO,
+    "html": _HTML,
+    "django": _DJANGO,
+    "jinja": _JINJA,
+    "nunjucks": _JINJA,
+    "askama": _JINJA,
+    "tera": _JINJA,
+    "liquid": _LIQUID,
+    "handlebars": _HANDLEBARS,
+    "golang": _GOLANG,
+    "angular": _ANGULAR,
+}
+
+_WORDS: Final = (
+    "account",
+    "basket",
+    "comment",
+    "date",
+    "email",
+    "footer",
+    "gallery",
+    "header",
+    "invoice",
+    "label",
+    "message",
+    "notice",
+    "order",
+    "price",
+    "profile",
+    "search",
+    "title",
+    "user",
+)
+
+_SCRIPT: Final = """<script>
+const {name} = {items: [1, 2, 3], open: false, label: "{name}"};
+function toggle_{name}(event) { event.preventDefault(); {name}.open = !{name}.open;
+if ({name}.open) { document.querySelector("#{name}").classList.add("open") } }
+</script>"""
+
+_STYLE: Final = """<style>
+#{name} { display: flex; gap: 1rem } #{name} .item:hover { color: #333;
+background: url("/static/{name}.png") no-repeat }
+</style>"""
+
+# how often a tag is followed by a line break, or by stray spaces
+_LINE_BREAK: Final = 0.4
+_SPACES: Final = 0.1
+
+
+class _Builder:
+    """Writes one template's sections."""
+
+    __slots__ = ("attributes", "dialect", "nesting", "parts", "rng")
+
+    def __init__(
+        self,
+        dialect: Dialect,
+        rng: random.Random,
+        nesting: int,
+        attributes: int,
+    ) -> None:
+        self.dialect = dialect
+        self.rng = rng
+        self.nesting = nesting
+        self.attributes = attributes
+        self.parts: list[str] = []
+
+    def word(self) -> str:
+        return self.rng.choice(_WORDS)
+
+    def fill(self, template: str) -> str:
+        return template.replace("{name}", self.word())
+
+    def attrs(self) -> str:
+        names = ["class", "id", "data-target", "aria-label", "title", "role"]
+        values = [
+            f"{self.word()} {self.word()}-{self.rng.randint(1, 9)}",
+            f"{self.word()}-{self.rng.randint(1, 999)}",
+            f"#{self.word()}",
+            self.fill(self.dialect.variable),
+            self.word().title(),
+            "region",
+        ]
+        count = self.rng.randint(1, max(1, self.attributes))
+        return "".join(
+            f' {names[i % len(names)]}="{values[i % len(values)]}"'
+            for i in range(count)
+        )
+
+    def emit(self, text: str) -> None:
+        # messy whitespace: some tags share a line, others are over-indented
+        self.parts.append(text)
+        choice = self.rng.random()
+        if choice < _LINE_BREAK:
+            self.parts.append("\n" + " " * self.rng.randint(0, 12))
+        elif choice < _LINE_BREAK + _SPACES:
+            self.parts.append("   ")
+
+    def section(self, scripts: float, i18n: float, ignored: float) -> None:
+        dialect = self.dialect
+        depth = self.rng.randint(1, self.nesting)
+        for _ in range(depth):
+            self.emit(f"<div{self.attrs()}>")
+
+        self.emit(f"<h2{self.attrs()}>{self.fill(dialect.variable)}</h2>")
+        self.emit(self.fill(dialect.if_open))
+        self.emit(
+            f"<p{self.attrs()}>{self.word().title()} "
+            f"{self.fill(dialect.variable)} {self.word()}.</p>"
+        )
+        self.emit(dialect.if_close)
+
+        self.emit(f"<ul{self.attrs()}>")
+        self.emit(self.fill(dialect.loop_open))
+        self.emit(
+            f'<li><a href="/{self.word()}/{self.fill(dialect.variable)}"'
+            f"{self.attrs()}>{self.fill(dialect.variable)}</a></li>"
+        )
+        self.emit(dialect.loop_close)
+        self.emit("</ul>")
+
+        self.emit(
+            f'<form method="post" action="/{self.word()}/"><label for="'
+            f'{self.word()}">{self.word().title()}</label><input type="text"'
+            f'{self.attrs()} value="{self.fill(dialect.variable)}"><button'
+            ' type="submit">Send</button></form>'
+        )
+
+        if self.rng.random() < i18n:
+            self.emit(self.fill(dialect.trans_open))
+            self.emit(
+                f"{self.word().title()} {self.word()} "
+                f"{self.fill(dialect.variable)}"
+            )
+            self.emit(dialect.trans_close)
+
+        if self.rng.random() < scripts:
+            self.emit(self.fill(self.rng.choice((_SCRIPT, _STYLE))))
+
+        if self.rng.random() < ignored:
+            self.emit(dialect.off)
+            self.emit(
+                f"<div   class='{self.word()}'><span>"
+                f"{self.fill(dialect.variable)}</span>  </div>"
+            )
+            self.emit(dialect.on)
+
+        for _ in range(depth):
+            self.emit("</div>")
+
+
+def template(
+    profile: str,
+    sections: int,
+    *,
+    seed: int = 0,
+    nesting: int = 6,
+    attributes: int = 4,
+    scripts: float = 0.2,
+    i18n: float = 0.3,
+    ignored: float = 0.1,
+) -> str:
+    """Build a template for the profile.
+
+    Args:
+        profile: a djLint profile, which picks the template syntax.
+        sections: how many sections the template has, about 15 lines each
+            once formatted.
+        seed: the same seed builds the same template.
+        nesting: the deepest a section's containers nest.
+        attributes: the most attributes a tag has.
+        scripts: the share of sections with an inline script or style.
+        i18n: the share of sections with a translation block.
+        ignored: the share of sections with a djlint:off region.
+    """
+    builder = _Builder(
+        DIALECTS[profile], random.Random(seed), nesting, attributes
+    )
+    builder.emit("<!DOCTYPE html>")
+    builder.emit('<html lang="en"><head><meta charset="utf-8">')
+    builder.emit(f"<title>{builder.fill(builder.dialect.variable)}</title>")
+    builder.emit("</head><body>")
+    for _ in range(sections):
+        builder.section(scripts, i18n, ignored)
+    builder.emit("</body></html>")
+    return "".join(builder.parts).strip() + "\n"
@@ -0,0 +1,208 @@
+"""Measure the formatter, the linter and whole runs on the corpus.
+
+Each measurement is the best of several runs on templates built from
+different seeds, so caches keyed by a template's text do not make the later
+runs look faster than a real run would be. Results are kept as throughput,
+bytes of template per second, which stays comparable when the corpus size
+changes.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from benchmarks.corpus import DIALECTS, template
+
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+    from typing import Final
+
+    from typing_extensions import Any
+
+
+PROFILES: Final = tuple(sorted(DIALECTS))
+BENCHMARKS: Final = ("formatter", "linter", "main", "stdin")
+
+
+class Change(NamedTuple):
+    """A benchmark's throughput against the baseline."""
+
+    profile: str
+    benchmark: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+    def regressed(self, tolerance: float) -> bool:
+        return self.ratio < 1 - tolerance
+
+
+def _best(run: Callable[[int], object], repeat: int) -> float:
+    """Seconds taken by the fastest of repeat runs, each with its own seed."""
+    best = float("inf")
+    for seed in range(repeat):
+        start = time.perf_counter()
+        run(seed)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure(
+    profile: str, sections: int, files: int, repeat: int
+) -> dict[str, float]:
+    """Throughput, in bytes per second, of each benchmark for the profile."""
+    from djlint.lint import linter  # noqa: PLC0415
+    from djlint.reformat import formatter  # noqa: PLC0415
+    from djlint.settings import Config  # noqa: PLC0415
+
+    # one more, to warm up on
+    templates = [
+        template(profile, sections, seed=seed) for seed in range(repeat + 1)
+    ]
+    size = len(templates[0].encode())
+
+    with tempfile.TemporaryDirectory() as directory:
+        config = Config(
+            str(Path(directory) / "bench.html"),
+            profile=profile,
+            reformat=True,
+            format_css=True,
+            format_js=True,
+        )
+        # the config's patterns and rules are compiled once per run, so
+        # that is left out of the measurements
+        formatter(config, templates[-1])
+        linter(config, templates[-1], "bench.html", "bench.html")
+
+        results = {
+            "formatter": size
+            / _best(lambda seed: formatter(config, templates[seed]), repeat),
+            "linter": size
+            / _best(
+                lambda seed: linter(
+                    config, templates[seed], "bench.html", "bench.html"
+                ),
+                repeat,
+            ),
+        }
+
+        project = Path(directory) / "project"
+        project.mkdir()
+        total = 0
+        for seed in range(files):
+            source = template(profile, sections, seed=seed)
+            (project / f"page_{seed}.html").write_text(source, encoding="utf-8")
+            total += len(source.encode())
+
+        def run_main(_seed: int) -> None:
+            subprocess.run(  # noqa: S603
+                (
+                    sys.executable,
+                    "-m",
+                    "djlint",
+                    str(project),
+                    "--check",
+                    "--lint",
+                    "--profile",
+                    profile,
+                    "--no-cache",
+                    "--quiet",
+                ),
+                check=False,
+                capture_output=True,
+            )
+
+        results["main"] = total / _best(run_main, repeat)
+
+        # format on save: a new process per save, formatting a small
+        # template from stdin, so this is mostly start-up. The socket
+        # directory is moved so that a running daemon does not answer.
+        small = template(profile, 1).encode()
+        environment = {**os.environ, "XDG_RUNTIME_DIR": directory}
+
+        def run_stdin(_seed: int) -> None:
+            subprocess.run(  # noqa: S603
+                (
+                    sys.executable,
+                    "-m",
+                    "djlint",
+                    "-",
+                    "--reformat",
+                    "--profile",
+                    profile,
+                    "--no-cache",
+                ),
+                input=small,
+                env=environment,
+                check=False,
+                capture_output=True,
+            )
+
+        results["stdin"] = len(small) / _best(run_stdin, repeat)
+    return results
+
+
+def run(
+    profiles: Iterable[str],
+    sections: int,
+    files: int,
+    repeat: int,
+    progress: Callable[[str], None],
+) -> dict[str, Any]:
+    """Measure every benchmark for each profile."""
+    results = {}
+    for profile in profiles:
+        progress(profile)
+        results[profile] = measure(profile, sections, files, repeat)
+    return {
+        "meta": {
+            "djlint": metadata.version("djlint"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sections": sections,
+            "files": files,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(
+    baseline: Mapping[str, Any], current: Mapping[str, Any]
+) -> list[Change]:
+    """Pair up the benchmarks measured in both runs."""
+    return [
+        Change(profile, benchmark, baseline["results"][profile][benchmark], x)
+        for profile, benchmarks in current["results"].items()
+        for benchmark, x in benchmarks.items()
+        if benchmark in baseline["results"].get(profile, {})
+    ]
+
+
+def load(path: Path) -> dict[str, Any]:
+    with path.open(encoding="utf-8") as f:
+        results: dict[str, Any] = json.load(f)
+    return results
+
+
+def save(path: Path, results: Mapping[str, Any]) -> None:
+    with path.open("w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
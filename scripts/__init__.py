@@ -0,0 +1 @@
+"""Tools for working on djLint itself."""
@@ -0,0 +1,31 @@
+"""Generate rules.json, which djLint loads, from rules.yaml, which is edited.
+
+uv run python -m scripts.generate_rules
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import yaml
+
+if TYPE_CHECKING:
+    from typing import Final
+
+    from typing_extensions import Any
+
+RULES: Final = Path(__file__).parents[1] / "src" / "djlint" / "rules.yaml"
+RULES_JSON: Final = RULES.with_suffix(".json")
+
+
+def generate() -> str:
+    """Return rules.yaml as the contents of rules.json."""
+    with RULES.open("rb") as f:
+        rules: list[Any] = yaml.safe_load(f)
+    return json.dumps(rules, indent=2, ensure_ascii=False) + "\n"
+
+
+if __name__ == "__main__":
+    RULES_JSON.write_text(generate(), encoding="utf-8")
@@ -18,8 +18,13 @@ else:
     from os import cpu_count as process_cpu_count
 
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterator, Sequence
 
+    from typing_extensions import Any
+
+    from djlint.cache import ResultCache
+    from djlint.github_output import GithubReport
+    from djlint.output import ConsoleReport
     from djlint.settings import Config
     from djlint.types import ProcessResult
 
@@ -76,7 +81,8 @@ def _fail_with_usage_code(func: Callable[..., None]) -> Callable[..., None]:
         allow_dash=True,
     ),
     nargs=-1,
-    required=True,
+    # required unless --daemon is passed, checked in main()
+    required=False,
     metavar="SRC ...",
 )
 @click.version_option(package_name="djlint")
@@ -85,7 +91,7 @@ def _fail_with_usage_code(func: Callable[..., None]) -> Callable[..., None]:
     "--extension",
     type=str,
     default="",
-    help="File extension to check [default: html]",
+    help="File extensions to check, separated by commas. [default: html]",
     show_default=False,
 )
 @click.option(
@@ -193,6 +199,11 @@ def _fail_with_usage_code(func: Callable[..., None]) -> Callable[..., None]:
     ),
     help="Path to global configuration file in djlint.toml, .djlint.toml, or .djlintrc format",
 )
+@click.option(
+    "--nested-config",
+    is_flag=True,
+    help="Check each file with the configuration of the nearest directory that has one.",
+)
 @click.option(
     "--rules",
     type=click.Path(
@@ -301,6 +312,13 @@ def _fail_with_usage_code(func: Callable[..., None]) -> Callable[..., None]:
     multiple=True,
     help="Ignore linter rules on a per-file basis.",
 )
+@click.option(
+    "--per-file-profiles",
+    type=(str, str),
+    multiple=True,
+    metavar="<GLOB PROFILE>...",
+    help="Check the files a glob matches with another profile.",
+)
 @click.option(
     "--indent-css", type=int, help="Set CSS indent level.", show_default=False
 )
@@ -333,6 +351,46 @@ def _fail_with_usage_code(func: Callable[..., None]) -> Callable[..., None]:
     help="Consolidate blank lines down to x lines. [default: 0]",
     show_default=False,
 )
+@click.option(
+    "--file-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    metavar="SECONDS",
+    help="Skip a file that takes longer than this to check. Not enforced on"
+    " Windows or free-threaded Python.",
+)
+@click.option(
+    "--profile-stages",
+    type=click.Path(dir_okay=False, writable=True, path_type=Path),
+    metavar="FILE",
+    help="Write the time and memory each stage and rule took to a JSON file.",
+)
+@click.option(
+    "--no-cache", is_flag=True, help="Do not read or write the result cache."
+)
+@click.option(
+    "--cache-dir",
+    type=click.Path(
+        file_okay=False, dir_okay=True, resolve_path=True, path_type=Path
+    ),
+    envvar="DJLINT_CACHE_DIR",
+    help="Directory to store cached results in. [default: .djlint_cache]",
+)
+@click.option(
+    "--changed-since",
+    metavar="REF",
+    help="Only check files changed since this git ref, committed or not.",
+)
+@click.option("--staged", is_flag=True, help="Only check files staged in git.")
+@click.option(
+    "--stream",
+    is_flag=True,
+    help="Print each file's results as soon as it is checked.",
+)
+@click.option(
+    "--daemon",
+    is_flag=True,
+    help="Stay running and answer stdin runs from editors over a local socket.",
+)
 @click.option(
     "--github-output/--no-github-output",
     is_flag=True,
@@ -363,6 +421,7 @@ def main(
     format_css: bool,
     format_js: bool,
     configuration: Path | None,
+    nested_config: bool,
     rules: Path | None,
     statistics: bool,
     include: str,
@@ -384,6 +443,7 @@ def main(
     format_attribute_js_json_pattern: str,
     format_attribute_js_json_min_props: int | None,
     per_file_ignores: tuple[tuple[str, str], ...],
+    per_file_profiles: tuple[tuple[str, str], ...],
     indent_css: int | None,
     indent_js: int | None,
     close_void_tags: bool,
@@ -391,22 +451,59 @@ def main(
     no_function_formatting: bool,
     no_set_formatting: bool,
     max_blank_lines: int | None,
+    file_timeout: float | None,
+    profile_stages: Path | None,
+    no_cache: bool,
+    cache_dir: Path | None,
+    changed_since: str | None,
+    staged: bool,
+    stream: bool,
+    daemon: bool,
     github_output: bool | None = None,
 ) -> None:
     """djLint · HTML template linter and formatter."""
-    from djlint.settings import Config  # noqa: PLC0415
-    from djlint.src import (  # noqa: PLC0415
-        get_src,
-        has_pragma,
-        print_no_files_to_check,
-    )
+    from djlint.settings import Config, ConfigTree  # noqa: PLC0415
+    from djlint.src import get_src, print_no_files_to_check  # noqa: PLC0415
 
+    ctx = click.get_current_context()
     if os.getenv("NO_COLOR") is not None:
-        click.get_current_context().color = False
+        ctx.color = False
+
+    if daemon:
+        from djlint.daemon import serve, supported  # noqa: PLC0415
+
+        if not supported():
+            msg = "--daemon needs unix sockets, which this platform lacks."
+            raise click.UsageError(msg)
+        serve()
+        return
+
+    if not src:
+        raise click.MissingParameter(
+            ctx=ctx,
+            param=next(x for x in ctx.command.params if x.name == "src"),
+        )
 
     if github_output is None:
         github_output = bool(os.getenv("GITHUB_ACTIONS"))
 
+    stdin_text = None
+    # a profiled run measures this process, not the daemon
+    if src == ("-",) and not sys.stdin.isatty() and profile_stages is None:
+        from djlint.daemon import run_in_daemon  # noqa: PLC0415
+
+        # an editor's run is answered by a running daemon when there is one
+        stdin_text = _read_stdin()
+        response = run_in_daemon(
+            _config_options(ctx, github_output=github_output),
+            stdin_text,
+            color=sys.stdout.isatty() if ctx.color is None else ctx.color,
+        )
+        if response is not None:
+            echo(response["stdout"].encode("utf-8"), nl=False)
+            echo(response["stderr"].encode("utf-8"), nl=False, err=True)
+            sys.exit(response["exit_code"])
+
     config = Config(
         src[0],
         extension=extension,
@@ -428,6 +525,7 @@ def main(
         format_css=format_css,
         format_js=format_js,
         configuration=configuration,
+        nested_config=nested_config,
         rules=rules,
         statistics=statistics,
         include=include,
@@ -449,6 +547,7 @@ def main(
         format_attribute_js_json_pattern=format_attribute_js_json_pattern,
         format_attribute_js_json_min_props=format_attribute_js_json_min_props,
         per_file_ignores=per_file_ignores,
+        per_file_profiles=per_file_profiles,
         indent_css=indent_css,
         indent_js=indent_js,
         close_void_tags=close_void_tags,
@@ -456,120 +555,305 @@ def main(
         no_function_formatting=no_function_formatting,
         no_set_formatting=no_set_formatting,
         max_blank_lines=max_blank_lines,
+        file_timeout=file_timeout,
+        profile_stages=profile_stages,
         github_output=github_output,
         stdin="-" in src,
+        no_cache=no_cache,
+        cache_dir=cache_dir,
     )
 
+    tree = ConfigTree(config, _config_options(ctx, github_output=github_output))
     if "-" in src and not config.files:
-        stdin_stream = click.get_text_stream("stdin", encoding="utf-8")
-        stdin_text = stdin_stream.read()
+        if stdin_text is None:
+            stdin_text = _read_stdin()
+
+        if config.stdin_filename:
+            config = tree.config(Path(config.stdin_filename).resolve())
+        exit_code = run_stdin(config, stdin_text)
+        if exit_code:
+            sys.exit(exit_code)
+        return
+
+    changed = None
+    if changed_since is not None or staged:
+        from djlint.src import git_changed_files  # noqa: PLC0415
+
+        changed = git_changed_files(
+            config.project_root, since=changed_since, staged=staged
+        )
 
-        if config.require_pragma and not has_pragma(
-            config, stdin_text.split("\n", 1)[0]
-        ):
-            # the pragma is an opt-in, so input without one was skipped on
-            # purpose. Hand it back byte for byte: an editor piping a buffer
-            # through djLint writes whatever lands on stdout back to the file.
-            print_no_files_to_check(excluded=True)
-            if config.reformat or config.check:
-                echo(stdin_text.encode("utf-8"), nl=False)
+    file_src = config.files if "-" in src and config.files else src
+    file_list, excluded = get_src(
+        (Path(x) for x in file_src), config, changed, tree
+    )
+    if not file_list:
+        print_no_files_to_check(excluded=excluded)
+        # excluding every candidate is the configuration doing its job,
+        # so it is a success, as is having no changed files to check.
+        # Matching nothing at all means the run checked nothing it was
+        # asked to check, which is a usage error and stays loud unless it
+        # was opted into.
+        if excluded or changed is not None or config.allow_empty_input:
             return
+        sys.exit(2)
 
-        file_error, formatted_code = process_stdin(config, stdin_text)
-        file_errors = [file_error]
-        files_count = 1
+    if config.check:
+        message = "Checking"
+    elif config.reformat:
+        message = "Reformatting"
+    else:
+        message = ""
 
-        if config.reformat or config.check:
-            echo((formatted_code or "").rstrip().encode("utf-8"))
+    if config.lint:
+        if message:
+            message += " and "
+        message += "Linting"
+
+    if not config.quiet and not config.github_output:
+        echo()
+
+    files_count = len(file_list)
+
+    stage_report = None
+    if config.profile_stages is not None:
+        from djlint.profiling import StageReport  # noqa: PLC0415
 
+        stage_report = StageReport()
+
+    report = None
+    if stream:
+        # printed in the order a finished run sorts its results in
+        file_list.sort(key=str)
+        report = _reporter(config)
+
+    jobs = [(tree.index(this_file), this_file) for this_file in file_list]
+    caches: list[ResultCache | None] = [None] * len(tree.configs)
+    if config.cache_dir is not None:
+        from djlint.cache import open_cache  # noqa: PLC0415
+
+        caches = [open_cache(x) for x in tree.configs]
+
+    file_errors = []
+    progress_label = click.style(
+        f"{message} {files_count}/{files_count} files", fg="blue", bold=True
+    )
+    progress_template = (
+        click.style(f"{message} %(info)s files", fg="blue", bold=True)
+        + " "
+        + click.style("[%(bar)s]", fg="blue")
+    )
+    with click.progressbar(
+        length=files_count,
+        label=progress_label,
+        show_eta=False,
+        show_percent=False,
+        show_pos=True,
+        bar_template=progress_template,
+        file=click.get_text_stream("stderr"),
+        # streamed results are the progress, and would break up the bar
+        hidden=config.github_output or config.quiet or stream,
+    ) as bar:
+        for results in _process_files(
+            tree.configs, jobs, caches, ordered=report is not None
+        ):
+            if stage_report is not None:
+                for result in results:
+                    stage_report.add(result)
+            if report is None:
+                file_errors.extend(results)
+            else:
+                for result in results:
+                    report.add(result)
+            bar.update(len(results))
+
+    if any(caches) and config.cache_dir is not None:
+        from djlint.cache import prune_cache  # noqa: PLC0415
+
+        prune_cache(config.cache_dir)
+
+    if report is None:
+        exit_code = _report(config, file_errors, files_count)
     else:
-        file_src = config.files if "-" in src and config.files else src
-        file_list, excluded = get_src((Path(x) for x in file_src), config)
-        if not file_list:
-            print_no_files_to_check(excluded=excluded)
-            # excluding every candidate is the configuration doing its job,
-            # so it is a success. Matching nothing at all means the run
-            # checked nothing it was asked to check, which is a usage error
-            # and stays loud unless it was opted into.
-            if excluded or config.allow_empty_input:
-                return
-            sys.exit(2)
+        exit_code = _exit_code(config, report.finish(files_count))
+
+    if stage_report is not None and config.profile_stages is not None:
+        stage_report.write(config, config.profile_stages)
+    if exit_code:
+        sys.exit(exit_code)
+
 
-        if config.check:
-            message = "Checking"
-        elif config.reformat:
-            message = "Reformatting"
-        else:
-            message = ""
+def _process_files(
+    configs: Sequence[Config],
+    jobs: Sequence[tuple[int, Path]],
+    caches: Sequence[ResultCache | None],
+    *,
+    ordered: bool,
+) -> Iterator[list[ProcessResult]]:
+    """Run linter or formatter on each file, in workers when there are many.
+
+    Each job is a file and the number of its config and cache. Results come
+    back a chunk of files at a time, as each chunk finishes. When ordered,
+    for --stream, they come back in file order instead, with only a few
+    chunks per worker queued at once, so that finished results are not held
+    back for long behind a slow file. That window can leave workers idle
+    while they wait on it, so a run that sorts its results at the end
+    queues every chunk up front.
+    """
+    files_count = len(jobs)
+    max_workers = min(process_cpu_count() or 1, files_count)
+    in_threads = max_workers > 1 and _is_free_threaded_python()
+    if any(x.file_timeout for x in configs):
+        from djlint.deadline import warn_unenforced  # noqa: PLC0415
+
+        warn_unenforced(in_threads=in_threads)
+
+    if max_workers == 1:
+        for index, this_file in jobs:
+            yield [process(configs[index], this_file, caches[index])]
+        return
+
+    import concurrent.futures  # noqa: PLC0415
+    from collections import deque  # noqa: PLC0415
+
+    if in_threads:
+        executor_cls = concurrent.futures.ThreadPoolExecutor
+    else:
+        executor_cls = concurrent.futures.ProcessPoolExecutor
+        if sys.platform == "win32":
+            # Windows has a hard limit of 61 processes
+            max_workers = min(max_workers, 61)
+
+    from djlint.lint import compile_rules  # noqa: PLC0415
 
+    for config in configs:
         if config.lint:
-            if message:
-                message += " and "
-            message += "Linting"
+            # compiled here, the rules reach each worker ready to use
+            compile_rules(config)
+
+    # the configs go to each worker once, so jobs only carry paths and
+    # numbers, and chunks keep the job count from growing with the file
+    # count while still balancing the workers' load
+    chunk_size = max(1, min(_MAX_CHUNK_SIZE, files_count // (max_workers * 4)))
+    with executor_cls(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(configs, caches),
+    ) as exe:
+        if not ordered:
+            futures = [
+                exe.submit(_process_chunk, jobs[start : start + chunk_size])
+                for start in range(0, files_count, chunk_size)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+            return
 
-        if not config.quiet and not config.github_output:
-            echo()
+        pending: deque[concurrent.futures.Future[list[ProcessResult]]] = deque()
+        for start in range(0, files_count, chunk_size):
+            pending.append(
+                exe.submit(_process_chunk, jobs[start : start + chunk_size])
+            )
+            if len(pending) >= max_workers * _QUEUED_CHUNKS:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _config_options(
+    ctx: click.Context, *, github_output: bool
+) -> dict[str, Any]:
+    """The options main() builds its config from, by Config's names."""
+    options = {
+        name: value
+        for name, value in ctx.params.items()
+        if name not in {"src", "changed_since", "staged", "stream", "daemon"}
+    }
+    options["lint"] = options["lint"] or not (
+        options["reformat"] or options["check"]
+    )
+    options["github_output"] = github_output
+    return options
 
-        files_count = len(file_list)
-        max_workers = min(process_cpu_count() or 1, files_count)
 
-        file_errors = []
-        progress_label = click.style(
-            f"{message} {files_count}/{files_count} files", fg="blue", bold=True
-        )
-        progress_template = (
-            click.style(f"{message} %(info)s files", fg="blue", bold=True)
-            + " "
-            + click.style("[%(bar)s]", fg="blue")
-        )
-        with click.progressbar(
-            length=files_count,
-            label=progress_label,
-            show_eta=False,
-            show_percent=False,
-            show_pos=True,
-            bar_template=progress_template,
-            file=click.get_text_stream("stderr"),
-            hidden=config.github_output or config.quiet,
-        ) as bar:
-            if max_workers == 1:
-                for this_file in file_list:
-                    file_errors.append(process(config, this_file))
-                    bar.update(1)
-            else:
-                import concurrent.futures  # noqa: PLC0415
-
-                if _is_free_threaded_python():
-                    executor_cls = concurrent.futures.ThreadPoolExecutor
-                else:
-                    executor_cls = concurrent.futures.ProcessPoolExecutor
-                    if sys.platform == "win32":
-                        # Windows has a hard limit of 61 processes
-                        max_workers = min(max_workers, 61)
-
-                with executor_cls(max_workers=max_workers) as exe:
-                    futures = {
-                        exe.submit(process, config, this_file): this_file
-                        for this_file in file_list
-                    }
-                    for future in concurrent.futures.as_completed(futures):
-                        file_errors.append(future.result())
-                        bar.update(1)
+def _read_stdin() -> str:
+    stdin_stream = click.get_text_stream("stdin", encoding="utf-8")
+    stdin_text: str = stdin_stream.read()
+    return stdin_text
+
 
+def run_stdin(config: Config, stdin_text: str) -> int:
+    """Lint or reformat text read from stdin and print the results.
+
+    Returns the exit code of the run.
+    """
+    from djlint.src import has_pragma, print_no_files_to_check  # noqa: PLC0415
+
+    if config.require_pragma and not has_pragma(
+        config, stdin_text.split("\n", 1)[0]
+    ):
+        # the pragma is an opt-in, so input without one was skipped on
+        # purpose. Hand it back byte for byte: an editor piping a buffer
+        # through djLint writes whatever lands on stdout back to the file.
+        print_no_files_to_check(excluded=True)
+        if config.reformat or config.check:
+            echo(stdin_text.encode("utf-8"), nl=False)
+        return 0
+
+    if config.file_timeout:
+        from djlint.deadline import warn_unenforced  # noqa: PLC0415
+
+        warn_unenforced()
+
+    file_error, formatted_code = process_stdin(config, stdin_text)
+    if "skipped" in file_error and (config.reformat or config.check):
+        # as with a missing pragma, hand the input back untouched
+        echo(stdin_text.encode("utf-8"), nl=False)
+    elif config.reformat or config.check:
+        echo((formatted_code or "").rstrip().encode("utf-8"))
+
+    exit_code = _report(config, [file_error], 1)
+
+    if config.profile_stages is not None:
+        from djlint.profiling import StageReport  # noqa: PLC0415
+
+        stage_report = StageReport()
+        stage_report.add(file_error)
+        stage_report.write(config, config.profile_stages)
+
+    return exit_code
+
+
+def _report(
+    config: Config, file_errors: list[ProcessResult], files_count: int
+) -> int:
+    """Print the results of a run and return its exit code."""
     if config.github_output:
         from djlint.github_output import print_github_output  # noqa: PLC0415
 
-        if (
-            print_github_output(config, file_errors, files_count)
-            and not config.warn
-        ):
-            sys.exit(1)
-
+        found = print_github_output(config, file_errors, files_count)
     else:
         from djlint.output import print_output  # noqa: PLC0415
 
-        if print_output(config, file_errors, files_count) and not config.warn:
-            sys.exit(1)
+        found = print_output(config, file_errors, files_count)
+
+    return _exit_code(config, found)
+
+
+def _reporter(config: Config) -> ConsoleReport | GithubReport:
+    """Start printing results as they come in."""
+    if config.github_output:
+        from djlint.github_output import GithubReport  # noqa: PLC0415
+
+        return GithubReport(config)
+
+    from djlint.output import ConsoleReport  # noqa: PLC0415
+
+    return ConsoleReport(config)
+
+
+def _exit_code(config: Config, found: int) -> int:
+    return 1 if found and not config.warn else 0
 
 
 def _is_free_threaded_python() -> bool:
@@ -579,45 +863,126 @@ def _is_free_threaded_python() -> bool:
     return not bool(is_gil_enabled())
 
 
-def process(config: Config, this_file: Path) -> ProcessResult:
+_MAX_CHUNK_SIZE = 64
+# chunks queued per worker while --stream waits for the earliest one
+_QUEUED_CHUNKS = 4
+_worker_configs: Sequence[Config] = ()
+_worker_caches: Sequence[ResultCache | None] = ()
+
+
+def _init_worker(
+    configs: Sequence[Config], caches: Sequence[ResultCache | None]
+) -> None:
+    """Keep the run's configs in a worker for the jobs sent to it."""
+    global _worker_configs, _worker_caches  # noqa: PLW0603
+    _worker_configs = configs
+    _worker_caches = caches
+
+
+def _process_chunk(jobs: Sequence[tuple[int, Path]]) -> list[ProcessResult]:
+    """Run linter or formatter on a chunk of files in a worker."""
+    if not _worker_configs:
+        msg = "worker used before _init_worker() ran"
+        raise RuntimeError(msg)
+    return [
+        process(_worker_configs[index], this_file, _worker_caches[index])
+        for index, this_file in jobs
+    ]
+
+
+def process(
+    config: Config, this_file: Path, cache: ResultCache | None = None
+) -> ProcessResult:
     """Run linter or formatter."""
+    content = b""
+    if cache is not None:
+        content = this_file.read_bytes()
+        cached = cache.get(this_file, content)
+        if cached is not None and not _writes_changes(config, cached):
+            return cached
+
+    from djlint.deadline import FileTimeout, deadline  # noqa: PLC0415
+    from djlint.profiling import start_profile  # noqa: PLC0415
+
     output: ProcessResult = {}
-    if config.reformat or config.check:
-        from djlint.reformat import reformat_file  # noqa: PLC0415
+    profiler = start_profile(config)
+    try:
+        with deadline(config.file_timeout):
+            if config.reformat or config.check:
+                from djlint.reformat import reformat_file  # noqa: PLC0415
 
-        output["format_message"] = reformat_file(config, this_file)
+                output["format_message"] = reformat_file(config, this_file)
 
-    if config.lint:
-        from djlint.lint import lint_file  # noqa: PLC0415
+            if config.lint:
+                from djlint.lint import lint_file  # noqa: PLC0415
 
-        output["lint_message"] = lint_file(config, this_file)
+                output["lint_message"] = lint_file(config, this_file)
+    except FileTimeout:
+        # not cached, so the next run tries the file again
+        output = {"skipped": {str(this_file): "timeout"}}
+    finally:
+        if profiler is not None:
+            output["profile"] = {str(this_file): profiler.finish()}
+
+    # a reformatted file has new content, which this result does not describe
+    if (
+        cache is not None
+        and "skipped" not in output
+        and not _writes_changes(config, output)
+    ):
+        cache.put(this_file, content, output)
 
     return output
 
 
+def _writes_changes(config: Config, result: ProcessResult) -> bool:
+    """Whether running --reformat for this result rewrites the file."""
+    return (
+        config.reformat
+        and not config.check
+        and any(result.get("format_message", {}).values())
+    )
+
+
 def process_stdin(
     config: Config, stdin_text: str
 ) -> tuple[ProcessResult, str | None]:
     """Run linter or formatter on stdin."""
+    from djlint.deadline import FileTimeout, deadline  # noqa: PLC0415
+    from djlint.profiling import start_profile  # noqa: PLC0415
+
     output: ProcessResult = {}
     html = stdin_text
     formatted_code = None
     stdin_filename = config.stdin_filename or "-"
 
-    if config.reformat or config.check:
-        from djlint.reformat import reformat_string  # noqa: PLC0415
-
-        output["format_message"], formatted_code = reformat_string(
-            config, stdin_text, stdin_filename
-        )
-        html = formatted_code
-
-    if config.lint:
-        from djlint.lint import linter  # noqa: PLC0415
-
-        # as lint_file() does, match per_file_ignores against a posix path
-        output["lint_message"] = linter(
-            config, html, stdin_filename, Path(stdin_filename).as_posix()
-        )
+    profiler = start_profile(config)
+    try:
+        with deadline(config.file_timeout):
+            if config.reformat or config.check:
+                from djlint.reformat import reformat_string  # noqa: PLC0415
+
+                output["format_message"], formatted_code = reformat_string(
+                    config, stdin_text, stdin_filename
+                )
+                html = formatted_code
+
+            if config.lint:
+                from djlint.lint import linter  # noqa: PLC0415
+
+                # as lint_file() does, match per_file_ignores against a
+                # posix path
+                output["lint_message"] = linter(
+                    config,
+                    html,
+                    stdin_filename,
+                    Path(stdin_filename).as_posix(),
+                )
+    except FileTimeout:
+        output = {"skipped": {stdin_filename: "timeout"}}
+        formatted_code = None
+    finally:
+        if profiler is not None:
+            output["profile"] = {stdin_filename: profiler.finish()}
 
     return output, formatted_code
@@ -0,0 +1,290 @@
+"""Cache lint and reformat results between runs.
+
+A result is stored under a hash of the file's path and content, inside a
+directory named after a fingerprint of everything else that decides the
+result: the options, the linter rules, the source of python_module rules and
+the djLint version. Changing any of them starts a new namespace, and the old
+one ages out when the cache is pruned.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import time
+from functools import lru_cache
+from importlib import metadata, util
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Final
+
+    from typing_extensions import Any
+
+    from djlint.settings import Config
+    from djlint.types import ProcessResult
+
+
+# entries not read for this long are dropped when the cache is pruned
+_MAX_AGE: Final = 30 * 24 * 60 * 60
+# past this size the least recently used entries are dropped
+_MAX_SIZE: Final = 256 * 1024 * 1024
+# pruning stats every entry, so it runs at most this often
+_PRUNE_INTERVAL: Final = 24 * 60 * 60
+_PRUNE_MARKER: Final = ".pruned"
+
+# options that decide which files are checked or how results are printed,
+# but not what a file's result is
+_UNCACHED_OPTIONS: Final = frozenset({
+    "allow_empty_input",
+    "cache_dir",
+    "check",
+    # compiled from linter_rules
+    "compiled_rules",
+    "exclude",
+    "exclude_pattern",
+    # a file that runs out of time is not cached
+    "file_timeout",
+    "files",
+    # compiled from the other options
+    "formatter_patterns",
+    "github_output",
+    "linter_output_format",
+    # pick the config, which is fingerprinted itself
+    "nested_config",
+    "per_file_profiles",
+    # turns the cache off
+    "profile_stages",
+    "quiet",
+    "reformat",
+    "require_pragma",
+    "statistics",
+    "stdin",
+    "stdin_filename",
+    "use_gitignore",
+    "warn",
+})
+# patterns built from the other options and the djLint version, which are
+# fingerprinted already. Some join sets of tag names, in an order that
+# changes with the hash seed, and would give every process a fingerprint,
+# and a cache namespace, of its own.
+_DERIVED_OPTIONS: Final = frozenset({
+    "always_self_closing_html_tags",
+    "attribute_pattern",
+    "break_before",
+    "break_html_tags",
+    "break_template_tags",
+    "ignored_attributes",
+    "ignored_inline_blocks",
+    "indent_html_tags",
+    "optional_single_line_html_tags",
+    "optional_single_line_template_tags",
+    "start_template_tags",
+    "tag_indent",
+    "tag_unindent",
+    "tag_unindent_line",
+    "template_indent",
+    "template_tags",
+    "template_unindent",
+})
+
+
+def _encode(value: object) -> Any:
+    """Turn option values json cannot serialize into stable ones."""
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=str)
+    pattern = getattr(value, "pattern", None)
+    if pattern is not None:
+        return [pattern, getattr(value, "flags", 0)]
+    return str(value)
+
+
+def _module_source(name: str) -> bytes:
+    """Read the source of a python_module rule, so editing it busts the cache."""
+    try:
+        spec = util.find_spec(name)
+    except (ImportError, ValueError):
+        spec = None
+    if spec is not None and spec.origin is not None:
+        with contextlib.suppress(OSError):
+            return Path(spec.origin).read_bytes()
+    return name.encode()
+
+
+@lru_cache(maxsize=1)
+def _package_stamp() -> bytes:
+    """Sizes and modification times of djLint's own files.
+
+    A release changes the version, but a source checkout can change
+    without one, and its results must not be replayed.
+    """
+    stamp = hashlib.sha256()
+    package = Path(__file__).parent
+    for path in sorted(package.rglob("*")):
+        if path.suffix in {".json", ".py", ".pyd", ".so", ".yaml"}:
+            with contextlib.suppress(OSError):
+                stat = path.stat()
+                stamp.update(
+                    f"{path.relative_to(package)}:{stat.st_size}:"
+                    f"{stat.st_mtime_ns}\n".encode()
+                )
+    return stamp.digest()
+
+
+def config_fingerprint(config: Config) -> str:
+    """Hash everything besides the file itself that decides a result."""
+    options = {
+        name: getattr(config, name)
+        for name in config.__slots__
+        if name not in _UNCACHED_OPTIONS
+        and name not in _DERIVED_OPTIONS
+        and not name.startswith("_")
+    }
+    # --check and --reformat produce the same diff
+    options["format"] = config.reformat or config.check
+    # loaded lazily, and only a lint result depends on them
+    linter_rules = config.linter_rules if config.lint else ()
+    options["linter_rules"] = linter_rules
+
+    digest = hashlib.sha256(
+        json.dumps(options, sort_keys=True, default=_encode).encode()
+    )
+    digest.update(metadata.version("djlint").encode())
+    digest.update(_package_stamp())
+    for rule in linter_rules:
+        module = rule["rule"].get("python_module")
+        if module:
+            digest.update(_module_source(module))
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Results of earlier runs, keyed by file path and content."""
+
+    __slots__ = ("directory",)
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+
+    def _entry(self, this_file: Path, content: bytes) -> Path:
+        digest = hashlib.sha256(os.fsencode(this_file))
+        digest.update(b"\0")
+        digest.update(content)
+        return self.directory / f"{digest.hexdigest()}.json"
+
+    def get(self, this_file: Path, content: bytes) -> ProcessResult | None:
+        """Return the stored result for this file content, if any."""
+        entry = self._entry(this_file, content)
+        try:
+            with entry.open("rb") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(result, dict):
+            return None
+
+        # reading an entry keeps it from being pruned as unused
+        with contextlib.suppress(OSError):
+            os.utime(entry)
+
+        if "format_message" in result:
+            result["format_message"] = {
+                filename: tuple(diff)
+                for filename, diff in result["format_message"].items()
+            }
+        return result  # type: ignore[return-value]
+
+    def put(
+        self, this_file: Path, content: bytes, result: ProcessResult
+    ) -> None:
+        """Store the result for this file content.
+
+        Entries are written to a temporary file and renamed into place, so
+        parallel workers and runs never read a partial entry. A cache that
+        cannot be written to is skipped rather than failing the run.
+        """
+        entry = self._entry(this_file, content)
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            Path(tmp_name).replace(entry)
+        except OSError:
+            with contextlib.suppress(OSError):
+                Path(tmp_name).unlink()
+
+
+def open_cache(config: Config) -> ResultCache | None:
+    """Create the cache directory for this configuration."""
+    if config.cache_dir is None:
+        return None
+
+    root = config.cache_dir
+    directory = root / config_fingerprint(config)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        gitignore = root / ".gitignore"
+        if not gitignore.exists():
+            gitignore.write_text("# created by djLint\n*\n", encoding="utf-8")
+    except OSError:
+        return None
+    return ResultCache(directory)
+
+
+def prune_cache(
+    root: Path, *, max_age: float = _MAX_AGE, max_size: int = _MAX_SIZE
+) -> None:
+    """Drop entries unused for max_age seconds, then the oldest past max_size.
+
+    The whole cache is walked, so entries left behind by an older config or
+    djLint version are cleaned up as well.
+    """
+    now = time.time()
+    marker = root / _PRUNE_MARKER
+    try:
+        if now - marker.stat().st_mtime < _PRUNE_INTERVAL:
+            return
+    except FileNotFoundError:
+        pass
+    except OSError:
+        return
+
+    entries: list[tuple[float, int, Path]] = []
+    total_size = 0
+    try:
+        namespaces = [x for x in root.iterdir() if x.is_dir()]
+    except OSError:
+        return
+    for namespace in namespaces:
+        with contextlib.suppress(OSError):
+            for entry in namespace.iterdir():
+                stat = entry.stat()
+                if now - stat.st_mtime > max_age:
+                    entry.unlink(missing_ok=True)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+                total_size += stat.st_size
+
+    if total_size > max_size:
+        entries.sort()
+        for _, size, entry in entries:
+            if total_size <= max_size:
+                break
+            with contextlib.suppress(OSError):
+                entry.unlink(missing_ok=True)
+            total_size -= size
+
+    for namespace in namespaces:
+        # only succeeds once a namespace is empty
+        with contextlib.suppress(OSError):
+            namespace.rmdir()
+
+    with contextlib.suppress(OSError):
+        marker.touch()
@@ -0,0 +1,381 @@
+"""Keep djLint loaded between editor runs and serve them over a socket.
+
+An editor formatting on save pipes the buffer through ``djlint -`` each
+time, and each run pays for starting python, loading the rules, finding the
+project's config and compiling its patterns before the template is touched.
+``djlint --daemon`` does that work once and keeps it. A stdin run that finds
+the daemon's socket sends its options and text there and prints what comes
+back, and anything the daemon cannot answer is run locally as before.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import socket
+import stat
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import threading
+    from collections.abc import Iterator, Mapping
+    from typing import Final
+
+    from typing_extensions import Any
+
+    from djlint.settings import Config
+
+
+# a client gives up on the daemon after this long and runs locally
+_CLIENT_TIMEOUT: Final = 30.0
+# how often the server checks whether it was asked to stop
+_POLL_INTERVAL: Final = 0.5
+_MAX_CONFIGS: Final = 32
+# files in the project root whose changes mean a config has to be rebuilt
+_CONFIG_FILES: Final = (
+    ".djlint.toml",
+    ".djlint_rules.yaml",
+    ".djlintrc",
+    ".editorconfig",
+    ".gitignore",
+    "djlint.toml",
+    "pyproject.toml",
+)
+# options holding paths, sent as strings
+_PATH_OPTIONS: Final = ("cache_dir", "configuration", "rules")
+
+
+def supported() -> bool:
+    """Whether this platform has the unix sockets the daemon listens on."""
+    return hasattr(socket, "AF_UNIX")
+
+
+def default_socket_path() -> Path:
+    """Where the daemon listens, in a directory private to the user.
+
+    The directory is created by the daemon. Without XDG_RUNTIME_DIR it is
+    in the shared temporary directory, where another user could have made
+    it first, so a client only connects once _is_private() agrees.
+    """
+    runtime_dir = os.getenv("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "djlint" / "djlint.sock"
+    return Path(tempfile.gettempdir()) / f"djlint-{os.getuid()}" / "djlint.sock"
+
+
+def _is_private(path: Path, kind: int) -> bool:
+    """Whether path is a kind of file owned and only writable by this user.
+
+    lstat() does not follow a symlink, which is never trusted.
+    """
+    try:
+        status = path.lstat()
+    except OSError:
+        return False
+    return (
+        stat.S_IFMT(status.st_mode) == kind
+        and status.st_uid == os.getuid()
+        and not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _is_trusted(path: Path) -> bool:
+    """Whether a socket, and the directory it is in, belong to this user.
+
+    Anyone who could put a socket there would be sent the buffers of
+    format-on-save runs and have their reply written back into the files.
+    """
+    return _is_private(path.parent, stat.S_IFDIR) and _is_private(
+        path, stat.S_IFSOCK
+    )
+
+
+def _version() -> str:
+    from importlib import metadata  # noqa: PLC0415
+
+    return metadata.version("djlint")
+
+
+def _receive(connection: socket.socket) -> Any:
+    """Read a json message sent up to the end of the stream."""
+    chunks = []
+    while chunk := connection.recv(65536):
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+def encode_options(options: Mapping[str, Any]) -> dict[str, Any]:
+    """Turn command line options into json values."""
+    return {
+        name: str(value) if isinstance(value, Path) else value
+        for name, value in options.items()
+    }
+
+
+def _decode_options(options: Mapping[str, Any]) -> dict[str, Any]:
+    decoded = dict(options)
+    for name in _PATH_OPTIONS:
+        if decoded.get(name) is not None:
+            decoded[name] = Path(decoded[name])
+    for name in ("per_file_ignores", "per_file_profiles"):
+        decoded[name] = tuple(
+            (pattern, value) for pattern, value in decoded.get(name, ())
+        )
+    return decoded
+
+
+def run_in_daemon(
+    options: Mapping[str, Any], stdin_text: str, *, color: bool
+) -> Mapping[str, Any] | None:
+    """Send a stdin run to the daemon.
+
+    Returns its exit code and output, or None when there is no daemon to
+    answer, so the run goes ahead locally.
+    """
+    path = default_socket_path()
+    if not supported() or not _is_trusted(path):
+        return None
+
+    request = {
+        "version": _version(),
+        "cwd": str(Path.cwd()),
+        "options": encode_options(options),
+        "stdin": stdin_text,
+        "color": color,
+        "columns": shutil.get_terminal_size().columns,
+    }
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(_CLIENT_TIMEOUT)
+            connection.connect(str(path))
+            connection.sendall(json.dumps(request).encode("utf-8"))
+            connection.shutdown(socket.SHUT_WR)
+            response = _receive(connection)
+    except (OSError, ValueError):
+        # a daemon that died leaves its socket behind; nothing answers it
+        return None
+
+    if not isinstance(response, dict) or "exit_code" not in response:
+        return None
+    return response
+
+
+@contextlib.contextmanager
+def _terminal_columns(columns: int) -> Iterator[None]:
+    """Size the output for the client's terminal instead of the daemon's."""
+    previous = os.environ.get("COLUMNS")
+    os.environ["COLUMNS"] = str(columns)
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["COLUMNS"]
+        else:
+            os.environ["COLUMNS"] = previous
+
+
+@contextlib.contextmanager
+def _captured_output(*, color: bool) -> Iterator[tuple[io.BytesIO, io.BytesIO]]:
+    """Collect what a run prints, text and bytes, as utf-8."""
+    import click  # noqa: PLC0415
+
+    from djlint import main  # noqa: PLC0415
+
+    stdout = io.BytesIO()
+    stderr = io.BytesIO()
+    text_stdout = io.TextIOWrapper(stdout, encoding="utf-8", write_through=True)
+    text_stderr = io.TextIOWrapper(stderr, encoding="utf-8", write_through=True)
+    try:
+        with (
+            contextlib.redirect_stdout(text_stdout),
+            contextlib.redirect_stderr(text_stderr),
+            click.Context(main, color=color),
+        ):
+            yield stdout, stderr
+    finally:
+        # a wrapper closes its buffer when it goes away, unless detached
+        text_stdout.detach()
+        text_stderr.detach()
+
+
+class DaemonState:
+    """Configs built for earlier requests, reused while nothing changed."""
+
+    __slots__ = ("configs", "version")
+
+    def __init__(self) -> None:
+        self.version = _version()
+        self.configs: dict[str, tuple[Config, tuple[object, ...], bytes]] = {}
+
+    def _config(
+        self, cwd: str, options: Mapping[str, Any]
+    ) -> tuple[Config, bytes]:
+        """Return the config for these options and the warnings it printed.
+
+        A config is keyed by the working directory and options, and rebuilt
+        when a config file it could have read changed since.
+        """
+        from djlint.settings import Config, find_project_root  # noqa: PLC0415
+
+        key = json.dumps([cwd, options], sort_keys=True)
+        root = find_project_root(Path.cwd())
+        stamp = _config_stamp(root, options)
+        cached = self.configs.get(key)
+        if cached is not None and cached[1] == stamp:
+            return cached[0], cached[2]
+
+        with _captured_output(color=False) as (_, warnings):
+            config = Config("-", stdin=True, **_decode_options(options))
+        if len(self.configs) >= _MAX_CONFIGS:
+            self.configs.clear()
+        self.configs[key] = (config, stamp, warnings.getvalue())
+        return config, warnings.getvalue()
+
+    def respond(self, request: Mapping[str, Any]) -> dict[str, Any]:
+        """Run a stdin request, or tell the client to run it itself."""
+        from djlint import run_stdin  # noqa: PLC0415
+
+        if request.get("version") != self.version:
+            return {"fallback": True}
+
+        try:
+            os.chdir(request["cwd"])
+            config, warnings = self._config(request["cwd"], request["options"])
+            # a files option reads paths from the config instead of stdin,
+            # and a nested config or a per-file profile is found from the
+            # stdin filename
+            if config.files or (
+                config.stdin_filename
+                and (config.nested_config or config.per_file_profiles)
+            ):
+                return {"fallback": True}
+
+            with (
+                _terminal_columns(request["columns"]),
+                _captured_output(color=request["color"]) as (stdout, stderr),
+            ):
+                exit_code = run_stdin(config, request["stdin"])
+        except Exception:
+            import traceback  # noqa: PLC0415
+
+            # the client runs it again and reports the failure itself
+            traceback.print_exc()
+            return {"fallback": True}
+
+        return {
+            "exit_code": exit_code,
+            "stdout": stdout.getvalue().decode("utf-8"),
+            "stderr": (warnings + stderr.getvalue()).decode("utf-8"),
+        }
+
+
+def _config_stamp(root: Path, options: Mapping[str, Any]) -> tuple[object, ...]:
+    """Sizes and modification times of the files a config is built from."""
+    paths = [root / name for name in _CONFIG_FILES]
+    paths.extend(
+        Path(options[name])
+        for name in ("configuration", "rules")
+        if options.get(name)
+    )
+    return (str(root), *map(_file_stamp, paths))
+
+
+def _file_stamp(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _preload() -> None:
+    """Import what the first request would otherwise wait for."""
+    import cssbeautifier  # noqa: PLC0415, F401
+    import jsbeautifier  # noqa: PLC0415, F401
+
+    import djlint.formatter.css  # noqa: PLC0415, F401
+    import djlint.formatter.js  # noqa: PLC0415, F401
+    import djlint.lint  # noqa: PLC0415, F401
+    import djlint.output  # noqa: PLC0415, F401
+    import djlint.reformat  # noqa: PLC0415, F401
+
+
+def _listen(path: Path) -> socket.socket:
+    """Bind the socket, readable and writable by this user only."""
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not _is_private(path.parent, stat.S_IFDIR):
+        msg = (
+            f"{path.parent} must be a directory owned by you and writable by"
+            " nobody else, so that no one else can answer djLint runs."
+        )
+        raise RuntimeError(msg)
+    if path.exists():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+            try:
+                probe.connect(str(path))
+            except OSError:
+                # left behind by a daemon that did not shut down cleanly
+                path.unlink()
+            else:
+                msg = f"A djLint daemon is already listening on {path}."
+                raise RuntimeError(msg)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    umask = os.umask(0o177)
+    try:
+        server.bind(str(path))
+    finally:
+        os.umask(umask)
+    server.listen()
+    return server
+
+
+def serve(
+    path: Path | None = None, *, stop: threading.Event | None = None
+) -> None:
+    """Answer stdin runs until interrupted, or until stop is set.
+
+    Requests are answered one at a time: a run changes directory and
+    redirects output for the whole process.
+    """
+    import signal  # noqa: PLC0415
+    import threading  # noqa: PLC0415
+
+    from click import echo  # noqa: PLC0415
+
+    path = path or default_socket_path()
+    if threading.current_thread() is threading.main_thread():
+        # being terminated cleans up like ctrl+c, instead of leaving the
+        # socket behind
+        signal.signal(signal.SIGTERM, signal.default_int_handler)
+    _preload()
+    state = DaemonState()
+    server = _listen(path)
+    server.settimeout(_POLL_INTERVAL)
+    echo(f"djLint daemon listening on {path}", err=True)
+    cwd = Path.cwd()
+    try:
+        while stop is None or not stop.is_set():
+            try:
+                connection, _ = server.accept()
+            except TimeoutError:
+                continue
+            with connection:
+                connection.settimeout(_CLIENT_TIMEOUT)
+                try:
+                    response = state.respond(_receive(connection))
+                    connection.sendall(json.dumps(response).encode("utf-8"))
+                except (OSError, ValueError):
+                    continue
+                finally:
+                    os.chdir(cwd)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        path.unlink(missing_ok=True)
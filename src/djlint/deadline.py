@@ -0,0 +1,101 @@
+"""Stop working on a file once it runs past --file-timeout.
+
+Some patterns backtrack badly on malformed templates, and a single file can
+then hold up a whole run. An interval timer interrupts the file instead. The
+regex module checks for signals while it matches, so even one runaway match
+is cut short, wherever in the formatter or linter it happens.
+
+Signals only reach the main thread and Windows has no interval timers, so a
+file checked in a thread, as on free-threaded Python, or on Windows runs
+without a budget, and the run warns that it does.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import signal
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+class FileTimeout(BaseException):
+    """A file ran past its time budget.
+
+    Not an Exception, so the formatter's fallbacks that catch any error do
+    not swallow it.
+    """
+
+
+def _interrupt(_signum: int, _frame: object) -> None:
+    raise FileTimeout
+
+
+def supported() -> bool:
+    """Whether a budget can be enforced here."""
+    return (
+        hasattr(signal, "setitimer")
+        and threading.current_thread() is threading.main_thread()
+    )
+
+
+def warn_unenforced(*, in_threads: bool = False) -> None:
+    """Warn that the run's budget will not be enforced, if it will not.
+
+    in_threads is whether the files are checked in worker threads rather
+    than in this one.
+    """
+    if not hasattr(signal, "setitimer"):
+        where = "on Windows"
+    elif in_threads or not supported():
+        where = "when files are checked in threads, as on free-threaded Python"
+    else:
+        return
+
+    from click import echo, style  # noqa: PLC0415
+
+    echo(
+        style(f"Warning: --file-timeout is not enforced {where}.", fg="yellow"),
+        err=True,
+    )
+
+
+@contextlib.contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Raise FileTimeout in the block once seconds have passed."""
+    if not seconds or not supported():
+        yield
+        return
+
+    previous = signal.signal(signal.SIGALRM, _interrupt)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        try:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+        finally:
+            # the timer can go off just before it is stopped, and its
+            # handler must still be removed
+            signal.signal(signal.SIGALRM, previous)
+
+
+@contextlib.contextmanager
+def paused() -> Iterator[None]:
+    """Hold the deadline off for a block that must not be cut short.
+
+    Writing a file is not interrupted halfway, and the time it takes does
+    not count against the budget.
+    """
+    if not supported():
+        yield
+        return
+
+    remaining, _ = signal.setitimer(signal.ITIMER_REAL, 0)
+    try:
+        yield
+    finally:
+        if remaining:
+            signal.setitimer(signal.ITIMER_REAL, remaining)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import sys
 from functools import partial
 from typing import TYPE_CHECKING
 
@@ -19,8 +20,14 @@ from djlint.helpers import (
     RE_FLAGS_IS,
     RE_FLAGS_IX,
     child_of_ignored_block,
+    config_patterns,
 )
 
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
 if TYPE_CHECKING:
     from djlint.formatter.tokenizer import TagToken
     from djlint.settings import Config
@@ -37,6 +44,48 @@ _PADDED_VALUE_PATTERN = re.compile(
 )
 
 
+class _AttributePatterns(NamedTuple):
+    # format_template_tags, matched against stripped lines
+    template_unindent_line: re.Pattern[str]
+    tag_unindent_line: re.Pattern[str]
+    template_indent_line: re.Pattern[str]
+    break_before: re.Pattern[str]
+    break_after: re.Pattern[str]
+    # format_attributes
+    template_tag: re.Pattern[str]
+    template_unindent: re.Pattern[str]
+    template_indent: re.Pattern[str]
+    attribute: re.Pattern[str]
+
+
+def _attribute_patterns(config: Config) -> _AttributePatterns:
+    """Compile the patterns format_template_tags and format_attributes use."""
+    return _AttributePatterns(
+        template_unindent_line=re.compile(
+            config.template_unindent, RE_FLAGS_IX
+        ),
+        tag_unindent_line=re.compile(config.tag_unindent_line, RE_FLAGS_IX),
+        template_indent_line=re.compile(config.template_indent, RE_FLAGS_IX),
+        break_before=re.compile(
+            config.break_before
+            + r"[ \t]\K((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})",
+            RE_FLAGS_IMX,
+        ),
+        break_after=re.compile(
+            r"((?:{%|{{\#)[ ]*?(?:"
+            + config.break_template_tags
+            + ")[^}]+?[%|}]})(?=[ \t])([^\n]+)$",
+            RE_FLAGS_IMX,
+        ),
+        template_tag=re.compile(config.template_tags, RE_FLAGS_IMX),
+        template_unindent=re.compile(config.template_unindent, RE_FLAGS_IMX),
+        template_indent=re.compile(config.template_indent, RE_FLAGS_IMX),
+        attribute=re.compile(config.attribute_pattern, re.X),
+    )
+
+
 def _rendered_length(config: Config, attribute_group: str) -> int:
     """Length of the attribute group as it will be written out.
 
@@ -182,15 +231,10 @@ def format_template_tags(config: Config, attributes: str, spacing: int) -> str:
         |    ^----^ base indent
         |
         """
-        template_unindent_pattern = re.compile(
-            config.template_unindent, RE_FLAGS_IX
-        )
-        tag_unindent_line_pattern = re.compile(
-            config.tag_unindent_line, RE_FLAGS_IX
-        )
-        template_indent_pattern = re.compile(
-            config.template_indent, RE_FLAGS_IX
-        )
+        patterns = config_patterns(config, _attribute_patterns)
+        template_unindent_pattern = patterns.template_unindent_line
+        tag_unindent_line_pattern = patterns.tag_unindent_line
+        template_indent_pattern = patterns.template_indent_line
 
         indent = 0
         indented = ""
@@ -247,30 +291,14 @@ def format_template_tags(config: Config, attributes: str, spacing: int) -> str:
 
         return f"{match.group(1)}\n{match.group(2).strip()}"
 
-    break_char = config.break_before
+    patterns = config_patterns(config, _attribute_patterns)
 
     func = partial(add_break, "before")
-
-    attributes = re.sub(
-        break_char
-        + r"[ \t]\K((?:{%|{{\#)[ ]*?(?:"
-        + config.break_template_tags
-        + ")[^}]+?[%|}]})",
-        func,
-        attributes,
-        flags=RE_FLAGS_IMX,
-    )
+    attributes = patterns.break_before.sub(func, attributes)
 
     func = partial(add_break, "after")
     # break after
-    attributes = re.sub(
-        r"((?:{%|{{\#)[ ]*?(?:"
-        + config.break_template_tags
-        + ")[^}]+?[%|}]})(?=[ \t])([^\n]+)$",
-        func,
-        attributes,
-        flags=RE_FLAGS_IMX,
-    )
+    attributes = patterns.break_after.sub(func, attributes)
     return add_indentation(config, attributes, spacing)
 
 
@@ -291,20 +319,14 @@ def format_attributes(config: Config, html: str, token: TagToken) -> str:
     ) or child_of_ignored_block(config, html, token):
         return html[token.start : token.end]
 
+    patterns = config_patterns(config, _attribute_patterns)
+
     if not config.format_attribute_template_tags:
         template_depth = 0
-        for template_tag in re.finditer(
-            config.template_tags, attribute_group, flags=RE_FLAGS_IMX
-        ):
-            if re.match(
-                config.template_unindent,
-                template_tag.group(),
-                flags=RE_FLAGS_IMX,
-            ):
+        for template_tag in patterns.template_tag.finditer(attribute_group):
+            if patterns.template_unindent.match(template_tag.group()):
                 template_depth = max(template_depth - 1, 0)
-            elif re.match(
-                config.template_indent, template_tag.group(), flags=RE_FLAGS_IMX
-            ):
+            elif patterns.template_indent.match(template_tag.group()):
                 template_depth += 1
                 if template_depth > 1:
                     return html[token.start : token.end]
@@ -327,9 +349,7 @@ def format_attributes(config: Config, html: str, token: TagToken) -> str:
     # the tag is rebuilt from the matched attribute groups, so any
     # non-whitespace byte the pattern cannot match would be dropped. Bail out
     # and leave malformed attributes untouched rather than corrupting them.
-    attribute_matches = list(
-        re.finditer(config.attribute_pattern, attribute_group, flags=re.X)
-    )
+    attribute_matches = list(patterns.attribute.finditer(attribute_group))
     covered = 0
     for attr_grp in attribute_matches:
         if attribute_group[covered : attr_grp.start()].strip():
@@ -12,9 +12,14 @@ import regex as re
 from djlint.const import HTML_TAG_NAMES, HTML_VOID_ELEMENTS
 from djlint.formatter.class_attributes import encode_attribute_newlines
 from djlint.formatter.tokenizer import tokenize_tags
-from djlint.helpers import RE_FLAGS_ISX, child_of_unformatted_block
+from djlint.helpers import (
+    RE_FLAGS_ISX,
+    child_of_unformatted_block,
+    document_spans,
+)
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     from typing import Final
 
     from djlint.formatter.tokenizer import TagToken
@@ -31,6 +36,16 @@ def _blank_match(match: re.Match[str]) -> str:
     return " " * len(match.group())
 
 
+def _blank_spans(html: str, spans: Iterable[tuple[int, int]]) -> str:
+    output: list[str] = []
+    previous_end = 0
+    for start, end in spans:
+        output.extend((html[previous_end:start], " " * (end - start)))
+        previous_end = end
+    output.append(html[previous_end:])
+    return "".join(output)
+
+
 def compress_html(html: str, config: Config) -> str:
     """Compress html."""
 
@@ -88,8 +103,8 @@ def compress_html(html: str, config: Config) -> str:
         "nunjucks",
     }:
         if "{#" in html:
-            token_source = config.unformatted_blocks_pattern.sub(
-                _blank_match, token_source
+            token_source = _blank_spans(
+                html, document_spans(html).unformatted_block_spans(config)
             )
         if "comment" in html:
             token_source = _TEMPLATE_COMMENT_BLOCK_PATTERN.sub(
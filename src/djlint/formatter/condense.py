@@ -6,6 +6,7 @@
 
 from __future__ import annotations
 
+import sys
 from collections import Counter
 from functools import partial
 from typing import TYPE_CHECKING
@@ -19,6 +20,7 @@ from djlint.helpers import (
     RE_FLAGS_IMX,
     RE_FLAGS_IX,
     RE_FLAGS_MS,
+    config_patterns,
     inside_html_attribute,
     inside_ignored_block,
     inside_ignored_block_span,
@@ -27,6 +29,11 @@ from djlint.helpers import (
     is_safe_closing_tag,
 )
 
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
 if TYPE_CHECKING:
     from typing import Final
 
@@ -76,8 +83,123 @@ def _opening_line_pattern(config: Config) -> re.Pattern[str]:
     )
 
 
+class _CondensePatterns(NamedTuple):
+    # clean_whitespace: the lines to strip, the groups of tags to add a blank line after, and
+    # before with whether comments above stay attached to the tag
+    strip_lines: tuple[re.Pattern[str], ...]
+    blank_line_after_tags: tuple[re.Pattern[str], ...]
+    blank_line_before_tags: tuple[tuple[re.Pattern[str], bool], ...]
+    opening_line: re.Pattern[str]
+    # condense_html
+    blank_line_after: tuple[re.Pattern[str], ...]
+    blank_line_before: tuple[re.Pattern[str], ...]
+    single_line_html: re.Pattern[str]
+    single_line_template: re.Pattern[str]
+    multiline_template_block: re.Pattern[str]
+
+
+def _condense_patterns(config: Config) -> _CondensePatterns:
+    """Compile the patterns clean_whitespace and condense_html build."""
+    line_contents = r"(.*?)"
+    trailing_contents = r"\n \t"
+
+    if config.preserve_blank_lines:
+        line_contents = r"([^\n]*?)"
+        trailing_contents = r" \t"
+
+    if not config.preserve_leading_space:
+        strip_lines = (
+            re.compile(
+                rf"^[ \t]*{line_contents}([{trailing_contents}]*)$", re.M
+            ),
+        )
+    else:
+        strip_lines = (
+            re.compile(
+                rf"^[ \t]*((?:<|{{%).*?)([{trailing_contents}]*)$", re.M
+            ),
+            re.compile(rf"^{line_contents}([{trailing_contents}]*)$", re.M),
+        )
+
+    blank_line_after_tags = (
+        tuple(
+            re.compile(
+                rf"((?:{{%-?\s*?{tag.strip()}\b[^}}]+?-?%}}\n?)+)", RE_FLAGS_IMS
+            )
+            for tag in config.blank_line_after_tag.split(",")
+        )
+        if config.blank_line_after_tag
+        else ()
+    )
+
+    # keep comments attached to the tag they document: the blank line
+    # goes above any comment lines directly preceding the tag. a comment
+    # above an end tag is block content, not the end tag's comment.
+    comment_lines = r"(?:^[ \t]*(?:\{#[^\n]*?#\}|<!--[^\n]*?-->)[ \t]*\n)*"
+    blank_line_before_tags = []
+    if config.blank_line_before_tag:
+        for raw_tag in config.blank_line_before_tag.split(","):
+            tag = raw_tag.strip()
+            attach_comments = not tag.startswith("end")
+            blank_line_before_tags.append((
+                re.compile(
+                    rf"(?<!^\n)({comment_lines if attach_comments else ''}(?:{{%-?\s*?{tag}\b[^}}]+?-?%}}\n?)+)",
+                    RE_FLAGS_IMS,
+                ),
+                attach_comments,
+            ))
+
+    blank_line_after = (
+        tuple(
+            re.compile(
+                rf"((?:{{%-?\s*?{tag.strip()}[^}}]+?-?%}}\n?)+)", RE_FLAGS_IMS
+            )
+            for tag in config.blank_line_after_tag.split(",")
+        )
+        if config.blank_line_after_tag
+        else ()
+    )
+    blank_line_before = (
+        tuple(
+            re.compile(
+                rf"((?:{{%-?\s*?{tag.strip()}[^}}]+?-?%}}\n?)+)", RE_FLAGS_IMS
+            )
+            for tag in config.blank_line_before_tag.split(",")
+        )
+        if config.blank_line_before_tag
+        else ()
+    )
+
+    return _CondensePatterns(
+        strip_lines=strip_lines,
+        blank_line_after_tags=blank_line_after_tags,
+        blank_line_before_tags=tuple(blank_line_before_tags),
+        opening_line=_opening_line_pattern(config),
+        blank_line_after=blank_line_after,
+        blank_line_before=blank_line_before,
+        single_line_html=re.compile(
+            rf"(<({config.optional_single_line_html_tags})\b(?:\"[^\"]*\"|'[^']*'|{{{{[^}}]*}}}}|{{[^}}]*}}|[^'\">{{}}])*>)\s*([^<\n]*?)\s*?(</(\2)>)",
+            RE_FLAGS_IMSX,
+        ),
+        single_line_template=re.compile(
+            rf"((?:\s|^){{%-?[ ]*?({config.optional_single_line_template_tags})\b(?:(?!\n|%}}).)*?%}})\s*([^%\n]*?)\s*?({{%-?[ ]+?end(\2)[ ]*?%}})",
+            RE_FLAGS_IMX,
+        ),
+        multiline_template_block=re.compile(
+            rf"""
+            {{%-?[ ]*?({config.optional_single_line_template_tags})\b(?:(?!\n|%}}).)*?%}}
+            ([^%]*?)
+            {{%-?[ ]+?end\1[ ]*?%}}
+            """,
+            RE_FLAGS_IMX,
+        ),
+    )
+
+
 def clean_whitespace(html: str, config: Config) -> str:
     """Compress back tags that do not need to be expanded."""
+    patterns = config_patterns(config, _condense_patterns)
+
     # put empty tags on one line
 
     def strip_space(config: Config, html: str, match: re.Match[str]) -> str:
@@ -112,7 +234,7 @@ def clean_whitespace(html: str, config: Config) -> str:
         # trimmed blocks should not be here.
         # we need to full html to check what type of
         # opening block it was - trimmed or not trimmed
-        if inside_protected_trans_block(config, html[: match.end()], match):
+        if inside_protected_trans_block(config, html, match):
             return match.group().rstrip()
 
         lines = match.group(2).count("\n")
@@ -123,37 +245,10 @@ def clean_whitespace(html: str, config: Config) -> str:
 
     func = partial(strip_space, config, html)
 
-    line_contents = r"(.*?)"
-    trailing_contents = r"\n \t"
-
-    if config.preserve_blank_lines:
-        line_contents = r"([^\n]*?)"
-        trailing_contents = r" \t"
-
-    if not config.preserve_leading_space:
-        # remove any leading/trailing space
-        html = re.sub(
-            rf"^[ \t]*{line_contents}([{trailing_contents}]*)$",
-            func,
-            html,
-            flags=re.M,
-        )
-
-    else:
-        # only remove leading space in front of tags
-        # <, {%
-        html = re.sub(
-            rf"^[ \t]*((?:<|{{%).*?)([{trailing_contents}]*)$",
-            func,
-            html,
-            flags=re.M,
-        )
-        html = re.sub(
-            rf"^{line_contents}([{trailing_contents}]*)$",
-            func,
-            html,
-            flags=re.M,
-        )
+    # remove any leading/trailing space, or with preserve_leading_space only
+    # the leading space in front of tags
+    for pattern in patterns.strip_lines:
+        html = pattern.sub(func, html)
 
     def add_blank_line_after(
         config: Config, html: str, match: re.Match[str]
@@ -179,14 +274,8 @@ def clean_whitespace(html: str, config: Config) -> str:
     func = partial(add_blank_line_after, config, html)
 
     # should we add blank lines after load tags?
-    if config.blank_line_after_tag:
-        for tag in config.blank_line_after_tag.split(","):
-            html = re.sub(
-                rf"((?:{{%-?\s*?{tag.strip()}\b[^}}]+?-?%}}\n?)+)",
-                func,
-                html,
-                flags=RE_FLAGS_IMS,
-            )
+    for pattern in patterns.blank_line_after_tags:
+        html = pattern.sub(func, html)
 
     def add_blank_line_before(
         config: Config,
@@ -219,28 +308,15 @@ def clean_whitespace(html: str, config: Config) -> str:
         return "\n" + match.group()
 
     # should we add blank lines before load tags?
-    if config.blank_line_before_tag:
-        # keep comments attached to the tag they document: the blank line
-        # goes above any comment lines directly preceding the tag. a comment
-        # above an end tag is block content, not the end tag's comment.
-        comment_lines = r"(?:^[ \t]*(?:\{#[^\n]*?#\}|<!--[^\n]*?-->)[ \t]*\n)*"
-        opening_line = _opening_line_pattern(config)
-        for raw_tag in config.blank_line_before_tag.split(","):
-            tag = raw_tag.strip()
-            attach_comments = not tag.startswith("end")
-            func = partial(
-                add_blank_line_before,
-                config,
-                html,
-                opening_line,
-                attach_comments,
-            )
-            html = re.sub(
-                rf"(?<!^\n)({comment_lines if attach_comments else ''}(?:{{%-?\s*?{tag}\b[^}}]+?-?%}}\n?)+)",
-                func,
-                html,
-                flags=RE_FLAGS_IMS,
-            )
+    for pattern, attach_comments in patterns.blank_line_before_tags:
+        func = partial(
+            add_blank_line_before,
+            config,
+            html,
+            patterns.opening_line,
+            attach_comments,
+        )
+        html = pattern.sub(func, html)
 
     # add line after yaml front matter
 
@@ -290,15 +366,9 @@ def _multiline_template_blocks(
 
     return Counter(
         _template_block_key(match.group(1), match.group(2))
-        for match in re.finditer(
-            rf"""
-            {{%-?[ ]*?({config.optional_single_line_template_tags})\b(?:(?!\n|%}}).)*?%}}
-            ([^%]*?)
-            {{%-?[ ]+?end\1[ ]*?%}}
-            """,
-            source,
-            flags=RE_FLAGS_IMX,
-        )
+        for match in config_patterns(
+            config, _condense_patterns
+        ).multiline_template_block.finditer(source)
         if "\n" in match.group(2) and match.group(2).strip()
     )
 
@@ -334,26 +404,9 @@ def condense_html(html: str, config: Config, source: str | None = None) -> str:
         # space for other purposes, we should not try to remove it.
         return html
 
-    blank_line_after_patterns = (
-        tuple(
-            re.compile(
-                rf"((?:{{%-?\s*?{tag.strip()}[^}}]+?-?%}}\n?)+)", RE_FLAGS_IMS
-            )
-            for tag in config.blank_line_after_tag.split(",")
-        )
-        if config.blank_line_after_tag
-        else ()
-    )
-    blank_line_before_patterns = (
-        tuple(
-            re.compile(
-                rf"((?:{{%-?\s*?{tag.strip()}[^}}]+?-?%}}\n?)+)", RE_FLAGS_IMS
-            )
-            for tag in config.blank_line_before_tag.split(",")
-        )
-        if config.blank_line_before_tag
-        else ()
-    )
+    patterns = config_patterns(config, _condense_patterns)
+    blank_line_after_patterns = patterns.blank_line_after
+    blank_line_before_patterns = patterns.blank_line_before
 
     def condense_line(
         config: Config, html: str, match: re.Match[str], *, inline: bool
@@ -455,12 +508,7 @@ def condense_html(html: str, config: Config, source: str | None = None) -> str:
     func = partial(condense_html_line, config, html)
 
     # put short single line tags on one line
-    html = re.sub(
-        rf"(<({config.optional_single_line_html_tags})\b(?:\"[^\"]*\"|'[^']*'|{{{{[^}}]*}}}}|{{[^}}]*}}|[^'\">{{}}])*>)\s*([^<\n]*?)\s*?(</(\2)>)",
-        func,
-        html,
-        flags=RE_FLAGS_IMSX,
-    )
+    html = patterns.single_line_html.sub(func, html)
 
     multiline_blocks = _multiline_template_blocks(source, config)
 
@@ -483,9 +531,4 @@ def condense_html(html: str, config: Config, source: str | None = None) -> str:
     # put short template tags back on one line. must have leading space
     # jinja +%} and {%+ intentionally omitted.
     func = partial(condense_template_line, config, html)
-    return re.sub(
-        rf"((?:\s|^){{%-?[ ]*?({config.optional_single_line_template_tags})\b(?:(?!\n|%}}).)*?%}})\s*([^%\n]*?)\s*?({{%-?[ ]+?end(\2)[ ]*?%}})",
-        func,
-        html,
-        flags=RE_FLAGS_IMX,
-    )
+    return patterns.single_line_template.sub(func, html)
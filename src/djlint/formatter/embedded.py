@@ -0,0 +1,149 @@
+"""Run jsbeautifier and cssbeautifier on blocks inside a template."""
+
+from __future__ import annotations
+
+import json
+import sys
+from functools import lru_cache
+from io import StringIO
+from typing import TYPE_CHECKING
+
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from typing import Final, Literal
+
+    from typing_extensions import Any
+
+
+# blocks kept formatted for reuse, and the largest block worth keeping,
+# which bounds the memory they take
+_CACHED_BLOCKS: Final = 256
+_MAX_CACHED_BLOCK: Final = 64 * 1024
+
+# a private use character, which a block will not contain, used to indent
+# so the lines the beautifier indented stand apart from the ones it copied
+_INDENT_MARKER: Final = "\ue000"
+
+
+class _Beautifier(NamedTuple):
+    """A beautifier and its options, built once per setting."""
+
+    beautify: Callable[[str, Any], str]
+    # indents with the marker, or None where it cannot stand in
+    marked_options: Any
+    # one and two levels deep, for blocks formatted in two passes
+    options: Any
+    deeper_options: Any
+    indent_string: str
+    indent_size: int
+
+
+@lru_cache(maxsize=8)
+def _beautifier(language: Literal["css", "js"], settings: str) -> _Beautifier:
+    build_options: Callable[[dict[str, Any]], Any]
+    if language == "js":
+        import jsbeautifier  # noqa: PLC0415
+        from jsbeautifier.javascript import (  # noqa: PLC0415
+            options as js_options,
+        )
+
+        beautify = jsbeautifier.beautify
+        build_options = js_options.BeautifierOptions
+    else:
+        import cssbeautifier  # noqa: PLC0415
+        from cssbeautifier.css import options as css_options  # noqa: PLC0415
+
+        beautify = cssbeautifier.beautify
+        build_options = css_options.BeautifierOptions
+
+    config = json.loads(settings)
+    level_options = build_options({**config, "indent_level": 1})
+    deeper_options = build_options({**config, "indent_level": 2})
+
+    marked_options = None
+    # a tab counts as one column where the marker would count indent_size,
+    # which could wrap lines differently
+    if (
+        level_options.indent_char
+        and not level_options.indent_with_tabs
+        and level_options.indent_size > 0
+    ):
+        marked_options = build_options({**config, "indent_level": 1})
+        marked_options.indent_char = _INDENT_MARKER
+        marked_options.indent_with_tabs = False
+
+    return _Beautifier(
+        beautify=beautify,
+        marked_options=marked_options,
+        options=level_options,
+        deeper_options=deeper_options,
+        indent_string=level_options.indent_char * level_options.indent_size,
+        indent_size=level_options.indent_size,
+    )
+
+
+def beautify_block(
+    language: Literal["css", "js"],
+    source: str,
+    settings: Mapping[str, Any],
+    indent: str,
+) -> str:
+    """Beautify a block and indent it to sit inside its tag.
+
+    The beautifier cannot be given a fixed leading space, so it is run one
+    level deep and the tag's indent goes in front of the lines it laid out.
+    Lines it copied as they were, such as the inside of a multiline string,
+    are left alone. Each line starts with a newline.
+
+    Templates often share blocks, such as an analytics snippet, so results
+    are kept and a repeated block is only formatted once.
+    """
+    key = json.dumps(settings, sort_keys=True, default=str)
+    if len(source) > _MAX_CACHED_BLOCK:
+        return _beautify_block(language, source, key, indent)
+    return _cached_beautify_block(language, source, key, indent)
+
+
+def _beautify_block(
+    language: Literal["css", "js"], source: str, settings: str, indent: str
+) -> str:
+    beautifier = _beautifier(language, settings)
+
+    with StringIO() as buf:
+        if (
+            beautifier.marked_options is not None
+            and _INDENT_MARKER not in source
+        ):
+            for line in beautifier.beautify(
+                source, beautifier.marked_options
+            ).splitlines():
+                buf.write("\n")
+                text = line.lstrip(_INDENT_MARKER)
+                if text != line:
+                    levels = (len(line) - len(text)) // beautifier.indent_size
+                    buf.write(indent)
+                    buf.write(beautifier.indent_string * levels)
+                buf.write(text)
+            return buf.getvalue()
+
+        # the lines that move with the indent level are the laid out ones
+        lines = beautifier.beautify(source, beautifier.options).splitlines()
+        deeper_lines = beautifier.beautify(
+            source, beautifier.deeper_options
+        ).splitlines()
+        for line, deeper_line in zip(lines, deeper_lines, strict=False):
+            buf.write("\n")
+            if line != deeper_line:
+                buf.write(indent)
+            buf.write(line)
+        return buf.getvalue()
+
+
+_cached_beautify_block: Final = lru_cache(maxsize=_CACHED_BLOCKS)(
+    _beautify_block
+)
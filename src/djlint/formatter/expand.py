@@ -19,7 +19,7 @@ from djlint.const import (
     HTML_INLINE_LEVEL_ELEMENTS,
     HTML_VOID_ELEMENTS,
 )
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import TagTable
 from djlint.helpers import (
     RE_FLAGS_IMX,
     RE_FLAGS_IX,
@@ -32,7 +32,6 @@ from djlint.helpers import (
 if TYPE_CHECKING:
     from typing import Final
 
-    from djlint.formatter.tokenizer import TagToken
     from djlint.settings import Config
 
 _HTML_TAG_NAME_PATTERN: Final = re.compile(
@@ -142,15 +141,16 @@ def expand_html(html: str, config: Config) -> str:
 
     # ponytail: per-document cache; bound it if very large templates become common.
     @cache
-    def html_tokens(value: str) -> tuple[TagToken, ...]:
-        return tuple(tokenize_tags(value))
+    def html_tokens(value: str) -> TagTable:
+        return TagTable(value)
 
     def without_html_tags(value: str) -> str:
         output: list[str] = []
         previous_end = 0
-        for token in html_tokens(value):
-            output.append(value[previous_end : token.start])
-            previous_end = token.end
+        tags = html_tokens(value)
+        for start, end in zip(tags.starts, tags.ends, strict=True):
+            output.append(value[previous_end:start])
+            previous_end = end
         output.append(value[previous_end:])
         return "".join(output)
 
@@ -299,7 +299,7 @@ def expand_html(html: str, config: Config) -> str:
                 return False
             body = line[match_end : closing_token.start]
 
-        body_tags = [token.name.lower() for token in html_tokens(body)]
+        body_tags = [name.lower() for name in html_tokens(body).names]
         if tag_name in body_tags:
             return False
 
@@ -354,7 +354,7 @@ def expand_html(html: str, config: Config) -> str:
         if _BODY_TEMPLATE_TAG_PATTERN.search(body_without_html):
             return False
 
-        body_tags = [token.name.lower() for token in html_tokens(body)]
+        body_tags = [name.lower() for name in html_tokens(body).names]
         if not body_without_html.strip(COLLAPSIBLE_WHITESPACE):
             return False
 
@@ -533,7 +533,12 @@ def expand_html(html: str, config: Config) -> str:
         flags=RE_FLAGS_IMX,
     )
 
-    for index, line in enumerate(protected_lines):
-        html = html.replace(f"{marker_prefix}{index}__", line)
+    if not protected_lines:
+        return html
 
-    return html
+    # the prefix is not in the document, so every match is a marker
+    return re.sub(
+        rf"{re.escape(marker_prefix)}(\d+)__",
+        lambda match: protected_lines[int(match.group(1))],
+        html,
+    )
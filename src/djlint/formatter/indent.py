@@ -4,13 +4,12 @@ from __future__ import annotations
 
 import ast
 import io
+import sys
 import tokenize
-from functools import partial
+from functools import cache, partial
 from typing import TYPE_CHECKING, cast
 
-import json5 as json
 import regex as re
-from json5.lib import QuoteStyle
 
 from djlint.const import (
     COLLAPSIBLE_WHITESPACE,
@@ -19,11 +18,22 @@ from djlint.const import (
     HTML_VOID_ELEMENTS,
 )
 from djlint.formatter.attributes import format_attributes
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import (
+    CLOSING,
+    DECLARATION,
+    SELF_CLOSING,
+    TagTable,
+)
 from djlint.helpers import (
+    MAY_BE_SAFE_CLOSING_TAG,
+    MAY_CLOSE_IGNORED_BLOCK,
+    MAY_CLOSE_SCRIPT_STYLE,
+    MAY_OPEN_IGNORED_BLOCK,
+    MAY_OPEN_SCRIPT_STYLE,
     RE_FLAGS_IMSX,
     RE_FLAGS_IMX,
     RE_FLAGS_IX,
+    config_patterns,
     inside_ignored_block,
     inside_ignored_linter_block,
     is_ignored_block_closing,
@@ -31,11 +41,19 @@ from djlint.helpers import (
     is_safe_closing_tag,
     is_script_style_block_closing,
     is_script_style_block_opening,
+    line_features,
 )
 
+if sys.version_info >= (3, 13):
+    from typing import NamedTuple
+else:
+    from typing_extensions import NamedTuple
+
 if TYPE_CHECKING:
     from typing import Final
 
+    from json5.lib import QuoteStyle
+
     from djlint.settings import Config
 
 
@@ -162,6 +180,8 @@ def _offset(line_offsets: list[int], position: tuple[int, int]) -> int:
 
 
 def _format_string_token(token_value: str, quote_style: QuoteStyle) -> str:
+    import json5  # noqa: PLC0415
+
     try:
         value = ast.literal_eval(token_value)
     except (SyntaxError, ValueError):
@@ -171,7 +191,7 @@ def _format_string_token(token_value: str, quote_style: QuoteStyle) -> str:
         return token_value
 
     return cast(
-        "str", json.dumps(value, ensure_ascii=False, quote_style=quote_style)
+        "str", json5.dumps(value, ensure_ascii=False, quote_style=quote_style)
     )
 
 
@@ -211,70 +231,25 @@ def _format_string_tokens(contents: str, quote_style: QuoteStyle) -> str:
     return "".join(formatted)
 
 
-def indent_html(rawcode: str, config: Config) -> str:
-    """Indent raw code."""
-    if config.profile not in {"handlebars", "golang"}:
-        # we can try to fix template tags. ignore handlebars
-        # this should be done before indenting to line length
-        # calc is preserved.
-
-        def fix_tag_spacing(html: str, match: re.Match[str]) -> str:
-            if inside_ignored_block(config, html, match):
-                return match.group()
-
-            content = match.group(2)
-            # {% verbatim %}/{% raw %} contents render literally; only
-            # normalize the tag edges there
-            if not inside_ignored_linter_block(config, html, match):
-                # collapse runs of whitespace outside string literals (T032)
-                content = _EXTRA_TAG_WHITESPACE_PATTERN.sub(
-                    lambda m: m.group(1) or " ", content
-                ).strip()
-            return f"{match.group(1)} {content} {match.group(3)}"
-
-        """
-        We should have tags like this:
-        {{ tag }}
-        {%- tag atrib -%}
-        """
-        func = partial(fix_tag_spacing, rawcode)
-
-        rawcode = _TAG_SPACING_PATTERN.sub(func, rawcode)
-
-        # rebind: the first pass shifted the offsets the ignored-block
-        # spans are compared against
-        func = partial(fix_tag_spacing, rawcode)
-
-        rawcode = _INTERPOLATION_SPACING_PATTERN.sub(func, rawcode)
-
-    elif config.profile == "handlebars":
-
-        def fix_handlebars_template_tags(
-            html: str, match: re.Match[str]
-        ) -> str:
-            if inside_ignored_block(config, html, match):
-                return match.group()
-
-            return f"{match.group(1)} {match.group(2)}"
-
-        func = partial(fix_handlebars_template_tags, rawcode)
-        # handlebars templates
-        rawcode = _HANDLEBARS_BLOCK_END_PATTERN.sub(func, rawcode)
-
-    rawcode_flat_list = rawcode.split("\n")
-
-    indent = config.indent
-
-    beautified_code = ""
-    indent_level = 0
-    in_set_tag = False
-    in_multiline_tag = False
-    multiline_tag_level = 0
-    multiline_tag_is_block = False
-    is_raw_first_line = False
-    in_script_style_tag = False
-    is_block_raw = False
-
+class _IndentPatterns(NamedTuple):
+    ignored_inline_start_pattern: re.Pattern[str]
+    single_line_tag_pattern: re.Pattern[str]
+    tag_unindent_pattern: re.Pattern[str]
+    inline_slt_no_attrs_end_pattern: re.Pattern[str]
+    inline_slt_attrs_end_pattern: re.Pattern[str]
+    inline_slt_no_attrs_pattern: re.Pattern[str]
+    inline_slt_attrs_pattern: re.Pattern[str]
+    tag_unindent_line_pattern: re.Pattern[str]
+    tag_indent_pattern: re.Pattern[str]
+    custom_html_pattern: re.Pattern[str] | None
+    template_start_pattern: re.Pattern[str]
+    template_indent_pattern: re.Pattern[str]
+    template_unindent_pattern: re.Pattern[str]
+    prefixed_template_tag_indent_pattern: re.Pattern[str]
+
+
+def _indent_patterns(config: Config) -> _IndentPatterns:
+    """Compile the patterns indent_html builds from the config."""
     slt_html = config.indent_html_tags
 
     # here using all tags cause we allow empty tags on one line
@@ -283,20 +258,6 @@ def indent_html(rawcode: str, config: Config) -> str:
     # here using all tags cause we allow empty tags on one line
     slt_template = config.optional_single_line_template_tags
 
-    # nested ignored blocks..
-    ignored_level = 0
-
-    # (level at open tag, first branch depth delta, deltas consistent) for
-    # each open template block; closing a block restores its saved level so
-    # html tags left unclosed inside (e.g. a conditionally rendered wrapper)
-    # don't leak indentation to following siblings.
-    template_block_stack: list[tuple[int, int | None, bool]] = []
-
-    # one entry per html tag left open by an earlier line, telling whether
-    # closing it gives back an indent level. A line is only indented when it
-    # starts with the opening tag, so a tag opened after text owes nothing.
-    open_html_indents: list[bool] = []
-
     ignored_inline_start_pattern = re.compile(
         rf"^\s*?(?:{config.ignored_inline_blocks})", flags=RE_FLAGS_IMX
     )
@@ -374,21 +335,142 @@ def indent_html(rawcode: str, config: Config) -> str:
         flags=RE_FLAGS_IMX,
     )
 
+    return _IndentPatterns(
+        ignored_inline_start_pattern=ignored_inline_start_pattern,
+        single_line_tag_pattern=single_line_tag_pattern,
+        tag_unindent_pattern=tag_unindent_pattern,
+        inline_slt_no_attrs_end_pattern=inline_slt_no_attrs_end_pattern,
+        inline_slt_attrs_end_pattern=inline_slt_attrs_end_pattern,
+        inline_slt_no_attrs_pattern=inline_slt_no_attrs_pattern,
+        inline_slt_attrs_pattern=inline_slt_attrs_pattern,
+        tag_unindent_line_pattern=tag_unindent_line_pattern,
+        tag_indent_pattern=tag_indent_pattern,
+        custom_html_pattern=custom_html_pattern,
+        template_start_pattern=template_start_pattern,
+        template_indent_pattern=template_indent_pattern,
+        template_unindent_pattern=template_unindent_pattern,
+        prefixed_template_tag_indent_pattern=prefixed_template_tag_indent_pattern,
+    )
+
+
+def indent_html(rawcode: str, config: Config) -> str:
+    """Indent raw code."""
+    if config.profile not in {"handlebars", "golang"}:
+        # we can try to fix template tags. ignore handlebars
+        # this should be done before indenting to line length
+        # calc is preserved.
+
+        def fix_tag_spacing(html: str, match: re.Match[str]) -> str:
+            if inside_ignored_block(config, html, match):
+                return match.group()
+
+            content = match.group(2)
+            # {% verbatim %}/{% raw %} contents render literally; only
+            # normalize the tag edges there
+            if not inside_ignored_linter_block(config, html, match):
+                # collapse runs of whitespace outside string literals (T032)
+                content = _EXTRA_TAG_WHITESPACE_PATTERN.sub(
+                    lambda m: m.group(1) or " ", content
+                ).strip()
+            return f"{match.group(1)} {content} {match.group(3)}"
+
+        """
+        We should have tags like this:
+        {{ tag }}
+        {%- tag atrib -%}
+        """
+        func = partial(fix_tag_spacing, rawcode)
+
+        rawcode = _TAG_SPACING_PATTERN.sub(func, rawcode)
+
+        # rebind: the first pass shifted the offsets the ignored-block
+        # spans are compared against
+        func = partial(fix_tag_spacing, rawcode)
+
+        rawcode = _INTERPOLATION_SPACING_PATTERN.sub(func, rawcode)
+
+    elif config.profile == "handlebars":
+
+        def fix_handlebars_template_tags(
+            html: str, match: re.Match[str]
+        ) -> str:
+            if inside_ignored_block(config, html, match):
+                return match.group()
+
+            return f"{match.group(1)} {match.group(2)}"
+
+        func = partial(fix_handlebars_template_tags, rawcode)
+        # handlebars templates
+        rawcode = _HANDLEBARS_BLOCK_END_PATTERN.sub(func, rawcode)
+
+    rawcode_flat_list = rawcode.split("\n")
+
+    indent = config.indent
+
+    beautified_code = ""
+    indent_level = 0
+    in_set_tag = False
+    in_multiline_tag = False
+    multiline_tag_level = 0
+    multiline_tag_is_block = False
+    is_raw_first_line = False
+    in_script_style_tag = False
+    is_block_raw = False
+
+    # nested ignored blocks..
+    ignored_level = 0
+
+    # (level at open tag, first branch depth delta, deltas consistent) for
+    # each open template block; closing a block restores its saved level so
+    # html tags left unclosed inside (e.g. a conditionally rendered wrapper)
+    # don't leak indentation to following siblings.
+    template_block_stack: list[tuple[int, int | None, bool]] = []
+
+    # one entry per html tag left open by an earlier line, telling whether
+    # closing it gives back an indent level. A line is only indented when it
+    # starts with the opening tag, so a tag opened after text owes nothing.
+    open_html_indents: list[bool] = []
+
+    (
+        ignored_inline_start_pattern,
+        single_line_tag_pattern,
+        tag_unindent_pattern,
+        inline_slt_no_attrs_end_pattern,
+        inline_slt_attrs_end_pattern,
+        inline_slt_no_attrs_pattern,
+        inline_slt_attrs_pattern,
+        tag_unindent_line_pattern,
+        tag_indent_pattern,
+        custom_html_pattern,
+        template_start_pattern,
+        template_indent_pattern,
+        template_unindent_pattern,
+        prefixed_template_tag_indent_pattern,
+    ) = config_patterns(config, _indent_patterns)
+
     def is_html_tag(name: str) -> bool:
         return name.lower() in HTML_TAG_NAMES or bool(
             custom_html_pattern and custom_html_pattern.match(name)
         )
 
+    # a line goes through several of the checks below, and layout templates
+    # repeat lines, so each distinct line is tokenized once. The checks read
+    # the table's columns, and only a tag whose attributes may be formatted
+    # is built into a TagToken.
+    @cache
+    def line_tags(value: str) -> TagTable:
+        return TagTable(value)
+
     def format_html_attributes(value: str) -> str:
         output: list[str] = []
         previous_end = 0
-        for token in tokenize_tags(value):
-            if (
-                token.closing
-                or token.declaration
-                or not is_html_tag(token.name)
-            ):
+        tags = line_tags(value)
+        for index, (name, flags) in enumerate(
+            zip(tags.names, tags.flags, strict=True)
+        ):
+            if flags & (CLOSING | DECLARATION) or not is_html_tag(name):
                 continue
+            token = tags[index]
             leading_start = token.start
             while leading_start and value[leading_start - 1] in " \t":
                 leading_start -= 1
@@ -404,30 +486,23 @@ def indent_html(rawcode: str, config: Config) -> str:
         return "".join(output)
 
     def starts_unclosed_html_tag(item: str) -> bool:
-        stripped_item = item.lstrip()
-        tokens = tokenize_tags(stripped_item)
-        opening = next(tokens, None)
+        tags = line_tags(item)
         if (
-            opening is None
-            or opening.start != 0
-            or opening.closing
-            or opening.declaration
-            or opening.self_closing
-            or opening.name.lower() in HTML_VOID_ELEMENTS
+            not tags
+            or tags.starts[0] != len(item) - len(item.lstrip())
+            or tags.flags[0] & (CLOSING | DECLARATION | SELF_CLOSING)
+            or tags.names[0].lower() in HTML_VOID_ELEMENTS
         ):
             return False
 
-        tag = opening.name.lower()
+        tag = tags.names[0].lower()
         depth = 1
-        for token in tokens:
-            if token.name.lower() != tag:
+        for name, flags in zip(tags.names[1:], tags.flags[1:], strict=True):
+            if name.lower() != tag:
                 continue
-            if token.closing:
+            if flags & CLOSING:
                 depth -= 1
-            elif (
-                not token.self_closing
-                and token.name.lower() not in HTML_VOID_ELEMENTS
-            ):
+            elif not flags & SELF_CLOSING:
                 depth += 1
 
         return depth > 0
@@ -440,25 +515,27 @@ def indent_html(rawcode: str, config: Config) -> str:
         opened = 0
         unclosed_closes = 0
         raw_text_element = ""
-        for token in tokenize_tags(text):
-            name = token.name.lower()
+        tags = line_tags(text)
+        for raw_name, flags in zip(tags.names, tags.flags, strict=True):
+            name = raw_name.lower()
+            closing = flags & CLOSING
             if raw_text_element:
                 # a raw text element holds text, so a "<" in it opens no
                 # tag; only its own end tag leaves the element
-                if not (token.closing and name == raw_text_element):
+                if not (closing and name == raw_text_element):
                     continue
                 raw_text_element = ""
             elif (
-                not token.closing
-                and not token.self_closing
+                not closing
+                and not flags & SELF_CLOSING
                 and name in HTML_RAW_TEXT_ELEMENTS
             ):
                 raw_text_element = name
-            if token.self_closing:
+            if flags & SELF_CLOSING:
                 continue
             if name in HTML_VOID_ELEMENTS or not is_html_tag(name):
                 continue
-            if not token.closing:
+            if not closing:
                 opened += 1
             elif opened:
                 opened -= 1
@@ -466,9 +543,17 @@ def indent_html(rawcode: str, config: Config) -> str:
                 unclosed_closes += 1
         return opened, unclosed_closes
 
-    for item in rawcode_flat_list:
-        is_safe_closing_tag_ = is_safe_closing_tag(config, item)
-        is_ignored_block_opening_ = is_ignored_block_opening(config, item)
+    # most lines can be ruled out of the ignored and script block checks,
+    # which are costly, by the literals they hold
+    for item, features in zip(
+        rawcode_flat_list, line_features(rawcode), strict=True
+    ):
+        is_safe_closing_tag_ = bool(
+            features & MAY_BE_SAFE_CLOSING_TAG
+        ) and is_safe_closing_tag(config, item)
+        is_ignored_block_opening_ = bool(
+            features & MAY_OPEN_IGNORED_BLOCK
+        ) and is_ignored_block_opening(config, item)
         dedent_after = 0
         indent_level_before = indent_level
         opened_html = 0
@@ -486,7 +571,9 @@ def indent_html(rawcode: str, config: Config) -> str:
             is_block_raw = True
             ignored_level += 1
 
-        if is_script_style_block_opening(config, item):
+        if features & MAY_OPEN_SCRIPT_STYLE and is_script_style_block_opening(
+            config, item
+        ):
             in_script_style_tag = True
 
         # Closing tags can trail rendered text; keep the line intact, then
@@ -837,9 +924,16 @@ def indent_html(rawcode: str, config: Config) -> str:
 
         # turn off raw block if we hit end - for one line raw blocks, but not an inline raw
         if (
-            not in_script_style_tag
-            or is_script_style_block_closing(config, item)
-        ) and is_ignored_block_closing(config, item):
+            (
+                not in_script_style_tag
+                or (
+                    features & MAY_CLOSE_SCRIPT_STYLE
+                    and is_script_style_block_closing(config, item)
+                )
+            )
+            and features & MAY_CLOSE_IGNORED_BLOCK
+            and is_ignored_block_closing(config, item)
+        ):
             in_script_style_tag = False
             if not is_safe_closing_tag_:
                 ignored_level -= 1
@@ -870,17 +964,23 @@ def indent_html(rawcode: str, config: Config) -> str:
         tag_size: int,
         leading_space: str,
         *,
-        quote_style: QuoteStyle = QuoteStyle.ALWAYS_DOUBLE,
+        quote_style: QuoteStyle | None = None,
         normalize_string_quotes: bool = False,
     ) -> str:
-        # json.dumps produces relative indentation that must be shifted by
+        # json5 is only imported once a template has set or function tags
+        import json5  # noqa: PLC0415
+        from json5.lib import QuoteStyle  # noqa: PLC0415
+
+        if quote_style is None:
+            quote_style = QuoteStyle.ALWAYS_DOUBLE
+        # json5.dumps produces relative indentation that must be shifted by
         # leading_space; the fallback keeps the absolute indentation already
         # applied by the indent pass, so its lines are joined unshifted.
         joiner = "\n"
         try:
             # try to format the contents as json
-            data = json.loads(contents)
-            contents = json.dumps(
+            data = json5.loads(contents)
+            contents = json5.dumps(
                 data,
                 trailing_commas=False,
                 ensure_ascii=False,
@@ -890,7 +990,7 @@ def indent_html(rawcode: str, config: Config) -> str:
 
             if tag_size + len(contents) >= config.max_line_length:
                 # if the line is too long we can indent the json
-                contents = json.dumps(
+                contents = json5.dumps(
                     data,
                     indent=config.indent_size,
                     trailing_commas=False,
@@ -952,13 +1052,15 @@ def indent_html(rawcode: str, config: Config) -> str:
         tag = match.group(3).strip()
         index = (match.group(6) or "").strip()
         close_bracket = match.group(7)
-        quote_style = QuoteStyle.ALWAYS_DOUBLE
+        quote_style = None
         normalize_string_quotes = False
 
         if config.profile == "jinja":
             outer_quote = _attribute_quote_at(html, match.start(2))
             match outer_quote:
                 case '"':
+                    from json5.lib import QuoteStyle  # noqa: PLC0415
+
                     quote_style = QuoteStyle.ALWAYS_SINGLE
                     normalize_string_quotes = True
                 case "'":
@@ -3,11 +3,11 @@
 from __future__ import annotations
 
 from functools import partial
-from io import StringIO
 from typing import TYPE_CHECKING
 
 import regex as re
 
+from djlint.formatter.embedded import beautify_block
 from djlint.helpers import (
     RE_FLAGS_IS,
     child_of_unformatted_block,
@@ -30,10 +30,6 @@ _SCRIPT_BLOCK_PATTERN: Final = re.compile(
 
 def format_js(html: str, config: Config) -> str:
     """Format javascript inside <script> tags."""
-    import jsbeautifier  # noqa: PLC0415
-    from jsbeautifier.javascript.options import (  # noqa: PLC0415
-        BeautifierOptions,
-    )
 
     def launch_formatter(
         config: Config, html: str, match: re.Match[str]
@@ -47,31 +43,10 @@ def format_js(html: str, config: Config) -> str:
 
         indent = len(match.group(1)) * " "
 
-        # because of the param options for js-beautifier we cannot pass
-        # in a fixed space leading.
-        # so, call formatter twice, once with a fake indent.
-        # check which lines changed (these are the formattable lines)
-        # and add the leading space to them.
-
         js, replacements = mask_template_tags(config, match.group(3))
-
-        config.js_config["indent_level"] = 1
-        opts = BeautifierOptions(config.js_config)
-        beautified_lines = jsbeautifier.beautify(js, opts).splitlines()
-
-        config.js_config["indent_level"] = 2
-        opts = BeautifierOptions(config.js_config)
-        beautified_lines_test = jsbeautifier.beautify(js, opts).splitlines()
-
-        with StringIO() as buf:
-            for line, test in zip(
-                beautified_lines, beautified_lines_test, strict=False
-            ):
-                buf.write("\n")
-                if line != test:
-                    buf.write(indent)
-                buf.write(line)
-            beautified = restore_template_tags(buf.getvalue(), replacements)
+        beautified = restore_template_tags(
+            beautify_block("js", js, config.js_config, indent), replacements
+        )
 
         return match.group(1) + match.group(2) + beautified + "\n" + indent
 
@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import sys
+from array import array
 from dataclasses import dataclass
+from functools import lru_cache
 from types import MappingProxyType
 from typing import TYPE_CHECKING
 
@@ -127,8 +129,8 @@ def _enclosing_template_end(source: str, start: int, lt: int) -> int | None:
     return None
 
 
-def tokenize_tags(source: str) -> Iterator[TagToken]:
-    """Yield tags without normalizing or copying their contents."""
+def _scan_tags(source: str, table: TagTable) -> None:
+    """Add the tags of source to the table."""
     has_templates = "{" in source or "$" in source
     search_from = 0
     while (start := source.find("<", search_from)) >= 0:
@@ -217,19 +219,101 @@ def tokenize_tags(source: str) -> Iterator[TagToken]:
                         and source[attributes_end - 1].isspace()
                     ):
                         attributes_end -= 1
-                yield TagToken(
-                    start=start,
-                    end=cursor + 1,
-                    name_start=name_start,
-                    name_end=name_end,
-                    attributes_end=attributes_end,
-                    name=source[name_start:name_end],
-                    closing=closing,
-                    declaration=declaration,
-                    self_closing=self_closing,
+                table.starts.append(start)
+                table.ends.append(cursor + 1)
+                table.name_starts.append(name_start)
+                table.name_ends.append(name_end)
+                table.attributes_ends.append(attributes_end)
+                table.names.append(sys.intern(source[name_start:name_end]))
+                table.flags.append(
+                    (CLOSING if closing else 0)
+                    | (DECLARATION if declaration else 0)
+                    | (SELF_CLOSING if self_closing else 0)
                 )
                 search_from = cursor + 1
                 break
             cursor += 1
         else:
             return
+
+
+# TagTable.flags bits
+CLOSING: Final = 1
+DECLARATION: Final = 2
+SELF_CLOSING: Final = 4
+
+
+@final
+class TagTable:
+    """The tags of a source, kept column by column.
+
+    Positions and flags are held in arrays instead of one TagToken per tag,
+    so tokenizing allocates little, and the columns can be read directly by
+    code that only needs names or flags. Indexing the table builds the one
+    TagToken asked for, and iterating it builds them all, once.
+    """
+
+    __slots__ = (
+        "_tokens",
+        "attributes_ends",
+        "ends",
+        "flags",
+        "name_ends",
+        "name_starts",
+        "names",
+        "starts",
+    )
+
+    def __init__(self, source: str) -> None:
+        self.starts = array("q")
+        self.ends = array("q")
+        self.name_starts = array("q")
+        self.name_ends = array("q")
+        self.attributes_ends = array("q")
+        self.flags = array("b")
+        # interned, so a name repeated across tags is stored once
+        self.names: list[str] = []
+        self._tokens: tuple[TagToken, ...] | None = None
+        _scan_tags(source, self)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, index: int) -> TagToken:
+        if self._tokens is not None:
+            return self._tokens[index]
+        return self._token(index)
+
+    def __iter__(self) -> Iterator[TagToken]:
+        return iter(self.tokens())
+
+    def tokens(self) -> tuple[TagToken, ...]:
+        """Every tag as a TagToken, built once."""
+        if self._tokens is None:
+            self._tokens = tuple(map(self._token, range(len(self.starts))))
+        return self._tokens
+
+    def _token(self, index: int) -> TagToken:
+        flags = self.flags[index]
+        return TagToken(
+            start=self.starts[index],
+            end=self.ends[index],
+            name_start=self.name_starts[index],
+            name_end=self.name_ends[index],
+            attributes_end=self.attributes_ends[index],
+            name=self.names[index],
+            closing=bool(flags & CLOSING),
+            declaration=bool(flags & DECLARATION),
+            self_closing=bool(flags & SELF_CLOSING),
+        )
+
+
+def tokenize_tags(source: str) -> Iterator[TagToken]:
+    """Yield tags without normalizing or copying their contents."""
+    return iter(TagTable(source))
+
+
+@lru_cache(maxsize=1)
+def document_tags(source: str, /) -> TagTable:
+    """Tokenize a document once for every linter rule that walks its tags."""
+    return TagTable(source)
@@ -6,7 +6,11 @@ from typing import TYPE_CHECKING
 
 from click import echo
 
-from djlint.output import build_relative_path, count_format_errors
+from djlint.output import (
+    build_relative_path,
+    count_format_errors,
+    count_unchecked,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Mapping, Sequence
@@ -33,29 +37,47 @@ def escape_property(data: str) -> str:
 
 
 def print_github_output(
-    config: Config, file_errors: Iterable[ProcessResult], _file_count: int
+    config: Config, file_errors: Iterable[ProcessResult], file_count: int
 ) -> int:
     """Print results as GitHub workflow commands."""
-    lint_error_count = 0
-    format_error_count = 0
-
+    report = GithubReport(config)
     for error in sorted(
         file_errors,
         key=lambda x: next(iter(next(iter(x.values())))),  # type: ignore[call-overload]
     ):
+        report.add(error)
+    return report.finish(file_count)
+
+
+class GithubReport:
+    """GitHub workflow commands, printed one file at a time."""
+
+    __slots__ = ("config", "found")
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.found = 0
+
+    def add(self, error: ProcessResult) -> None:
+        """Print the results of one file."""
+        config = self.config
+        if error.get("skipped"):
+            self.found += count_unchecked(
+                print_skipped(error["skipped"], config), config
+            )
         if error.get("format_message"):
             if config.stdin and config.check:
-                format_error_count += count_format_errors(
-                    error["format_message"]
-                )
+                self.found += count_format_errors(error["format_message"])
             elif not config.stdin:
-                format_error_count += print_format_errors(
+                self.found += print_format_errors(
                     error["format_message"], config
                 )
         if error.get("lint_message"):
-            lint_error_count += print_lint_errors(error["lint_message"], config)
+            self.found += print_lint_errors(error["lint_message"], config)
 
-    return lint_error_count + format_error_count
+    def finish(self, _file_count: int) -> int:
+        """Return the number of problems found."""
+        return self.found
 
 
 def print_lint_errors(
@@ -102,3 +124,18 @@ def print_format_errors(
         echo(f"::error file={filename}::Formatting changes required")
 
     return sum(1 for v in errors.values() if v)
+
+
+def print_skipped(skipped: Mapping[str, str], config: Config) -> int:
+    """Warn about files that were not checked, such as on a timeout."""
+    for path, reason in skipped.items():
+        message = escape_data(f"Skipped: {reason}")
+        if config.stdin:
+            echo(f"::warning::{message}")
+            continue
+        filename = escape_property(
+            build_relative_path(path, config.project_root)
+        )
+        echo(f"::warning file={filename}::{message}")
+
+    return len(skipped)
@@ -3,19 +3,21 @@
 from __future__ import annotations
 
 import itertools
-from bisect import bisect_right
+import threading
+from bisect import bisect_left, bisect_right
 from functools import lru_cache
-from typing import TYPE_CHECKING
+from operator import itemgetter
+from typing import TYPE_CHECKING, final
 
 import regex as re
 
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import document_tags
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
+    from collections.abc import Callable, Iterable
     from typing import Final
 
-    from typing_extensions import TypeVar
+    from typing_extensions import Any, TypeVar
 
     from djlint.settings import Config
     from djlint.types import SpanMatch
@@ -32,10 +34,24 @@ RE_FLAGS_IMX: Final = re.I | re.M | re.X
 RE_FLAGS_ISX: Final = re.I | re.S | re.X
 RE_FLAGS_IMSX: Final = re.I | re.M | re.S | re.X
 
-_SPAN_CACHE_SIZE: Final = 1
 _LINE_CACHE_SIZE: Final = 64
 
 
+def config_patterns(config: Config, build: Callable[[Config], T]) -> T:
+    """Return what build compiles from the config, compiling it once.
+
+    The formatter builds patterns from the config's options. The regex
+    module caches only a few hundred patterns, keyed by their text, so
+    rebuilding them for every file formats and hashes the text again and
+    recompiles the large ones when they fall out of that cache. Kept on the
+    config, they are compiled once per run, and once in each worker.
+    """
+    patterns: T | None = config.formatter_patterns.get(build)
+    if patterns is None:
+        patterns = config.formatter_patterns[build] = build(config)
+    return patterns
+
+
 def _last_item(iterable: Iterable[T], /) -> T | None:
     last = None
     for item in iterable:
@@ -54,6 +70,248 @@ def _inside_non_overlapping_span(
     return span_start <= match_start and match_end <= span_end
 
 
+@final
+class IntervalIndex:
+    """Spans, which may overlap or nest, indexed for containment queries.
+
+    Spans are sorted by start, each next to the furthest end reached by it or
+    any span starting before it. Whether some span covers a range is then a
+    binary search for the last span starting in time, instead of a scan.
+    """
+
+    __slots__ = ("_furthest_ends", "_starts")
+
+    def __init__(self, spans: Iterable[tuple[int, int]]) -> None:
+        ordered = sorted(spans)
+        self._starts = [start for start, _ in ordered]
+        self._furthest_ends = list(
+            itertools.accumulate((end for _, end in ordered), max)
+        )
+
+    def covers(self, start: int, end: int) -> bool:
+        """Whether a span starts at or before start and ends at or after end."""
+        index = bisect_right(self._starts, start) - 1
+        return index >= 0 and self._furthest_ends[index] >= end
+
+    def encloses(self, start: int, end: int) -> bool:
+        """Whether a span starts before start and ends at or after end."""
+        index = bisect_left(self._starts, start) - 1
+        return index >= 0 and self._furthest_ends[index] >= end
+
+
+@final
+class DocumentSpans:
+    """The protected regions of one version of a document.
+
+    Each kind of region is found the first time it is asked about, with one
+    scan of the document, and kept for the matches checked after it. Regions
+    found with a config's patterns are kept per pattern, so a document
+    checked under two configs gets the right ones for each.
+    """
+
+    __slots__ = ("_spans", "html")
+
+    def __init__(self, html: str) -> None:
+        self.html = html
+        self._spans: dict[object, Any] = {}
+
+    def pattern_spans(
+        self, pattern: re.Pattern[str]
+    ) -> tuple[tuple[int, int], ...]:
+        """Spans of the matches of a pattern, in order."""
+        spans = self._spans.get(pattern)
+        if spans is None:
+            spans = self._spans[pattern] = tuple(
+                x.span() for x in pattern.finditer(self.html)
+            )
+        return spans
+
+    def template_blocks(self, config: Config) -> tuple[tuple[int, int], ...]:
+        """Spans of template blocks."""
+        return self.pattern_spans(config.template_blocks_pattern)
+
+    def html_attributes(self) -> tuple[tuple[int, int], ...]:
+        """Spans of the attributes of each html tag."""
+        spans = self._spans.get(None)
+        if spans is None:
+            tags = document_tags(self.html)
+            spans = self._spans[None] = tuple(
+                (name_end, attributes_end)
+                for name_end, attributes_end in zip(
+                    tags.name_ends, tags.attributes_ends, strict=True
+                )
+                if name_end < attributes_end
+            )
+        return spans
+
+    def ignored_linter_blocks(
+        self, config: Config
+    ) -> tuple[tuple[int, int], ...]:
+        """Spans of blocks the linter is told to skip."""
+        return self.pattern_spans(config.ignored_linter_blocks_pattern)
+
+    def ignored_blocks(
+        self,
+        ignored_blocks: re.Pattern[str],
+        ignored_inline_blocks: re.Pattern[str],
+    ) -> IntervalIndex:
+        """Spans of ignored blocks, block and inline."""
+        key = (ignored_blocks, ignored_inline_blocks)
+        spans = self._spans.get(key)
+        if spans is None:
+            spans = self._spans[key] = IntervalIndex(
+                x.span()
+                for x in itertools.chain(
+                    ignored_blocks.finditer(self.html),
+                    ignored_inline_blocks.finditer(self.html),
+                )
+            )
+        return spans
+
+    def unformatted_block_spans(
+        self, config: Config
+    ) -> tuple[tuple[int, int], ...]:
+        """Spans of blocks and comments the formatter leaves alone."""
+        return self.pattern_spans(config.unformatted_blocks_pattern)
+
+    def unformatted_blocks(self, config: Config) -> IntervalIndex:
+        """Spans of blocks the formatter leaves alone, indexed."""
+        key = (config.unformatted_blocks_pattern, IntervalIndex)
+        spans = self._spans.get(key)
+        if spans is None:
+            spans = self._spans[key] = IntervalIndex(
+                self.unformatted_block_spans(config)
+                if config.unformatted_blocks_coarse_pattern.search(self.html)
+                else ()
+            )
+        return spans
+
+    def ignored_rules(
+        self, config: Config
+    ) -> tuple[tuple[int, int, frozenset[str], bool], ...]:
+        """Spans of rule pragmas, the rules each names, and whether it is bare."""
+        patterns = config.ignored_rule_patterns
+        spans = self._spans.get(patterns)
+        if spans is None:
+            rule_spans = []
+            for rule_pattern in patterns:
+                for ignored_match in rule_pattern.finditer(self.html):
+                    ignored_match_start, ignored_match_end = (
+                        ignored_match.span()
+                    )
+                    rule_names = ignored_match.group(1).strip()
+                    rule_spans.append((
+                        ignored_match_start,
+                        ignored_match_end,
+                        frozenset(
+                            x
+                            for x in _RULE_SEPARATOR_PATTERN.split(rule_names)
+                            if x
+                        ),
+                        not rule_names,
+                    ))
+            spans = self._spans[patterns] = tuple(rule_spans)
+        return spans
+
+
+_documents: Final = threading.local()
+
+
+def document_spans(html: str) -> DocumentSpans:
+    """Return the protected regions of a document.
+
+    Each thread keeps the regions of the document it last asked about. The
+    formatter's stages and the linter's rules ask about one document many
+    times in a row, and a stage that rewrites it starts a new one. Threads
+    formatting different files do not evict each other.
+
+    The document is recognized by identity alone. The helpers pass on the
+    string they were given, and comparing the text of another one would
+    cost as much as a scan of it.
+    """
+    spans: DocumentSpans | None = getattr(_documents, "spans", None)
+    if spans is None or spans.html is not html:
+        spans = _documents.spans = DocumentSpans(html)
+    return spans
+
+
+# line_features() bits. A line lacking the bit lacks a literal that every
+# match of the check named by it contains, so it is known to fail that check.
+MAY_OPEN_IGNORED_BLOCK: Final = 1
+MAY_CLOSE_IGNORED_BLOCK: Final = 2
+MAY_OPEN_SCRIPT_STYLE: Final = 4
+MAY_CLOSE_SCRIPT_STYLE: Final = 8
+MAY_BE_SAFE_CLOSING_TAG: Final = 16
+
+# a part of every match of config.ignored_block_opening_pattern and the
+# other line patterns in settings, which are fixed. Nothing here matches a
+# line break, so each match stays on its line, and with one pattern per bit
+# a match hidden by an overlapping one is on a line that has the bit anyway.
+_TEMPLATE_COMMENT_MARKERS: Final = r"{{(?:!--|-?[^\S\n]*/\*)"
+
+
+@lru_cache(maxsize=1)
+def _line_feature_patterns() -> tuple[tuple[re.Pattern[str], int], ...]:
+    """Compiled on first use, as only the formatter needs them."""
+    return (
+        (
+            re.compile(
+                r"<(?:style|script|\?php|!--|pre|textarea)|{[*\#]"
+                r"|{%-?[ ]*(?:blocktrans|schema|javascript|stylesheet|style|filter|comment)|"
+                + _TEMPLATE_COMMENT_MARKERS,
+                re.I,
+                cache_pattern=False,
+            ),
+            MAY_OPEN_IGNORED_BLOCK,
+        ),
+        (
+            re.compile(
+                r"</(?:style|script|pre|textarea)|[*\#]}|\?>|-->|{\#"
+                r"|{%-?[ ]*end(?:filter|comment|blocktrans|schema|javascript|stylesheet|style)|"
+                + _TEMPLATE_COMMENT_MARKERS,
+                re.I,
+                cache_pattern=False,
+            ),
+            MAY_CLOSE_IGNORED_BLOCK,
+        ),
+        (
+            re.compile(r"<(?:style|script)", re.I, cache_pattern=False),
+            MAY_OPEN_SCRIPT_STYLE,
+        ),
+        (
+            re.compile(r"</(?:style|script)", re.I, cache_pattern=False),
+            MAY_CLOSE_SCRIPT_STYLE,
+        ),
+        (
+            re.compile(
+                r"</(?:style|script)|{\#|{%[ ]*endcomment|"
+                + _TEMPLATE_COMMENT_MARKERS,
+                re.I,
+                cache_pattern=False,
+            ),
+            MAY_BE_SAFE_CLOSING_TAG,
+        ),
+    )
+
+
+def line_features(html: str) -> list[int]:
+    """Return the MAY_ bits of each line of the html.
+
+    Each literal is searched for in the whole html at once, instead of
+    running every line check on every line.
+    """
+    line_starts = list(
+        itertools.accumulate(
+            (len(line) + 1 for line in html.split("\n")), initial=0
+        )
+    )
+    features = [0] * (len(line_starts) - 1)
+    for pattern, feature in _line_feature_patterns():
+        for match in pattern.finditer(html):
+            features[bisect_right(line_starts, match.start()) - 1] |= feature
+    return features
+
+
 @lru_cache(maxsize=_LINE_CACHE_SIZE)
 def is_ignored_block_opening(config: Config, item: str) -> bool:
     """Find ignored group opening.
@@ -104,6 +362,9 @@ def inside_protected_trans_block(
     A valid ignored group closing tag will not be part of a
     single line block.
 
+    Only the html up to the end of the match is considered. The trans blocks
+    are found once per document, and those ending by then are looked up.
+
     True = non indentable > inside ignored trans block
     False = indentable > either inside a trans trimmed block, or somewhere else, but not a trans non trimmed :)
     """
@@ -114,12 +375,18 @@ def inside_protected_trans_block(
     if not close_block:
         return False
 
-    non_trimmed = _last_item(config.ignored_trans_blocks_pattern.finditer(html))
+    spans = document_spans(html)
+    match_end = match.end()
+    non_trimmed = _last_match_by(
+        spans, config.ignored_trans_blocks_pattern, match_end
+    )
 
-    trimmed = _last_item(config.trans_trimmed_blocks_pattern.finditer(html))
+    trimmed = _last_match_by(
+        spans, config.trans_trimmed_blocks_pattern, match_end
+    )
 
     # who is max?
-    if non_trimmed and (not trimmed or non_trimmed.end() > trimmed.end()):
+    if non_trimmed and (not trimmed or non_trimmed[1] > trimmed[1]):
         # non trimmed!
         # check that this is not an inline block.
         non_trimmed_inline = bool(
@@ -127,23 +394,43 @@ def inside_protected_trans_block(
         )
 
         if non_trimmed_inline:
-            last_index = non_trimmed.end()  # get the last index. The ignored opening should start after this.
+            last_index = non_trimmed[
+                1
+            ]  # get the last index. The ignored opening should start after this.
 
-            return bool(
-                config.ignored_trans_blocks_closing_pattern.search(
-                    html[last_index:]
-                )
+            closing_blocks = spans.pattern_spans(
+                config.ignored_trans_blocks_closing_pattern
+            )
+            index = bisect_left(closing_blocks, (last_index,))
+            return (
+                index < len(closing_blocks)
+                and closing_blocks[index][1] <= match_end
             )
 
-        return close_block.end() <= non_trimmed.end()
+        return close_block.end() <= non_trimmed[1]
 
     if trimmed:
         # inside a trimmed block, we can return true to continue as if
         # this is a indentable block
-        return close_block.end() > trimmed.end()
+        return close_block.end() > trimmed[1]
     return False
 
 
+def _last_match_by(
+    spans: DocumentSpans, pattern: re.Pattern[str], end: int, /
+) -> tuple[int, int] | None:
+    """Span of the last match of a pattern in the html up to end."""
+    matches = spans.pattern_spans(pattern)
+    # the matches of one pattern do not overlap, so their ends are in order
+    index = bisect_right(matches, end, key=itemgetter(1)) - 1
+    if index + 1 < len(matches) and matches[index + 1][0] < end:
+        # a match running past the end, such as a block left open, hides
+        # what the html cut off there would match instead
+        last = _last_item(pattern.finditer(spans.html, 0, end))
+        return last.span() if last else None
+    return matches[index] if index >= 0 else None
+
+
 @lru_cache(maxsize=_LINE_CACHE_SIZE)
 def is_ignored_block_closing(config: Config, item: str) -> bool:
     """Find ignored group closing.
@@ -192,22 +479,11 @@ def is_safe_closing_tag(config: Config, item: str) -> bool:
     return bool(config.safe_closing_tag_pattern.search(item[last_index:]))
 
 
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _inside_template_block(
-    html: str, /, *, template_blocks: re.Pattern[str]
-) -> tuple[tuple[int, int], ...]:
-    return tuple(x.span() for x in template_blocks.finditer(html))
-
-
 def inside_template_block(config: Config, html: str, match: SpanMatch) -> bool:
     """Check if a re.Match is inside of a template block."""
     match_start, match_end = match.span()
     return _inside_non_overlapping_span(
-        _inside_template_block(
-            html, template_blocks=config.template_blocks_pattern
-        ),
-        match_start,
-        match_end,
+        document_spans(html).template_blocks(config), match_start, match_end
     )
 
 
@@ -256,17 +532,22 @@ def restore_template_tags(
     return html
 
 
-_UNFORMATTED_BLOCK_PATTERN: Final = re.compile(
-    r"""
-          <!--\s*djlint\:off\s*-->.*?(?:<!--\s*djlint\:on\s*-->|\Z)
-        | {\#\s*djlint\:\s*off\s*\#}.*?(?:{\#\s*djlint\:\s*on\s*\#}|\Z)
-        | {%\s*comment\s*%\}\s*djlint\:off\s*\{%\s*endcomment\s*%\}.*?(?:{%\s*comment\s*%\}\s*djlint\:on\s*\{%\s*endcomment\s*%\}|\Z)
-        | {{!--\s*djlint\:off\s*--}}.*?(?:{{!--\s*djlint\:on\s*--}}|\Z)
-        | {{-?\s*/\*\s*djlint\:off\s*\*/\s*-?}}.*?(?:{{-?\s*/\*\s*djlint\:on\s*\*/\s*-?}}|\Z)
-    """,
-    RE_FLAGS_IMSX,
-    cache_pattern=False,
-)
+@lru_cache(maxsize=1)
+def _unformatted_block_pattern() -> re.Pattern[str]:
+    """Compiled on first use, by a template that has djlint:off blocks."""
+    return re.compile(
+        r"""
+              <!--\s*djlint\:off\s*-->.*?(?:<!--\s*djlint\:on\s*-->|\Z)
+            | {\#\s*djlint\:\s*off\s*\#}.*?(?:{\#\s*djlint\:\s*on\s*\#}|\Z)
+            | {%\s*comment\s*%\}\s*djlint\:off\s*\{%\s*endcomment\s*%\}.*?(?:{%\s*comment\s*%\}\s*djlint\:on\s*\{%\s*endcomment\s*%\}|\Z)
+            | {{!--\s*djlint\:off\s*--}}.*?(?:{{!--\s*djlint\:on\s*--}}|\Z)
+            | {{-?\s*/\*\s*djlint\:off\s*\*/\s*-?}}.*?(?:{{-?\s*/\*\s*djlint\:on\s*\*/\s*-?}}|\Z)
+        """,
+        RE_FLAGS_IMSX,
+        cache_pattern=False,
+    )
+
+
 _OPENING_HTML_TAG_PATTERN: Final = re.compile(r"</?\w", cache_pattern=False)
 _RULE_SEPARATOR_PATTERN: Final = re.compile(r"\s|,", cache_pattern=False)
 
@@ -300,7 +581,7 @@ def mask_unformatted_blocks(html: str) -> tuple[str, list[tuple[str, str]]]:
         replacements.append((marker, replacement))
         return marker
 
-    return (_UNFORMATTED_BLOCK_PATTERN.sub(replace, html), replacements)
+    return (_unformatted_block_pattern().sub(replace, html), replacements)
 
 
 def restore_unformatted_blocks(
@@ -336,72 +617,38 @@ def restore_unformatted_blocks(
     return html
 
 
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _html_attribute_spans(html: str, /) -> tuple[tuple[int, int], ...]:
-    return tuple(
-        (token.name_end, token.attributes_end)
-        for token in tokenize_tags(html)
-        if token.name_end < token.attributes_end
-    )
-
-
 def inside_html_attribute(html: str, match: re.Match[str]) -> bool:
     """Check if a re.Match is inside of an html attribute."""
     match_start, match_end = match.span()
     return _inside_non_overlapping_span(
-        _html_attribute_spans(html), match_start, match_end
+        document_spans(html).html_attributes(), match_start, match_end
     )
 
 
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _inside_ignored_linter_block(
-    html: str, /, *, ignored_linter_blocks: re.Pattern[str]
-) -> tuple[tuple[int, int], ...]:
-    return tuple(x.span() for x in ignored_linter_blocks.finditer(html))
-
-
 def inside_ignored_linter_block(
     config: Config, html: str, match: SpanMatch
 ) -> bool:
     """Check if a re.Match is inside of a ignored linter block."""
     match_start, match_end = match.span()
     return _inside_non_overlapping_span(
-        _inside_ignored_linter_block(
-            html, ignored_linter_blocks=config.ignored_linter_blocks_pattern
-        ),
+        document_spans(html).ignored_linter_blocks(config),
         match_start,
         match_end,
     )
 
 
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _inside_ignored_block(
-    html: str,
-    /,
-    *,
-    ignored_blocks: re.Pattern[str],
-    ignored_inline_blocks: re.Pattern[str],
-) -> tuple[tuple[int, int], ...]:
-    return tuple(
-        x.span()
-        for x in itertools.chain(
-            ignored_blocks.finditer(html), ignored_inline_blocks.finditer(html)
-        )
-    )
-
-
 def inside_ignored_block_span(
     config: Config, html: str, start: int, end: int
 ) -> bool:
     """Whether a span of the html lies inside an ignored block."""
-    for ignored_match_start, ignored_match_end in _inside_ignored_block(
-        html,
-        ignored_blocks=config.ignored_blocks_pattern,
-        ignored_inline_blocks=config.ignored_inline_blocks_ix_pattern,
-    ):
-        if ignored_match_start <= start and end <= ignored_match_end:
-            return True
-    return False
+    return (
+        document_spans(html)
+        .ignored_blocks(
+            config.ignored_blocks_pattern,
+            config.ignored_inline_blocks_ix_pattern,
+        )
+        .covers(start, end)
+    )
 
 
 def inside_ignored_block(config: Config, html: str, match: SpanMatch) -> bool:
@@ -409,45 +656,25 @@ def inside_ignored_block(config: Config, html: str, match: SpanMatch) -> bool:
     return inside_ignored_block_span(config, html, *match.span())
 
 
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _child_of_unformatted_block(
-    html: str,
-    /,
-    *,
-    unformatted_blocks: re.Pattern[str],
-    unformatted_blocks_coarse: re.Pattern[str],
-) -> tuple[tuple[int, int], ...]:
-    if not unformatted_blocks_coarse.search(html):
-        return ()
-    return tuple(x.span() for x in unformatted_blocks.finditer(html))
-
-
 def child_of_unformatted_block(
     config: Config, html: str, match: SpanMatch
 ) -> bool:
     """Do not add whitespace if the tag is in a non indent block."""
-    match_start, match_end = match.span()
-    for ignored_match_start, ignored_match_end in _child_of_unformatted_block(
-        html,
-        unformatted_blocks=config.unformatted_blocks_pattern,
-        unformatted_blocks_coarse=config.unformatted_blocks_coarse_pattern,
-    ):
-        if ignored_match_start < match_start and match_end <= ignored_match_end:
-            return True
-    return False
+    return (
+        document_spans(html).unformatted_blocks(config).encloses(*match.span())
+    )
 
 
 def child_of_ignored_block(config: Config, html: str, match: SpanMatch) -> bool:
     """Do not add whitespace if the tag is in a non indent block."""
-    match_start, match_end = match.span()
-    for ignored_match in itertools.chain(
-        config.ignored_blocks_pattern.finditer(html),
-        config.ignored_inline_blocks_ix_pattern.finditer(html),
-    ):
-        ignored_match_start, ignored_match_end = ignored_match.span()
-        if ignored_match_start < match_start and match_end <= ignored_match_end:
-            return True
-    return False
+    return (
+        document_spans(html)
+        .ignored_blocks(
+            config.ignored_blocks_pattern,
+            config.ignored_inline_blocks_ix_pattern,
+        )
+        .encloses(*match.span())
+    )
 
 
 def overlaps_ignored_block(config: Config, html: str, match: SpanMatch) -> bool:
@@ -457,40 +684,18 @@ def overlaps_ignored_block(config: Config, html: str, match: SpanMatch) -> bool:
     formatter's stop short of it so it can still be indented.
     """
     match_start, match_end = match.span()
-    for ignored_match_start, ignored_match_end in _inside_ignored_block(
-        html,
-        ignored_blocks=config.lint_ignored_blocks_pattern,
-        ignored_inline_blocks=config.ignored_inline_blocks_ix_pattern,
-    ):
-        # don't require the match to be fully inside the ignored block.
-        # poorly build html will probably span ignored blocks and should be ignored.
-        # spans are half open, so a match that only touches an ignored block
-        # (e.g. `{% if x %}{# comment #}`) starts and ends outside of it.
-        if (ignored_match_start <= match_start < ignored_match_end) or (
-            ignored_match_start < match_end <= ignored_match_end
-        ):
-            return True
-    return False
-
-
-@lru_cache(maxsize=_SPAN_CACHE_SIZE)
-def _inside_ignored_rule(
-    html: str, /, *, ignored_rules: tuple[re.Pattern[str], ...]
-) -> tuple[tuple[int, int, frozenset[str], bool], ...]:
-    rule_spans = []
-    for rule_pattern in ignored_rules:
-        for ignored_match in rule_pattern.finditer(html):
-            ignored_match_start, ignored_match_end = ignored_match.span()
-            rule_names = ignored_match.group(1).strip()
-            rule_spans.append((
-                ignored_match_start,
-                ignored_match_end,
-                frozenset(
-                    x for x in _RULE_SEPARATOR_PATTERN.split(rule_names) if x
-                ),
-                not rule_names,
-            ))
-    return tuple(rule_spans)
+    ignored_blocks = document_spans(html).ignored_blocks(
+        config.lint_ignored_blocks_pattern,
+        config.ignored_inline_blocks_ix_pattern,
+    )
+    # don't require the match to be fully inside the ignored block.
+    # poorly build html will probably span ignored blocks and should be ignored.
+    # spans are half open, so a match that only touches an ignored block
+    # (e.g. `{% if x %}{# comment #}`) starts and ends outside of it: a block
+    # has to hold the match's first character or its last.
+    return ignored_blocks.covers(
+        match_start, match_start + 1
+    ) or ignored_blocks.covers(match_end - 1, match_end)
 
 
 def inside_ignored_rule(
@@ -503,7 +708,7 @@ def inside_ignored_rule(
         ignored_match_end,
         ignored_rule_names,
         ignore_all_rules,
-    ) in _inside_ignored_rule(html, ignored_rules=config.ignored_rule_patterns):
+    ) in document_spans(html).ignored_rules(config):
         # spans are half open, so a match ending exactly where a pragma starts
         # is outside of it. a bare pragma ignores every rule, so it only covers
         # matches ending inside it; a match merely wrapping one (e.g. the whole
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import importlib
+import sys
+from bisect import bisect_right
 from collections.abc import Sequence
+from dataclasses import dataclass
 from types import MappingProxyType
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, overload
 
 import regex as re
 
+from djlint import profiling
 from djlint.helpers import (
     inside_ignored_linter_block,
     inside_ignored_rule,
@@ -16,11 +20,18 @@ from djlint.helpers import (
     overlaps_ignored_block,
 )
 
+if sys.version_info >= (3, 11):
+    from typing import final
+else:
+    from typing_extensions import final
+
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Callable, Iterable, Iterator, Mapping
     from pathlib import Path
     from typing import Final
 
+    from typing_extensions import Any
+
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -39,7 +50,21 @@ flags: Final = MappingProxyType({
     "re.L": re.L,
     "re.LOCALE": re.LOCALE,
 })
-_LINE_PATTERN: Final = re.compile(r"(?:.*\n)|(?:[^\n]+$)", cache_pattern=False)
+# every tag name in a document, for rules that only match given tags
+_TAG_NAME_PATTERN: Final = re.compile(r"<(\w+)", cache_pattern=False)
+# patterns that open with a tag name or a group of them: <img, <(?:a|div)
+_TAG_GROUP_PREFIX: Final = re.compile(
+    r"<\((?:\?:)?([a-zA-Z][a-zA-Z0-9]*(?:\|[a-zA-Z][a-zA-Z0-9]*)*)\)(?![?*+{])",
+    cache_pattern=False,
+)
+_TAG_NAME_PREFIX: Final = re.compile(
+    r"<([a-zA-Z][a-zA-Z0-9]*)(?![?*+{])", cache_pattern=False
+)
+# inline flags such as (?i) can change how the rest of a pattern reads
+_INLINE_FLAGS_PATTERN: Final = re.compile(
+    r"\(\?[a-zA-Z-]+[:)]", cache_pattern=False
+)
+_PATTERN_SPECIAL_CHARACTERS: Final = frozenset(".^$*+?{}[]|()\\")
 
 
 def build_flags(flag_list: str | int) -> int:
@@ -53,94 +78,415 @@ def build_flags(flag_list: str | int) -> int:
     return combined_flags
 
 
-def get_line(start: int, line_ends: Sequence[Mapping[str, int]]) -> str:
+@final
+class LineIndex:
+    """Where each line of a document starts, to find the line of an offset.
+
+    python_module rules receive it as line_ends, and it still reads as the
+    list of {"start": ..., "end": ...} dicts they were given before, with
+    indexing, slicing and index() included.
+    """
+
+    __slots__ = ("_count", "_length", "starts")
+
+    def __init__(self, html: str) -> None:
+        starts = [0]
+        end = html.find("\n")
+        while end != -1:
+            starts.append(end + 1)
+            end = html.find("\n", end + 1)
+        self.starts = starts
+        self._length = len(html)
+        # a final newline ends the last line rather than starting another
+        self._count = len(starts) - (starts[-1] == len(html))
+
+    def __len__(self) -> int:
+        return self._count
+
+    @overload
+    def __getitem__(self, index: int) -> dict[str, int]: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[dict[str, int]]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> dict[str, int] | list[dict[str, int]]:
+        if isinstance(index, slice):
+            return [self[x] for x in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            msg = "line index out of range"
+            raise IndexError(msg)
+        end = (
+            self.starts[index + 1]
+            if index + 1 < len(self.starts)
+            else self._length
+        )
+        return {"start": self.starts[index], "end": end}
+
+    def __iter__(self) -> Iterator[dict[str, int]]:
+        return (self[index] for index in range(self._count))
+
+    def index(self, value: Any, start: int = 0, stop: int | None = None) -> int:
+        """Return the number of a line dict, found by its start."""
+        if isinstance(value, dict) and isinstance(value.get("start"), int):
+            position = bisect_right(self.starts, value["start"]) - 1
+            if (
+                position in range(self._count)[start:stop]
+                and self[position] == value
+            ):
+                return position
+        msg = f"{value!r} is not in the lines"
+        raise ValueError(msg)
+
+    def location(self, offset: int) -> str:
+        """Return the 1-based line and 0-based column of an offset."""
+        index = bisect_right(self.starts, offset) - 1
+        return f"{index + 1}:{offset - self.starts[index]}"
+
+
+def get_line(
+    start: int, line_ends: LineIndex | Sequence[Mapping[str, int]]
+) -> str:
     """Get the line number and index of match."""
+    if isinstance(line_ends, LineIndex):
+        return line_ends.location(start)
+
+    # a list of line dicts, as built by rules written for older versions
     line = next(pair for pair in line_ends if pair["end"] > start)
 
     return "{}:{}".format(line_ends.index(line) + 1, start - line["start"])
 
 
+def _is_quantifier(pattern: str, index: int) -> bool:
+    char = pattern[index : index + 1]
+    return char in {"?", "*", "+"} or (
+        char == "{" and pattern[index + 1 : index + 2] in set("0123456789,")
+    )
+
+
+def _has_top_level_alternation(pattern: str) -> bool:
+    """Whether the pattern is an alternation outside of any group."""
+    depth = 0
+    index = 0
+    in_class = False
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+            # a ] straight after [ or [^ is part of the class
+            if pattern[index + 1 : index + 2] == "^":
+                index += 1
+            if pattern[index + 1 : index + 2] == "]":
+                index += 1
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == "|" and depth == 0:
+            return True
+        index += 1
+    return False
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the text every match of the pattern starts with."""
+    literal: list[str] = []
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            escaped = pattern[index + 1 : index + 2]
+            if not escaped or escaped.isalnum():
+                break
+            token, width = escaped, 2
+        elif char == "{" and not _is_quantifier(pattern, index):
+            token, width = char, 1
+        elif char in _PATTERN_SPECIAL_CHARACTERS and char != "}":
+            break
+        else:
+            token, width = char, 1
+        if _is_quantifier(pattern, index + width):
+            # the quantifier may drop this character from a match
+            break
+        literal.append(token)
+        index += width
+    return "".join(literal)
+
+
+@final
+@dataclass(
+    repr=False,
+    eq=False,
+    frozen=True,
+    match_args=False,
+    kw_only=True,
+    slots=True,
+)
+class RulePattern:
+    """A compiled rule pattern, and what a document needs for it to match.
+
+    Most rules look for one or a few tags, or for template tags. A document
+    that has none of those cannot match, and the pattern is skipped without
+    scanning the document.
+    """
+
+    pattern: re.Pattern[str]
+    # text a match starts with, checked with a plain substring search
+    literals: tuple[str, ...]
+    # lowercase tag names a case-insensitive match starts with
+    tag_names: tuple[str, ...]
+
+    @classmethod
+    def build(cls, source: str, flags: int) -> RulePattern:
+        """Compile a pattern and work out what a match starts with."""
+        literals: tuple[str, ...] = ()
+        tag_names: tuple[str, ...] = ()
+        if not (
+            flags & re.X
+            or _INLINE_FLAGS_PATTERN.search(source)
+            or _has_top_level_alternation(source)
+        ):
+            tag_prefix = _TAG_GROUP_PREFIX.match(
+                source
+            ) or _TAG_NAME_PREFIX.match(source)
+            if tag_prefix and flags & re.I:
+                tag_names = tuple(
+                    x.lower() for x in tag_prefix.group(1).split("|")
+                )
+            elif tag_prefix:
+                literals = tuple(
+                    f"<{x}" for x in tag_prefix.group(1).split("|")
+                )
+            else:
+                literal = _literal_prefix(source)
+                # a case-insensitive literal cannot be searched for as is
+                if literal and not (
+                    flags & re.I and literal.lower() != literal.upper()
+                ):
+                    literals = (literal,)
+
+        return cls(
+            pattern=re.compile(source, flags),
+            literals=literals,
+            tag_names=tag_names,
+        )
+
+    def may_match(self, html: str, tag_names: frozenset[str] | None) -> bool:
+        """Whether the document has what a match of this pattern starts with.
+
+        tag_names is None when the document has tag names that are not
+        ascii, which case-insensitive matching could fold onto ascii ones.
+        """
+        if self.tag_names:
+            return tag_names is None or any(
+                x.startswith(self.tag_names) for x in tag_names
+            )
+        if self.literals:
+            return any(x in html for x in self.literals)
+        return True
+
+
+@final
+@dataclass(
+    repr=False,
+    eq=False,
+    frozen=True,
+    match_args=False,
+    kw_only=True,
+    slots=True,
+)
+class CompiledRule:
+    """A linter rule with its patterns compiled or its module imported."""
+
+    name: str
+    message: str
+    rule: Mapping[str, Any]
+    patterns: tuple[RulePattern, ...]
+    run: Callable[..., object] | None
+
+
+@final
+class RuleSet:
+    """The linter rules of a config, compiled once and reused for each file.
+
+    Rules sharing a pattern and flags, such as the django and jinja versions
+    of a rule, share one compiled pattern and its matches.
+    """
+
+    __slots__ = ("per_file_ignores", "rules")
+
+    def __init__(
+        self,
+        linter_rules: Iterable[Mapping[str, Any]],
+        per_file_ignores: Mapping[str, str],
+    ) -> None:
+        compiled: dict[tuple[str, int], RulePattern] = {}
+        rules = []
+        for item in linter_rules:
+            rule = item["rule"]
+            run = None
+            patterns: tuple[RulePattern, ...] = ()
+            if "python_module" in rule:
+                run = importlib.import_module(rule["python_module"]).run
+            else:
+                rule_flags = build_flags(rule.get("flags", "re.S"))
+                for source in rule["patterns"]:
+                    if (source, rule_flags) not in compiled:
+                        compiled[source, rule_flags] = RulePattern.build(
+                            source, rule_flags
+                        )
+                patterns = tuple(
+                    compiled[source, rule_flags] for source in rule["patterns"]
+                )
+            rules.append(
+                CompiledRule(
+                    name=rule["name"],
+                    message=rule["message"],
+                    rule=rule,
+                    patterns=patterns,
+                    run=run,
+                )
+            )
+        self.rules = tuple(rules)
+        self.per_file_ignores = tuple(
+            (
+                re.compile(pattern, re.X),
+                frozenset(x.strip() for x in codes.split(",")),
+            )
+            for pattern, codes in per_file_ignores.items()
+        )
+
+    def ignored_rules(self, filepath: str) -> set[str]:
+        """Return the rules per_file_ignores turns off for this file."""
+        ignored_rules: set[str] = set()
+        for pattern, codes in self.per_file_ignores:
+            if pattern.search(filepath):
+                ignored_rules.update(codes)
+        return ignored_rules
+
+
+def compile_rules(config: Config) -> RuleSet:
+    """Return the config's compiled rules, compiling them on first use."""
+    if config.compiled_rules is None:
+        config.compiled_rules = RuleSet(
+            config.linter_rules, config.per_file_ignores
+        )
+    return config.compiled_rules
+
+
+def document_tag_names(html: str) -> frozenset[str] | None:
+    """Lowercase names of the tags in a document."""
+    names = frozenset(_TAG_NAME_PATTERN.findall(html))
+    if not all(x.isascii() for x in names):
+        return None
+    return frozenset(x.lower() for x in names)
+
+
 def linter(
     config: Config, html: str, filename: str, filepath: str
 ) -> dict[str, list[LintError]]:
     """Lint a html string."""
     errors: dict[str, list[LintError]] = {filename: []}
-    # build list of line ends for file
-    line_ends = [
-        {"start": m.start(), "end": m.end()}
-        for m in _LINE_PATTERN.finditer(html)
-    ]
-
-    ignored_rules: set[str] = set()
+    line_ends = LineIndex(html)
 
-    # remove ignored rules for file
-    for pattern, rules in config.per_file_ignores.items():
-        if re.search(pattern, filepath, flags=re.X):
-            ignored_rules.update(x.strip() for x in rules.split(","))
-
-    for rule in config.linter_rules:
-        rule = rule["rule"]  # noqa: PLW2901
+    rule_set = compile_rules(config)
+    ignored_rules = rule_set.ignored_rules(filepath)
+    tag_names = document_tag_names(html)
+    pattern_matches: dict[re.Pattern[str], list[re.Match[str]]] = {}
 
+    for rule in rule_set.rules:
         # skip ignored rules
-        if rule["name"] in ignored_rules:
+        if rule.name in ignored_rules:
             continue
 
-        # rule based on python module
-        if "python_module" in rule:
-            rule_module = importlib.import_module(rule["python_module"])
-            module_errors = rule_module.run(
-                rule=rule,
-                config=config,
-                html=html,
-                filepath=filepath,
-                line_ends=line_ends,
-            )
-            if not isinstance(module_errors, Sequence):
-                msg = (
-                    f"Error: {rule['name']} python_module run() should return"
-                    " a sequence of dict with keys: code, line, match, message."
+        with profiling.rule(rule.name):
+            # rule based on python module
+            if rule.run is not None:
+                module_errors = rule.run(
+                    rule=rule.rule,
+                    config=config,
+                    html=html,
+                    filepath=filepath,
+                    line_ends=line_ends,
                 )
-                raise AssertionError(msg)
-            errors[filename].extend(module_errors)
+                if not isinstance(module_errors, Sequence):
+                    msg = (
+                        f"Error: {rule.name} python_module run() should"
+                        " return a sequence of dict with keys: code, line,"
+                        " match, message."
+                    )
+                    raise AssertionError(msg)
+                errors[filename].extend(module_errors)
 
-        # rule based on patterns
-        else:
-            for pattern in rule["patterns"]:
-                for match in re.finditer(
-                    pattern, html, flags=build_flags(rule.get("flags", "re.S"))
-                ):
-                    if (
-                        not overlaps_ignored_block(config, html, match)
-                        # html-like content inside a template tag, e.g. a
-                        # string argument, is not part of the document.
-                        # rules that target template syntax itself match
-                        # starting at the tag delimiters and still apply.
-                        and not (
-                            not match.group().startswith(("{%", "{{"))
-                            and inside_template_block(config, html, match)
+            # rule based on patterns
+            else:
+                for rule_pattern in rule.patterns:
+                    if not rule_pattern.may_match(html, tag_names):
+                        continue
+                    matches = pattern_matches.get(rule_pattern.pattern)
+                    if matches is None:
+                        matches = pattern_matches[rule_pattern.pattern] = list(
+                            rule_pattern.pattern.finditer(html)
                         )
-                        and not inside_ignored_rule(
-                            config, html, match, rule["name"]
-                        )
-                        and not inside_ignored_linter_block(config, html, match)
-                    ):
-                        errors[filename].append({
-                            "code": rule["name"],
-                            "line": get_line(match.start(), line_ends),
-                            "match": match.group().strip()[:20],
-                            "message": rule["message"],
-                        })
+                    for match in matches:
+                        if (
+                            not overlaps_ignored_block(config, html, match)
+                            # html-like content inside a template tag, e.g. a
+                            # string argument, is not part of the document.
+                            # rules that target template syntax itself match
+                            # starting at the tag delimiters and still apply.
+                            and not (
+                                not match.group().startswith(("{%", "{{"))
+                                and inside_template_block(config, html, match)
+                            )
+                            and not inside_ignored_rule(
+                                config, html, match, rule.name
+                            )
+                            and not inside_ignored_linter_block(
+                                config, html, match
+                            )
+                        ):
+                            errors[filename].append({
+                                "code": rule.name,
+                                "line": get_line(match.start(), line_ends),
+                                "match": match.group().strip()[:20],
+                                "message": rule.message,
+                            })
 
     # remove duplicate matches
     for filename, error_dict in errors.items():  # noqa: PLR1704
-        unique_errors = []
-        for dict_ in error_dict:
-            if dict_ not in unique_errors:
-                unique_errors.append(dict_)
-        errors[filename] = unique_errors
+        errors[filename] = _unique_errors(error_dict)
     return errors
 
 
+def _unique_errors(errors: Sequence[LintError]) -> list[LintError]:
+    """Drop repeated errors, keeping the first of each in place.
+
+    Errors are keyed by their items, so a python_module rule returning
+    extra keys is still compared on all of them.
+    """
+    try:
+        return list(
+            {frozenset(error.items()): error for error in errors}.values()
+        )
+    except TypeError:
+        # a python_module rule returned an unhashable value
+        unique_errors: list[LintError] = []
+        for error in errors:
+            if error not in unique_errors:
+                unique_errors.append(error)
+        return unique_errors
+
+
 def lint_file(config: Config, this_file: Path) -> dict[str, list[LintError]]:
     """Check file for formatting errors."""
     filename = str(this_file)
@@ -44,82 +44,133 @@ def print_output(
     config: Config, file_errors: Iterable[ProcessResult], file_count: int
 ) -> int:
     """Print results to console."""
-    file_quantity = build_quantity(file_count)
-    # format errors
-    reformat_success_message = ""
-    lint_success_message = ""
-    lint_error_count = 0
-    format_error_count = 0
-    print_blanks = not config.stdin and not config.quiet
-
-    if print_blanks:
-        echo()
-
+    report = ConsoleReport(config)
     for error in sorted(
         file_errors,
         key=lambda x: next(iter(next(iter(x.values())))),  # type: ignore[call-overload]
     ):
+        report.add(error)
+    return report.finish(file_count)
+
+
+class ConsoleReport:
+    """Console output, printed one file at a time as results come in.
+
+    Only the counts and the codes for --statistics are kept, so a run
+    streaming its results does not hold on to them.
+    """
+
+    __slots__ = (
+        "codes",
+        "config",
+        "format_error_count",
+        "lint_error_count",
+        "skipped_count",
+    )
+
+    def __init__(self, config: Config) -> None:
+        self.config = config
+        self.lint_error_count = 0
+        self.format_error_count = 0
+        self.skipped_count = 0
+        self.codes: Counter[str] = Counter()
+
+        if self._print_blanks:
+            echo()
+
+    @property
+    def _print_blanks(self) -> bool:
+        return not self.config.stdin and not self.config.quiet
+
+    def add(self, error: ProcessResult) -> None:
+        """Print the results of one file."""
+        config = self.config
+        if error.get("skipped"):
+            self.skipped_count += build_skipped_output(error["skipped"], config)
+
         if error.get("format_message"):
             if config.stdin and config.check:
-                format_error_count += count_format_errors(
+                self.format_error_count += count_format_errors(
                     error["format_message"]
                 )
             elif not config.stdin:
                 # reformat message
-                format_error_count += build_check_output(
+                self.format_error_count += build_check_output(
                     error["format_message"], config
                 )
 
         if error.get("lint_message"):
             # lint message
-            lint_error_count += build_output(error["lint_message"], config)
+            self.lint_error_count += build_output(error["lint_message"], config)
+            if config.statistics:
+                self.codes.update(
+                    x["code"]
+                    for x in next(iter(error["lint_message"].values()))
+                )
+
+    def finish(self, file_count: int) -> int:
+        """Print the summary and return the number of problems found."""
+        config = self.config
+        file_quantity = build_quantity(file_count)
 
-    if config.statistics and config.lint:
-        build_stats_output(
-            tuple(x.get("lint_message") for x in file_errors), config
+        if config.statistics and config.lint and file_count:
+            print_stats(self.codes, config)
+
+        tense_message = (
+            build_quantity(self.format_error_count) + " would be"
+            if config.check
+            else build_quantity_tense(self.format_error_count)
         )
+        reformat_success_message = f"{tense_message} updated."
 
-    tense_message = (
-        build_quantity(format_error_count) + " would be"
-        if config.check
-        else build_quantity_tense(format_error_count)
-    )
-    reformat_success_message = f"{tense_message} updated."
+        error_case = "error" if self.lint_error_count == 1 else "errors"
+        lint_success_message = (
+            f"Linted {file_quantity}, found {self.lint_error_count}"
+            f" {error_case}."
+        )
 
-    error_case = "error" if lint_error_count == 1 else "errors"
-    lint_success_message += (
-        f"Linted {file_quantity}, found {lint_error_count} {error_case}."
-    )
+        if self._print_blanks:
+            echo()
 
-    if print_blanks:
-        echo()
+        if (
+            not config.quiet
+            and not config.stdin
+            and (config.reformat or config.check)
+        ):
+            echo(
+                style(
+                    reformat_success_message,
+                    fg="red" if self.format_error_count > 0 else "blue",
+                    bold=self.format_error_count > 0,
+                )
+            )
 
-    if (
-        not config.quiet
-        and not config.stdin
-        and (config.reformat or config.check)
-    ):
-        echo(
-            style(
-                reformat_success_message,
-                fg="red" if format_error_count > 0 else "blue",
-                bold=format_error_count > 0,
+        if config.lint and not config.quiet:
+            echo(
+                style(
+                    lint_success_message,
+                    fg="red" if self.lint_error_count > 0 else "blue",
+                    bold=self.lint_error_count > 0,
+                )
             )
-        )
 
-    if config.lint and not config.quiet:
-        echo(
-            style(
-                lint_success_message,
-                fg="red" if lint_error_count > 0 else "blue",
-                bold=lint_error_count > 0,
+        if self.skipped_count and not config.quiet and not config.stdin:
+            echo(
+                style(
+                    f"Skipped {build_quantity(self.skipped_count)}.",
+                    fg="yellow",
+                    bold=True,
+                )
             )
-        )
 
-    if print_blanks:
-        echo()
+        if self._print_blanks:
+            echo()
 
-    return lint_error_count + format_error_count
+        return (
+            self.lint_error_count
+            + self.format_error_count
+            + count_unchecked(self.skipped_count, config)
+        )
 
 
 def build_relative_path(url: str, project_root: Path) -> str:
@@ -178,6 +229,31 @@ def build_output(
     return len(errors)
 
 
+def count_unchecked(skipped_count: int, config: Config) -> int:
+    """The skipped files that count against a --check or --lint run.
+
+    A file that ran out of time was never checked, so it cannot pass.
+    --reformat only reports the files it changed.
+    """
+    return skipped_count if config.check or config.lint else 0
+
+
+def build_skipped_output(skipped: Mapping[str, str], config: Config) -> int:
+    """Warn about files that were not checked, such as on a timeout."""
+    for filename, reason in skipped.items():
+        # stderr, so a skipped stdin run does not garble the template echoed
+        # back on stdout
+        echo(
+            style(
+                f"{build_relative_path(filename, config.project_root)}"
+                f" skipped: {reason}",
+                fg="yellow",
+            ),
+            err=True,
+        )
+    return len(skipped)
+
+
 def build_check_output(
     errors: Mapping[str, Sequence[str]], config: Config
 ) -> int:
@@ -236,13 +312,19 @@ def build_stats_output(
     if not errors:
         return 0
 
-    codes = tuple(
-        code["code"]
-        for error in errors
-        if error
-        for code in next(iter(error.values()))
+    return print_stats(
+        Counter(
+            code["code"]
+            for error in errors
+            if error
+            for code in next(iter(error.values()))
+        ),
+        config,
     )
 
+
+def print_stats(codes: Counter[str], config: Config) -> int:
+    """Print how often each code was found."""
     messages = {
         rule["rule"]["name"]: rule["rule"]["message"]
         for rule in config.linter_rules
@@ -258,18 +340,16 @@ def build_stats_output(
 
     if messages and codes:
         longest_code = len(max(messages, key=len))
-        longest_count = len(
-            str(max(Counter(codes).values(), key=_count_digits))
-        )
+        longest_count = len(str(max(codes.values(), key=_count_digits)))
 
-        for code in sorted(Counter(codes).items()):
+        for code in sorted(codes.items()):
             code_space = (longest_code - len(code[0])) * " "
             count_space = (longest_count - _count_digits(code[1])) * " "
 
             echo(
                 style(code[0], fg="yellow")
                 + style(f" {code_space}{code[1]}", fg="blue")
-                + f" {count_space}{messages[code[0]]}"
+                + f" {count_space}{messages.get(code[0], '')}"
             )
 
-    return sum(Counter(codes).values())
+    return codes.total()
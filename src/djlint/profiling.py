@@ -0,0 +1,266 @@
+"""Time and memory spent per formatter stage and linter rule.
+
+--profile-stages records, for every file, how long each formatter stage and
+each linter rule took, and the most memory it held on top of what was in use
+when it started. Workers send a file's numbers back with its result, and the
+run adds them up into a JSON report and a table of the slowest ones.
+
+tracemalloc traces the whole process, so it is started once in each process
+that checks files and stopped when the run ends. Files checked in threads,
+as on free-threaded Python, share that trace and would be charged for each
+other's memory, so only their time is recorded.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from click import echo, style
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from contextlib import AbstractContextManager
+    from pathlib import Path
+    from typing import Final
+
+    from typing_extensions import Any
+
+    from djlint.settings import Config
+    from djlint.types import FileProfile, ProcessResult
+
+# rows in each table printed at the end of a run
+_TOP: Final = 10
+
+_profilers: Final = threading.local()
+_NOT_PROFILED: Final = contextlib.nullcontext()
+# whether this process started tracemalloc, and so stops it at the end
+_started_tracing = False
+
+
+class Profiler:
+    """One file's numbers, collected while it is checked."""
+
+    __slots__ = ("memory", "rules", "stages")
+
+    def __init__(self, *, memory: bool) -> None:
+        self.memory = memory
+        self.stages: dict[str, tuple[float, int | None]] = {}
+        self.rules: dict[str, tuple[float, int | None]] = {}
+
+    def finish(self) -> FileProfile:
+        """Stop profiling this thread and return the file's numbers."""
+        _profilers.current = None
+        return {"stages": self.stages, "rules": self.rules}
+
+
+@contextlib.contextmanager
+def _measure(
+    totals: dict[str, tuple[float, int | None]], name: str
+) -> Iterator[None]:
+    """Record the time of the block under name.
+
+    Recorded even when the block raises, so a file cut off by --file-timeout
+    still shows the step it was stuck in.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        totals[name] = (time.perf_counter() - start, None)
+
+
+@contextlib.contextmanager
+def _measure_memory(
+    totals: dict[str, tuple[float, int | None]], name: str
+) -> Iterator[None]:
+    """Record the time and peak memory of the block under name."""
+    import tracemalloc  # noqa: PLC0415
+
+    start_memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] - start_memory
+        totals[name] = (seconds, max(peak, 0))
+
+
+def start_profile(config: Config) -> Profiler | None:
+    """Profile the file this thread checks next, if the run asks for it."""
+    global _started_tracing  # noqa: PLW0603
+    if config.profile_stages is None:
+        return None
+    # a worker thread shares the process's trace with the other workers
+    memory = threading.current_thread() is threading.main_thread()
+    if memory:
+        # imported here, as every run imports this module and few profile
+        import tracemalloc  # noqa: PLC0415
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+    profiler = _profilers.current = Profiler(memory=memory)
+    return profiler
+
+
+def stop_tracing() -> None:
+    """Stop the memory trace this process started for the run, if any."""
+    global _started_tracing  # noqa: PLW0603
+    if _started_tracing:
+        import tracemalloc  # noqa: PLC0415
+
+        tracemalloc.stop()
+        _started_tracing = False
+
+
+def _step(
+    profiler: Profiler, totals: dict[str, tuple[float, int | None]], name: str
+) -> AbstractContextManager[None]:
+    if profiler.memory:
+        return _measure_memory(totals, name)
+    return _measure(totals, name)
+
+
+def stage(name: str) -> AbstractContextManager[None]:
+    """Measure a formatter stage of the file being profiled."""
+    profiler: Profiler | None = getattr(_profilers, "current", None)
+    if profiler is None:
+        return _NOT_PROFILED
+    return _step(profiler, profiler.stages, name)
+
+
+def rule(name: str) -> AbstractContextManager[None]:
+    """Measure a linter rule on the file being profiled."""
+    profiler: Profiler | None = getattr(_profilers, "current", None)
+    if profiler is None:
+        return _NOT_PROFILED
+    return _step(profiler, profiler.rules, name)
+
+
+def _totals(
+    profiles: Iterable[dict[str, tuple[float, int | None]]],
+) -> list[dict[str, Any]]:
+    """Add up each name's numbers over the files, slowest first.
+
+    A peak_memory of None means no file had its memory measured.
+    """
+    totals: dict[str, dict[str, Any]] = {}
+    for profile in profiles:
+        for name, (seconds, peak) in profile.items():
+            total = totals.get(name)
+            if total is None:
+                total = totals[name] = {
+                    "name": name,
+                    "seconds": 0.0,
+                    "files": 0,
+                    "peak_memory": None,
+                }
+            total["seconds"] += seconds
+            total["files"] += 1
+            if peak is not None:
+                total["peak_memory"] = max(total["peak_memory"] or 0, peak)
+    return sorted(totals.values(), key=lambda x: -x["seconds"])
+
+
+class StageReport:
+    """The numbers of every file in a run."""
+
+    __slots__ = ("files",)
+
+    def __init__(self) -> None:
+        self.files: dict[str, FileProfile] = {}
+
+    def add(self, result: ProcessResult) -> None:
+        """Keep the numbers of a checked file."""
+        self.files.update(result.get("profile", {}))
+
+    def summary(self, config: Config) -> dict[str, Any]:
+        """The run's totals per stage and rule, and each file's numbers."""
+        kinds = {}
+        if config.lint:
+            from djlint.lint import compile_rules  # noqa: PLC0415
+
+            kinds = {
+                x.name: "pattern" if x.run is None else "python_module"
+                for x in compile_rules(config).rules
+            }
+
+        rules = _totals(x["rules"] for x in self.files.values())
+        for total in rules:
+            total["kind"] = kinds.get(total["name"], "pattern")
+
+        files: list[dict[str, Any]] = [
+            {
+                "file": filename,
+                "seconds": sum(x for x, _ in profile["stages"].values())
+                + sum(x for x, _ in profile["rules"].values()),
+                "stages": profile["stages"],
+                "rules": profile["rules"],
+            }
+            for filename, profile in self.files.items()
+        ]
+        files.sort(key=lambda x: -x["seconds"])
+
+        return {
+            "stages": _totals(x["stages"] for x in self.files.values()),
+            "rules": rules,
+            "files": files,
+        }
+
+    def write(self, config: Config, path: Path) -> None:
+        """Write the JSON report and print the slowest stages, rules and files.
+
+        Called when the run is over, so the memory trace is stopped first.
+        """
+        from djlint.output import build_relative_path  # noqa: PLC0415
+
+        stop_tracing()
+
+        summary = self.summary(config)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+
+        for title, rows in (
+            ("Slowest stages", summary["stages"]),
+            ("Slowest rules", summary["rules"]),
+            (
+                "Slowest files",
+                [
+                    {
+                        **x,
+                        "name": build_relative_path(
+                            x["file"], config.project_root
+                        ),
+                    }
+                    for x in summary["files"]
+                ],
+            ),
+        ):
+            if rows:
+                _print_table(title, rows[:_TOP])
+        if any(
+            x["peak_memory"] is None
+            for x in summary["stages"] + summary["rules"]
+        ):
+            echo(
+                "Memory is not measured for files checked in threads.", err=True
+            )
+        echo(style(f"Profile written to {path}", fg="blue"), err=True)
+
+
+def _print_table(title: str, rows: list[dict[str, Any]]) -> None:
+    echo(style(f"\n{title}", bold=True), err=True)
+    width = max(len(x["name"]) for x in rows)
+    for row in rows:
+        columns = [f"{row['name']:<{width}}", f"{row['seconds']:>9.4f}s"]
+        if "files" in row:
+            columns.append(f"{row['files']:>6} files")
+        if row.get("peak_memory") is not None:
+            columns.append(f"{row['peak_memory'] / 1024:>10.1f} KiB peak")
+        echo("  " + "  ".join(columns), err=True)
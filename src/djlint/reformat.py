@@ -8,6 +8,7 @@ from __future__ import annotations
 import difflib
 from typing import TYPE_CHECKING
 
+from djlint.deadline import paused
 from djlint.formatter.class_attributes import (
     restore_class_attribute_newlines,
     restore_verbatim_attribute_newlines,
@@ -17,6 +18,7 @@ from djlint.formatter.condense import clean_whitespace, condense_html
 from djlint.formatter.expand import expand_html
 from djlint.formatter.indent import indent_html
 from djlint.helpers import mask_unformatted_blocks, restore_unformatted_blocks
+from djlint.profiling import stage
 
 if TYPE_CHECKING:
     from pathlib import Path
@@ -31,32 +33,40 @@ def formatter(config: Config, rawcode: str) -> str:
 
     # naturalize the line breaks
     normalized_code = "\n".join(rawcode.splitlines())
-    normalized_code, unformatted_blocks = mask_unformatted_blocks(
-        normalized_code
-    )
+    with stage("mask_unformatted_blocks"):
+        normalized_code, unformatted_blocks = mask_unformatted_blocks(
+            normalized_code
+        )
 
-    compressed = compress_html(normalized_code, config)
+    with stage("compress_html"):
+        compressed = compress_html(normalized_code, config)
 
-    expanded = expand_html(compressed, config)
+    with stage("expand_html"):
+        expanded = expand_html(compressed, config)
 
-    condensed = clean_whitespace(expanded, config)
+    with stage("clean_whitespace"):
+        condensed = clean_whitespace(expanded, config)
 
-    indented_code = indent_html(condensed, config)
+    with stage("indent_html"):
+        indented_code = indent_html(condensed, config)
 
     # compressed still carries the author's line breaks, but has had the
     # rewrites (tag case, void tags, attributes) that indenting also applies,
     # so its blocks can be matched against the indented ones.
-    beautified_code = condense_html(indented_code, config, compressed)
+    with stage("condense_html"):
+        beautified_code = condense_html(indented_code, config, compressed)
 
     if config.format_css:
         from djlint.formatter.css import format_css  # noqa: PLC0415
 
-        beautified_code = format_css(beautified_code, config)
+        with stage("format_css"):
+            beautified_code = format_css(beautified_code, config)
 
     if config.format_js:
         from djlint.formatter.js import format_js  # noqa: PLC0415
 
-        beautified_code = format_js(beautified_code, config)
+        with stage("format_js"):
+            beautified_code = format_js(beautified_code, config)
 
     if config.preserve_class_newlines:
         beautified_code = restore_class_attribute_newlines(beautified_code)
@@ -105,7 +115,9 @@ def reformat_file(
     )
 
     if config.check is not True and beautified_code != rawcode:
-        with this_file.open("w", encoding="utf-8", newline="") as f:
+        # a file cut off by --file-timeout halfway through writing would be
+        # left truncated
+        with paused(), this_file.open("w", encoding="utf-8", newline="") as f:
             f.write(beautified_code)
 
     return format_message
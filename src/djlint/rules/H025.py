@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING
 import regex as re
 
 from djlint.const import HTML_VOID_ELEMENTS
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import document_tags
 from djlint.helpers import (
     child_of_unformatted_block,
     inside_ignored_block,
@@ -25,6 +25,7 @@ if TYPE_CHECKING:
     from typing_extensions import Any
 
     from djlint.formatter.tokenizer import TagToken
+    from djlint.lint import LineIndex
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -80,7 +81,7 @@ def run(
     config: Config,
     html: str,
     filepath: str,
-    line_ends: list[dict[str, int]],
+    line_ends: LineIndex,
     *args: Any,
     **kwargs: Any,
 ) -> tuple[LintError, ...]:
@@ -94,7 +95,7 @@ def run(
     def context(token: TagToken) -> dict[int, int]:
         return _branch_context(conditionals, token.start)
 
-    for token in tokenize_tags(html):
+    for token in document_tags(html):
         tag_name = token.name.lower()
         if (
             token.declaration
@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 import regex as re
 
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import document_tags
 from djlint.helpers import (
     RE_FLAGS_IX,
     inside_ignored_linter_block,
@@ -18,6 +18,7 @@ from djlint.lint import get_line
 if TYPE_CHECKING:
     from typing_extensions import Any
 
+    from djlint.lint import LineIndex
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -57,14 +58,14 @@ def run(
     config: Config,
     html: str,
     filepath: str,
-    line_ends: list[dict[str, int]],
+    line_ends: LineIndex,
     *args: Any,
     **kwargs: Any,
 ) -> tuple[LintError, ...]:
     """Check for duplicate attributes that can occur on the same element."""
     errors: list[LintError] = []
 
-    for token in tokenize_tags(html):
+    for token in document_tags(html):
         if (
             token.closing
             or token.declaration
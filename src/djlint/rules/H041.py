@@ -8,7 +8,7 @@ from typing import TYPE_CHECKING
 import regex as re
 
 from djlint.const import HTML_VOID_ELEMENTS
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import document_tags
 from djlint.helpers import (
     RE_FLAGS_IS,
     inside_ignored_linter_block,
@@ -23,6 +23,7 @@ if TYPE_CHECKING:
 
     from typing_extensions import Any
 
+    from djlint.lint import LineIndex
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -67,7 +68,7 @@ def run(
     config: Config,
     html: str,
     filepath: str,
-    line_ends: list[dict[str, int]],
+    line_ends: LineIndex,
     *args: Any,
     **kwargs: Any,
 ) -> tuple[LintError, ...]:
@@ -83,7 +84,7 @@ def run(
     errors: list[LintError] = []
     open_tags: list[tuple[str, tuple[int, ...]]] = []
 
-    for token in tokenize_tags(html):
+    for token in document_tags(html):
         tag_name = token.name.lower()
         if (
             token.declaration
@@ -21,6 +21,7 @@ if TYPE_CHECKING:
     from typing_extensions import Any
 
     from djlint.formatter.tokenizer import TagToken
+    from djlint.lint import LineIndex
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -133,7 +134,7 @@ def run(
     config: Config,
     html: str,
     filepath: str,
-    line_ends: list[dict[str, int]],
+    line_ends: LineIndex,
     *args: Any,
     **kwargs: Any,
 ) -> tuple[LintError, ...]:
@@ -19,6 +19,7 @@ if TYPE_CHECKING:
 
     from typing_extensions import Any
 
+    from djlint.lint import LineIndex
     from djlint.settings import Config
     from djlint.types import LintError
 
@@ -36,7 +37,7 @@ def run(
     config: Config,
     html: str,
     filepath: str,
-    line_ends: list[dict[str, int]],
+    line_ends: LineIndex,
     *args: Any,
     **kwargs: Any,
 ) -> tuple[LintError, ...]:
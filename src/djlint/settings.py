@@ -4,31 +4,18 @@ from __future__ import annotations
 
 import json
 import sys
-from fnmatch import fnmatch
+from fnmatch import fnmatch, fnmatchcase
+from functools import cache, lru_cache
 from itertools import chain
 from pathlib import Path
 from typing import TYPE_CHECKING
 
 import regex as re
-import yaml
 from click import BadParameter, echo, style
-from pathspec import PathSpec
 
 from djlint.const import HTML_TAG_NAMES, HTML_VOID_ELEMENTS
 from djlint.helpers import RE_FLAGS_IMSX, RE_FLAGS_ISX, RE_FLAGS_IX
 
-try:
-    from pathspec.patterns.gitignore import GitIgnorePatternError
-except ImportError:
-    # pathspec < 1.0 exposes the older gitwildmatch implementation.
-    from pathspec.patterns.gitwildmatch import (  # type: ignore[attr-defined]
-        GitWildMatchPatternError as GitIgnorePatternError,
-    )
-
-    _GITIGNORE_PATTERN = "gitwildmatch"
-else:
-    _GITIGNORE_PATTERN = "gitignore"
-
 if sys.version_info >= (3, 11):
     from typing import final
 
@@ -43,22 +30,29 @@ else:
     from typing_extensions import final
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable, Iterator, Mapping
+    from collections.abc import Callable, Iterable, Iterator, Mapping
     from typing import Final
 
-    from pathspec import Pattern
+    from pathspec import PathSpec, Pattern
     from typing_extensions import Any, TypeVar
 
+    from djlint.lint import RuleSet
+
     _TMappingStrAny = TypeVar("_TMappingStrAny", bound=Mapping[str, Any])
 
 
-_JS_JSON_OBJECT_PATTERN: Final = re.compile(
-    r"^\s*\{(?![{%]).*\}\s*$", RE_FLAGS_IX, cache_pattern=False
-)
-_JS_JSON_STRING_PATTERN: Final = re.compile(
-    r'["\']([^"\']*)["\']', RE_FLAGS_IX, cache_pattern=False
-)
-_JS_JSON_PROPERTY_PATTERN: Final = re.compile(
+# The fixed patterns below are kept as (pattern, flags) and compiled by
+# _compiled() the first time a config hands one out. Compiling all of them
+# took most of the time spent importing this module, and a run only needs
+# the ones for what it does: linting stdin never touches the formatter's.
+@cache
+def _compiled(spec: tuple[str, int]) -> re.Pattern[str]:
+    return re.compile(spec[0], spec[1], cache_pattern=False)
+
+
+_JS_JSON_OBJECT_PATTERN: Final = (r"^\s*\{(?![{%]).*\}\s*$", RE_FLAGS_IX)
+_JS_JSON_STRING_PATTERN: Final = (r'["\']([^"\']*)["\']', RE_FLAGS_IX)
+_JS_JSON_PROPERTY_PATTERN: Final = (
     r"""
     (?:^|[,{]\s*)
     (?:
@@ -68,10 +62,14 @@ _JS_JSON_PROPERTY_PATTERN: Final = re.compile(
     )
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
 
 DJLINT_TOML_CONFIG_FILES: Final = ("djlint.toml", ".djlint.toml")
+_PYPROJECT_DJLINT_TABLE: Final = re.compile(
+    r"^[ \t]*\[[ \t]*tool[ \t]*\.[ \t]*djlint[ \t]*[\].]",
+    re.M,
+    cache_pattern=False,
+)
 
 
 def find_project_root(src: Path) -> Path:
@@ -98,6 +96,24 @@ def find_project_root(src: Path) -> Path:
 
 def load_gitignore(root: Path) -> PathSpec[Pattern]:
     """Search upstream for a .gitignore file."""
+    # pathspec imports asyncio, which would take a quarter of the start-up
+    # of every run, so it is only imported for --use-gitignore
+    from pathspec import PathSpec  # noqa: PLC0415
+
+    try:
+        from pathspec.patterns.gitignore import (  # noqa: PLC0415
+            GitIgnorePatternError,
+        )
+    except ImportError:
+        # pathspec < 1.0 exposes the older gitwildmatch implementation.
+        from pathspec.patterns.gitwildmatch import (  # type: ignore[attr-defined] # noqa: PLC0415
+            GitWildMatchPatternError as GitIgnorePatternError,
+        )
+
+        gitignore_pattern = "gitwildmatch"
+    else:
+        gitignore_pattern = "gitignore"
+
     gitignore = root / ".gitignore"
     if gitignore.is_file():
         with gitignore.open(encoding="utf-8") as this_file:
@@ -106,7 +122,7 @@ def load_gitignore(root: Path) -> PathSpec[Pattern]:
         git_lines = []
 
     try:
-        return PathSpec.from_lines(_GITIGNORE_PATTERN, git_lines)
+        return PathSpec.from_lines(gitignore_pattern, git_lines)
 
     except GitIgnorePatternError as e:
         echo(f"Could not parse {gitignore}: {e}", err=True)
@@ -144,6 +160,22 @@ def find_djlintrc(root: Path) -> Path | None:
     return None
 
 
+def has_djlint_settings(directory: Path) -> bool:
+    """Whether a directory has a config file with djLint settings.
+
+    Only a pyproject.toml with a [tool.djlint] table counts, as most of them
+    configure other tools. It is looked for in the text, without parsing
+    the file, since every directory of a nested run is asked.
+    """
+    if find_djlint_toml(directory) or find_djlintrc(directory):
+        return True
+    try:
+        text = (directory / "pyproject.toml").read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return False
+    return _PYPROJECT_DJLINT_TABLE.search(text) is not None
+
+
 def find_djlint_rules(root: Path) -> Path | None:
     """Search upstream for a .djlint_rules.yaml file."""
     rules = root / ".djlint_rules.yaml"
@@ -154,7 +186,9 @@ def find_djlint_rules(root: Path) -> Path | None:
     return None
 
 
-def _editorconfig_glob_matches_html(glob: str, extension: str) -> bool:
+def _editorconfig_glob_matches_html(
+    glob: str, extensions: Iterable[str]
+) -> bool:
     """Whether an .editorconfig section applies to template files."""
     if glob == "*":
         return True
@@ -164,7 +198,7 @@ def _editorconfig_glob_matches_html(glob: str, extension: str) -> bool:
         head, _, rest = glob.partition("{")
         body, _, tail = rest.partition("}")
         globs = [head + alt + tail for alt in body.split(",")]
-    names = (f"test.{extension}", "test.html")
+    names = (*(f"test.{x}" for x in extensions), "test.html")
     return any(
         fnmatch(name, g.lstrip("*").lstrip("/") if g.startswith("**") else g)
         for g in globs
@@ -172,12 +206,12 @@ def _editorconfig_glob_matches_html(glob: str, extension: str) -> bool:
     )
 
 
-def load_editorconfig(root: Path, extension: str) -> dict[str, int]:
+def load_editorconfig(root: Path, extensions: Iterable[str]) -> dict[str, int]:
     """Read indent_size and max_line_length from a root .editorconfig.
 
     Used as defaults only: the command line and djlint config files take
     precedence. Sections are considered when their glob applies to html
-    or the configured extension.
+    or one of the configured extensions.
     """
     path = root / ".editorconfig"
     result: dict[str, int] = {}
@@ -193,7 +227,7 @@ def load_editorconfig(root: Path, extension: str) -> dict[str, int]:
             continue
         if line.startswith("[") and line.endswith("]"):
             section_applies = _editorconfig_glob_matches_html(
-                line[1:-1], extension
+                line[1:-1], extensions
             )
             continue
         key, sep, value = line.partition("=")
@@ -321,15 +355,36 @@ def validate_rules(
             yield rule
 
 
+@lru_cache(maxsize=1)
+def load_builtin_rules() -> tuple[Any, ...]:
+    """Load djLint's own linter rules.
+
+    rules.json is generated from rules.yaml, and the tests check that the
+    two agree and that every rule is valid. Loading it needs neither PyYAML
+    nor validate_rules().
+    """
+    with (Path(__file__).parent / "rules.json").open("rb") as f:
+        return tuple(json.load(f))
+
+
 def load_custom_rules(rules_file: Path | None) -> Any:
     """Load custom linter rules from a .djlint_rules.yaml file."""
     if rules_file:
-        with rules_file.open("rb") as f:
-            return yaml.safe_load(f)
+        stat = rules_file.stat()
+        return _parse_rules_file(rules_file, stat.st_mtime_ns, stat.st_size)
 
     return ()
 
 
+@lru_cache(maxsize=8)
+def _parse_rules_file(rules_file: Path, _mtime_ns: int, _size: int) -> Any:
+    """Parse a rules file, again only once it changes."""
+    import yaml  # noqa: PLC0415
+
+    with rules_file.open("rb") as f:
+        return yaml.safe_load(f)
+
+
 def _as_comma_separated(value: Any) -> Any:
     """Allow comma-separated config options to be given as lists."""
     if isinstance(value, (list, tuple)):
@@ -402,6 +457,7 @@ _DEFAULT_EXCLUDE: Final = r"""
     | _site
     | \.bzr
     | \.direnv
+    | \.djlint_cache
     | \.eggs
     | \.git
     | \.git-rewrite
@@ -857,29 +913,23 @@ _SCRIPT_STYLE_INLINE: Final = r"""
 """
 
 # contents of tags will not be formatted
-_SCRIPT_STYLE_OPENING_PATTERN: Final = re.compile(
+_SCRIPT_STYLE_OPENING_PATTERN: Final = (
     r"""
       <style
     | <script
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
-_SCRIPT_STYLE_CLOSING_PATTERN: Final = re.compile(
+_SCRIPT_STYLE_CLOSING_PATTERN: Final = (
     r"""
       </style
     | </script
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
-)
-_SCRIPT_STYLE_INLINE_IMSX_PATTERN: Final = re.compile(
-    _SCRIPT_STYLE_INLINE, RE_FLAGS_IMSX, cache_pattern=False
-)
-_SCRIPT_STYLE_INLINE_IX_PATTERN: Final = re.compile(
-    _SCRIPT_STYLE_INLINE, RE_FLAGS_IX, cache_pattern=False
 )
-_IGNORED_BLOCK_OPENING_PATTERN: Final = re.compile(
+_SCRIPT_STYLE_INLINE_IMSX_PATTERN: Final = (_SCRIPT_STYLE_INLINE, RE_FLAGS_IMSX)
+_SCRIPT_STYLE_INLINE_IX_PATTERN: Final = (_SCRIPT_STYLE_INLINE, RE_FLAGS_IX)
+_IGNORED_BLOCK_OPENING_PATTERN: Final = (
     r"""
       <style
     | {\*
@@ -899,9 +949,8 @@ _IGNORED_BLOCK_OPENING_PATTERN: Final = re.compile(
     | {{-?\s*/\*\s*djlint\:off\s*\*/\s*-?}}
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
-_IGNORED_BLOCK_CLOSING_PATTERN: Final = re.compile(
+_IGNORED_BLOCK_CLOSING_PATTERN: Final = (
     r"""
       </style
     | \*}
@@ -920,15 +969,10 @@ _IGNORED_BLOCK_CLOSING_PATTERN: Final = re.compile(
     | {%-?[ ]*end(?:schema|javascript|stylesheet|style)[ ]*-?%}
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
-)
-_IGNORED_BLOCKS_PATTERN: Final = re.compile(
-    _IGNORED_BLOCKS, RE_FLAGS_IMSX, cache_pattern=False
 )
-_LINT_IGNORED_BLOCKS_PATTERN: Final = re.compile(
-    _LINT_IGNORED_BLOCKS, RE_FLAGS_IMSX, cache_pattern=False
-)
-_IGNORED_BLOCKS_INLINE_PATTERN: Final = re.compile(
+_IGNORED_BLOCKS_PATTERN: Final = (_IGNORED_BLOCKS, RE_FLAGS_IMSX)
+_LINT_IGNORED_BLOCKS_PATTERN: Final = (_LINT_IGNORED_BLOCKS, RE_FLAGS_IMSX)
+_IGNORED_BLOCKS_INLINE_PATTERN: Final = (
     r"""
       <(pre|textarea).*?</(\1)>
     | <(script|style).*?(?=(\</(?:\3)>))
@@ -954,25 +998,19 @@ _IGNORED_BLOCKS_INLINE_PATTERN: Final = re.compile(
     | ^---[\s\S]+?---
     """,
     RE_FLAGS_IMSX,
-    cache_pattern=False,
 )
-_IGNORED_INLINE_BLOCKS_IX_PATTERN: Final = re.compile(
-    _IGNORED_INLINE_BLOCKS, RE_FLAGS_IX, cache_pattern=False
-)
-_IGNORED_LINTER_BLOCKS_PATTERN: Final = re.compile(
+_IGNORED_INLINE_BLOCKS_IX_PATTERN: Final = (_IGNORED_INLINE_BLOCKS, RE_FLAGS_IX)
+_IGNORED_LINTER_BLOCKS_PATTERN: Final = (
     r"""
     {%-?[ ]*(raw|verbatim)\b(?:(?!%}).)*?-?%}.*?{%-?[ ]*end\1[ ]*-?%}
     """,
     RE_FLAGS_IMSX,
-    cache_pattern=False,
 )
-_UNFORMATTED_BLOCKS_COARSE_PATTERN: Final = re.compile(
-    r"djlint\:\s*off", RE_FLAGS_IMSX, cache_pattern=False
-)
-_UNFORMATTED_BLOCKS_PATTERN: Final = re.compile(
+_UNFORMATTED_BLOCKS_COARSE_PATTERN: Final = (r"djlint\:\s*off", RE_FLAGS_IMSX)
+_UNFORMATTED_BLOCKS_PATTERN: Final = (
     r"""
     # html comment
-    | <!--\s*djlint\:off\s*-->.(?:(?!<!--\s*djlint\:on\s*-->).)*
+    <!--\s*djlint\:off\s*-->.(?:(?!<!--\s*djlint\:on\s*-->).)*
     # django/jinja/nunjucks
     | (?<!{){\#\s*djlint\:\s*off\s*\#}(?:(?!{\#\s*djlint\:\s*on\s*\#}).)*
     | {%\s*comment\s*%\}\s*djlint\:off\s*\{%\s*endcomment\s*%\}(?:(?!{%\s*comment\s*%\}\s*djlint\:on\s*\{%\s*endcomment\s*%\}).)*
@@ -985,10 +1023,9 @@ _UNFORMATTED_BLOCKS_PATTERN: Final = re.compile(
     | ^---[\s\S]+?---
     """,
     RE_FLAGS_IMSX,
-    cache_pattern=False,
 )
 _IGNORED_RULE_PATTERNS: Final = tuple(
-    re.compile(pattern, RE_FLAGS_ISX, cache_pattern=False)
+    (pattern, RE_FLAGS_ISX)
     for pattern in (
         # html comment
         r"<!--\s*djlint\:off(.+?)-->(?:(?!<!--\s*djlint\:on\s*-->).)*",
@@ -1002,32 +1039,29 @@ _IGNORED_RULE_PATTERNS: Final = tuple(
         r"{{-?\s*/\*\s*djlint\:off(.*?)\*/\s*-?}}(?:(?!{{-?\s*/\*\s*djlint\:on\s*\*/\s*-?}}).)*",
     )
 )
-_IGNORED_TRANS_BLOCKS_PATTERN: Final = re.compile(
+_IGNORED_TRANS_BLOCKS_PATTERN: Final = (
     r"""
       {%[ ]*blocktranslate?\b(?:(?!%}|\btrimmed\b).)*?%}.*?{%[ ]*endblocktranslate?[ ]*%}
     | {%[ ]*blocktrans\b(?:(?!%}|\btrimmed\b).)*?%}.*?{%[ ]*endblocktrans[ ]*%}
     """,
     RE_FLAGS_ISX,
-    cache_pattern=False,
 )
-_TRANS_TRIMMED_BLOCKS_PATTERN: Final = re.compile(
+_TRANS_TRIMMED_BLOCKS_PATTERN: Final = (
     r"""
       {%[ ]*blocktranslate\b(?:(?!%}).)*?\btrimmed\b(?:(?!%}).)*?%}.*?{%[ ]*endblocktranslate[ ]*%}
     | {%[ ]*blocktrans\b(?:(?!%}).)*?\btrimmed\b(?:(?!%}).)*?%}.*?{%[ ]*endblocktrans[ ]*%}
     """,
     RE_FLAGS_ISX,
-    cache_pattern=False,
 )
-_IGNORED_TRANS_BLOCKS_CLOSING_PATTERN: Final = re.compile(
+_IGNORED_TRANS_BLOCKS_CLOSING_PATTERN: Final = (
     r"""
     {%[ ]*endblocktrans(?:late)?(?:(?!%}).)*?%}
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
 # ignored block closing tags that
 # we can safely indent.
-_SAFE_CLOSING_TAG_PATTERN: Final = re.compile(
+_SAFE_CLOSING_TAG_PATTERN: Final = (
     r"""
       </script
     | </style
@@ -1037,29 +1071,24 @@ _SAFE_CLOSING_TAG_PATTERN: Final = re.compile(
     | {{-?\s*/\*\s*djlint\:on\s*\*/\s*-?}}
     """,
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
-_SAFE_CLOSING_BLOCK_PATTERN: Final = re.compile(
+_SAFE_CLOSING_BLOCK_PATTERN: Final = (
     _IGNORED_INLINE_BLOCKS + r" | " + _IGNORED_BLOCKS,
     RE_FLAGS_IMSX,
-    cache_pattern=False,
 )
-_TEMPLATE_BLOCKS_PATTERN: Final = re.compile(
+_TEMPLATE_BLOCKS_PATTERN: Final = (
     r"""
     {%((?!%}).)+%}|{{((?!}}).)+}}
     """,
     RE_FLAGS_IMSX,
-    cache_pattern=False,
 )
-_OPTIONAL_SINGLE_LINE_HTML_PATTERN: Final = re.compile(
+_OPTIONAL_SINGLE_LINE_HTML_PATTERN: Final = (
     rf"^(?:{_OPTIONAL_SINGLE_LINE_HTML_TAGS})$",
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
-_OPTIONAL_SINGLE_LINE_TEMPLATE_PATTERN: Final = re.compile(
+_OPTIONAL_SINGLE_LINE_TEMPLATE_PATTERN: Final = (
     rf"^(?:{_OPTIONAL_SINGLE_LINE_TEMPLATE_TAGS})$",
     RE_FLAGS_IX,
-    cache_pattern=False,
 )
 
 
@@ -1068,6 +1097,11 @@ class Config:
     """Djlint Config."""
 
     __slots__ = (
+        "_gitignore",
+        "_linter_rules",
+        "_optional_single_line_template_pattern",
+        "_profile_codes",
+        "_rules_file",
         "allow_empty_input",
         "always_self_closing_html_tags",
         "attribute_pattern",
@@ -1076,40 +1110,31 @@ class Config:
         "break_before",
         "break_html_tags",
         "break_template_tags",
+        "cache_dir",
         "check",
         "close_void_tags",
+        "compiled_rules",
         "css_config",
         "custom_blocks",
         "custom_html",
         "exclude",
         "exclude_pattern",
         "extension",
+        "file_timeout",
         "files",
         "format_attribute_js_json",
         "format_attribute_js_json_min_props",
-        "format_attribute_js_json_object_pattern",
         "format_attribute_js_json_pattern",
-        "format_attribute_js_json_property_pattern",
-        "format_attribute_js_json_string_pattern",
         "format_attribute_template_tags",
         "format_css",
         "format_js",
+        "formatter_patterns",
         "github_output",
-        "gitignore",
         "ignore",
         "ignore_blocks",
         "ignore_case",
         "ignored_attributes",
-        "ignored_block_closing_pattern",
-        "ignored_block_opening_pattern",
-        "ignored_blocks_inline_pattern",
-        "ignored_blocks_pattern",
         "ignored_inline_blocks",
-        "ignored_inline_blocks_ix_pattern",
-        "ignored_linter_blocks_pattern",
-        "ignored_rule_patterns",
-        "ignored_trans_blocks_closing_pattern",
-        "ignored_trans_blocks_pattern",
         "include",
         "indent",
         "indent_html_tags",
@@ -1117,34 +1142,27 @@ class Config:
         "js_config",
         "line_break_after_multiline_tag",
         "lint",
-        "lint_ignored_blocks_pattern",
         "linter_output_format",
-        "linter_rules",
         "max_attribute_length",
         "max_blank_lines",
         "max_line_length",
+        "nested_config",
         "no_function_formatting",
         "no_line_after_yaml",
         "no_set_formatting",
-        "optional_single_line_html_pattern",
         "optional_single_line_html_tags",
-        "optional_single_line_template_pattern",
         "optional_single_line_template_tags",
         "per_file_ignores",
+        "per_file_profiles",
         "preserve_blank_lines",
         "preserve_class_newlines",
         "preserve_leading_space",
         "profile",
+        "profile_stages",
         "project_root",
         "quiet",
         "reformat",
         "require_pragma",
-        "safe_closing_block_pattern",
-        "safe_closing_tag_pattern",
-        "script_style_closing_pattern",
-        "script_style_inline_imsx_pattern",
-        "script_style_inline_ix_pattern",
-        "script_style_opening_pattern",
         "single_attribute_per_line",
         "start_template_tags",
         "statistics",
@@ -1153,13 +1171,9 @@ class Config:
         "tag_indent",
         "tag_unindent",
         "tag_unindent_line",
-        "template_blocks_pattern",
         "template_indent",
         "template_tags",
         "template_unindent",
-        "trans_trimmed_blocks_pattern",
-        "unformatted_blocks_coarse_pattern",
-        "unformatted_blocks_pattern",
         "use_gitignore",
         "warn",
     )
@@ -1207,6 +1221,7 @@ class Config:
         format_attribute_js_json_pattern: str = "",
         format_attribute_js_json_min_props: int | None = None,
         per_file_ignores: tuple[tuple[str, str], ...] = (),
+        per_file_profiles: tuple[tuple[str, str], ...] = (),
         indent_css: int | None = None,
         indent_js: int | None = None,
         close_void_tags: bool = False,
@@ -1214,9 +1229,14 @@ class Config:
         no_function_formatting: bool = False,
         no_set_formatting: bool = False,
         max_blank_lines: int | None = None,
+        file_timeout: float | None = None,
+        profile_stages: Path | None = None,
         github_output: bool = False,
         stdin: bool | None = None,
         stdin_filename: str | None = None,
+        no_cache: bool = False,
+        cache_dir: Path | None = None,
+        nested_config: bool = False,
     ) -> None:
         self.project_root = find_project_root(
             Path.cwd() if src == "-" else Path(src).resolve()
@@ -1224,7 +1244,8 @@ class Config:
         djlint_settings = load_project_settings(
             self.project_root, configuration
         )
-        self.gitignore = load_gitignore(self.project_root)
+        # read on first use, by --use-gitignore
+        self._gitignore: PathSpec[Pattern] | None = None
 
         def setting_int(key: str, default: int) -> int:
             """Read an integer option from the config file."""
@@ -1249,10 +1270,12 @@ class Config:
         self.github_output = github_output
         self.statistics = statistics
         self.stdin_filename = stdin_filename
+        self.profile_stages = profile_stages
 
         # simple options; the command line takes precedence over the config
         self.extension = str(
-            extension or djlint_settings.get("extension", "html")
+            extension
+            or _as_comma_separated(djlint_settings.get("extension", "html"))
         )
         self.quiet = quiet or djlint_settings.get("quiet", False)
         self.require_pragma = (
@@ -1323,6 +1346,21 @@ class Config:
             if per_file_ignores
             else djlint_settings.get("per-file-ignores", {})
         )
+        self.per_file_profiles: dict[str, str] = {
+            str(glob): str(name).lower()
+            for glob, name in (
+                dict(per_file_profiles)
+                if per_file_profiles
+                else djlint_settings.get("per-file-profiles", {})
+            ).items()
+        }
+        for name in self.per_file_profiles.values():
+            if name not in _PROFILES:
+                msg = (
+                    f"Invalid profile {name!r}."
+                    f" Choose from {', '.join(sorted(_PROFILES))}."
+                )
+                raise BadParameter(msg, param_hint="'--per-file-profiles'")
         # add blank line after load tags
         self.blank_line_after_tag = blank_line_after_tag or _as_comma_separated(
             djlint_settings.get("blank_line_after_tag", None)
@@ -1351,7 +1389,7 @@ class Config:
         ) or {}
 
         # .editorconfig supplies defaults only; cli and config files win
-        editorconfig = load_editorconfig(self.project_root, self.extension)
+        editorconfig = load_editorconfig(self.project_root, self.extensions)
         indent = indent or setting_int(
             "indent", editorconfig.get("indent_size", 4)
         )
@@ -1370,6 +1408,24 @@ class Config:
             if max_blank_lines is not None
             else setting_int("max_blank_lines", 0)
         )
+        if file_timeout is None:
+            try:
+                file_timeout = float(djlint_settings.get("file_timeout", 0))
+            except (TypeError, ValueError):
+                echo(
+                    style(
+                        "Error: Invalid pyproject.toml file_timeout value"
+                        f" {djlint_settings['file_timeout']}",
+                        fg="red",
+                    ),
+                    err=True,
+                )
+        # no time budget unless it is a positive number of seconds
+        self.file_timeout = (
+            file_timeout
+            if file_timeout is not None and file_timeout > 0
+            else None
+        )
 
         # regex for excluded paths
         exclude = build_exclude(
@@ -1396,6 +1452,22 @@ class Config:
         self.allow_empty_input = allow_empty_input or bool(
             djlint_settings.get("allow_empty_input", False)
         )
+        # a config file given on the command line is meant for every file
+        self.nested_config = (
+            nested_config or bool(djlint_settings.get("nested_config", False))
+        ) and configuration is None
+        # results are cached per file, so there is nothing to cache for
+        # stdin, and a profiled run checks every file again
+        self.cache_dir: Path | None = None
+        if not (
+            no_cache
+            or djlint_settings.get("no_cache", False)
+            or self.stdin
+            or profile_stages is not None
+        ):
+            self.cache_dir = self.project_root / (
+                cache_dir or djlint_settings.get("cache_dir", ".djlint_cache")
+            )
 
         # linter rules, minus the ignored codes and the profile's excludes
         self.profile = str(
@@ -1410,7 +1482,7 @@ class Config:
                 f" Choose from {', '.join(sorted(_PROFILES))}."
             )
             raise BadParameter(msg, param_hint="'--profile'")
-        profile_codes = _PROFILE_CODES.get(
+        self._profile_codes = _PROFILE_CODES.get(
             str(profile or djlint_settings.get("profile", "html")).lower(), ()
         )
         self.ignore = str(
@@ -1419,29 +1491,13 @@ class Config:
         self.include = str(
             include or _as_comma_separated(djlint_settings.get("include", ""))
         )
-        with (Path(__file__).parent / "rules.yaml").open("rb") as f:
-            default_rules = yaml.safe_load(f)
-        rule_set = validate_rules(
-            chain(
-                default_rules,
-                load_custom_rules(
-                    rules or find_djlint_rules(self.project_root)
-                ),
-            )
-        )
-        self.linter_rules = tuple(
-            x
-            for x in rule_set
-            if x["rule"]["name"] not in self.ignore.split(",")
-            and not any(
-                x["rule"]["name"].startswith(code) for code in profile_codes
-            )
-            and self.profile not in x["rule"].get("exclude", set())
-            and (
-                x["rule"].get("default", True)
-                or x["rule"]["name"] in self.include.split(",")
-            )
-        )
+        self._rules_file = rules or find_djlint_rules(self.project_root)
+        # loaded on first use, so a run that does not lint skips them
+        self._linter_rules: tuple[Any, ...] | None = None
+        # compiled by the linter on first use
+        self.compiled_rules: RuleSet | None = None
+        # compiled by the formatter on first use, see config_patterns()
+        self.formatter_patterns: dict[Callable[[Config], Any], Any] = {}
         if self.lint:
             enabled_rules = {x["rule"]["name"] for x in self.linter_rules}
             conflicting = {"H017", "H035"} & enabled_rules
@@ -1618,7 +1674,8 @@ class Config:
         """
         )
 
-        # static patterns, built once at module import
+        # static patterns, built once at module import; the compiled ones
+        # are properties further down, compiled on first use
         self.attribute_pattern = _ATTRIBUTE_PATTERN
         self.template_tags = _TEMPLATE_TAGS
         self.tag_unindent_line = (
@@ -1636,43 +1693,7 @@ class Config:
         self.optional_single_line_template_tags = (
             _OPTIONAL_SINGLE_LINE_TEMPLATE_TAGS
         )
-        self.format_attribute_js_json_object_pattern = _JS_JSON_OBJECT_PATTERN
-        self.format_attribute_js_json_string_pattern = _JS_JSON_STRING_PATTERN
-        self.format_attribute_js_json_property_pattern = (
-            _JS_JSON_PROPERTY_PATTERN
-        )
-        self.script_style_opening_pattern = _SCRIPT_STYLE_OPENING_PATTERN
-        self.script_style_closing_pattern = _SCRIPT_STYLE_CLOSING_PATTERN
-        self.script_style_inline_imsx_pattern = (
-            _SCRIPT_STYLE_INLINE_IMSX_PATTERN
-        )
-        self.script_style_inline_ix_pattern = _SCRIPT_STYLE_INLINE_IX_PATTERN
-        self.ignored_block_opening_pattern = _IGNORED_BLOCK_OPENING_PATTERN
-        self.ignored_block_closing_pattern = _IGNORED_BLOCK_CLOSING_PATTERN
-        self.ignored_blocks_pattern = _IGNORED_BLOCKS_PATTERN
-        self.lint_ignored_blocks_pattern = _LINT_IGNORED_BLOCKS_PATTERN
-        self.ignored_blocks_inline_pattern = _IGNORED_BLOCKS_INLINE_PATTERN
-        self.ignored_inline_blocks_ix_pattern = (
-            _IGNORED_INLINE_BLOCKS_IX_PATTERN
-        )
-        self.ignored_linter_blocks_pattern = _IGNORED_LINTER_BLOCKS_PATTERN
-        self.ignored_trans_blocks_pattern = _IGNORED_TRANS_BLOCKS_PATTERN
-        self.ignored_trans_blocks_closing_pattern = (
-            _IGNORED_TRANS_BLOCKS_CLOSING_PATTERN
-        )
-        self.trans_trimmed_blocks_pattern = _TRANS_TRIMMED_BLOCKS_PATTERN
-        self.safe_closing_block_pattern = _SAFE_CLOSING_BLOCK_PATTERN
-        self.safe_closing_tag_pattern = _SAFE_CLOSING_TAG_PATTERN
-        self.template_blocks_pattern = _TEMPLATE_BLOCKS_PATTERN
-        self.unformatted_blocks_coarse_pattern = (
-            _UNFORMATTED_BLOCKS_COARSE_PATTERN
-        )
-        self.unformatted_blocks_pattern = _UNFORMATTED_BLOCKS_PATTERN
-        self.ignored_rule_patterns = _IGNORED_RULE_PATTERNS
-        self.optional_single_line_html_pattern = (
-            _OPTIONAL_SINGLE_LINE_HTML_PATTERN
-        )
-        self.optional_single_line_template_pattern = (
+        self._optional_single_line_template_pattern = (
             _OPTIONAL_SINGLE_LINE_TEMPLATE_PATTERN
         )
         if profile_blocks := _PROFILE_BLOCKS.get(self.profile):
@@ -1680,8 +1701,256 @@ class Config:
             self.optional_single_line_template_tags += "|" + "|".join(
                 profile_blocks.split(",")
             )
-            self.optional_single_line_template_pattern = re.compile(
+            self._optional_single_line_template_pattern = (
                 rf"^(?:{self.optional_single_line_template_tags})$",
                 RE_FLAGS_IX,
-                cache_pattern=False,
             )
+
+    @property
+    def format_attribute_js_json_object_pattern(self) -> re.Pattern[str]:
+        return _compiled(_JS_JSON_OBJECT_PATTERN)
+
+    @property
+    def format_attribute_js_json_string_pattern(self) -> re.Pattern[str]:
+        return _compiled(_JS_JSON_STRING_PATTERN)
+
+    @property
+    def format_attribute_js_json_property_pattern(self) -> re.Pattern[str]:
+        return _compiled(_JS_JSON_PROPERTY_PATTERN)
+
+    @property
+    def script_style_opening_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SCRIPT_STYLE_OPENING_PATTERN)
+
+    @property
+    def script_style_closing_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SCRIPT_STYLE_CLOSING_PATTERN)
+
+    @property
+    def script_style_inline_imsx_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SCRIPT_STYLE_INLINE_IMSX_PATTERN)
+
+    @property
+    def script_style_inline_ix_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SCRIPT_STYLE_INLINE_IX_PATTERN)
+
+    @property
+    def ignored_block_opening_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_BLOCK_OPENING_PATTERN)
+
+    @property
+    def ignored_block_closing_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_BLOCK_CLOSING_PATTERN)
+
+    @property
+    def ignored_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_BLOCKS_PATTERN)
+
+    @property
+    def lint_ignored_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_LINT_IGNORED_BLOCKS_PATTERN)
+
+    @property
+    def ignored_blocks_inline_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_BLOCKS_INLINE_PATTERN)
+
+    @property
+    def ignored_inline_blocks_ix_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_INLINE_BLOCKS_IX_PATTERN)
+
+    @property
+    def ignored_linter_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_LINTER_BLOCKS_PATTERN)
+
+    @property
+    def ignored_trans_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_TRANS_BLOCKS_PATTERN)
+
+    @property
+    def ignored_trans_blocks_closing_pattern(self) -> re.Pattern[str]:
+        return _compiled(_IGNORED_TRANS_BLOCKS_CLOSING_PATTERN)
+
+    @property
+    def trans_trimmed_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_TRANS_TRIMMED_BLOCKS_PATTERN)
+
+    @property
+    def safe_closing_block_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SAFE_CLOSING_BLOCK_PATTERN)
+
+    @property
+    def safe_closing_tag_pattern(self) -> re.Pattern[str]:
+        return _compiled(_SAFE_CLOSING_TAG_PATTERN)
+
+    @property
+    def template_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_TEMPLATE_BLOCKS_PATTERN)
+
+    @property
+    def unformatted_blocks_coarse_pattern(self) -> re.Pattern[str]:
+        return _compiled(_UNFORMATTED_BLOCKS_COARSE_PATTERN)
+
+    @property
+    def unformatted_blocks_pattern(self) -> re.Pattern[str]:
+        return _compiled(_UNFORMATTED_BLOCKS_PATTERN)
+
+    @property
+    def ignored_rule_patterns(self) -> tuple[re.Pattern[str], ...]:
+        return tuple(map(_compiled, _IGNORED_RULE_PATTERNS))
+
+    @property
+    def optional_single_line_html_pattern(self) -> re.Pattern[str]:
+        return _compiled(_OPTIONAL_SINGLE_LINE_HTML_PATTERN)
+
+    @property
+    def optional_single_line_template_pattern(self) -> re.Pattern[str]:
+        return _compiled(self._optional_single_line_template_pattern)
+
+    @property
+    def extensions(self) -> tuple[str, ...]:
+        """The extensions to check, from the comma-separated extension."""
+        return tuple(
+            x.strip().removeprefix(".")
+            for x in self.extension.split(",")
+            if x.strip()
+        )
+
+    @property
+    def gitignore(self) -> PathSpec[Pattern]:
+        if self._gitignore is None:
+            self._gitignore = load_gitignore(self.project_root)
+        return self._gitignore
+
+    @property
+    def linter_rules(self) -> tuple[Any, ...]:
+        """Linter rules, minus the ignored codes and the profile's excludes.
+
+        The built-in rules are already valid, so only custom rules from a
+        .djlint_rules.yaml file are validated.
+        """
+        if self._linter_rules is None:
+            ignore = self.ignore.split(",")
+            include = self.include.split(",")
+            self._linter_rules = tuple(
+                x
+                for x in chain(
+                    load_builtin_rules(),
+                    validate_rules(load_custom_rules(self._rules_file)),
+                )
+                if x["rule"]["name"] not in ignore
+                and not any(
+                    x["rule"]["name"].startswith(code)
+                    for code in self._profile_codes
+                )
+                and self.profile not in x["rule"].get("exclude", set())
+                and (
+                    x["rule"].get("default", True)
+                    or x["rule"]["name"] in include
+                )
+            )
+        return self._linter_rules
+
+
+def _matching_profile(config: Config, this_file: Path) -> str | None:
+    """The profile per_file_profiles gives a file, if any.
+
+    A glob with a slash is matched against the path from the project root,
+    and one without against the file name, as in .gitignore. The first
+    glob that matches wins.
+    """
+    try:
+        relative = this_file.relative_to(config.project_root).as_posix()
+    except ValueError:
+        relative = this_file.name
+    for glob, profile in config.per_file_profiles.items():
+        if fnmatchcase(
+            relative if "/" in glob else this_file.name, glob.removeprefix("/")
+        ):
+            return profile
+    return None
+
+
+@final
+class ConfigTree:
+    """The configs of a run, with one per directory that has its own.
+
+    With nested_config, a file is checked with the config of the nearest
+    directory, from its own up to the project root, that has djLint
+    settings. That config replaces the root's, it does not extend it, and
+    the command line options still apply. A config's per_file_profiles
+    then pick a variant of it with another profile for the files they
+    match. Each config and variant is built once, and each directory looked
+    up once, so a large repo's files share a handful of configs. Configs
+    are numbered, so that workers can be sent them all once and each file
+    with a number.
+    """
+
+    __slots__ = ("_by_directory", "_options", "_variants", "configs")
+
+    def __init__(self, root: Config, options: Mapping[str, Any]) -> None:
+        self.configs = [root]
+        # every config shares the run's cache directory and stdin setting
+        self._options = {
+            **options,
+            "cache_dir": root.cache_dir,
+            "no_cache": root.cache_dir is None,
+            "stdin": root.stdin,
+        }
+        self._by_directory = {root.project_root: 0}
+        # (config number, profile): number of the variant
+        self._variants: dict[tuple[int, str], int] = {}
+
+    @property
+    def root(self) -> Config:
+        return self.configs[0]
+
+    def index(self, this_file: Path) -> int:
+        """Number of the config that checks a resolved file path."""
+        index = self._directory_index(this_file)
+        config = self.configs[index]
+        if not config.per_file_profiles:
+            return index
+
+        profile = _matching_profile(config, this_file)
+        if profile is None or profile == config.profile:
+            return index
+        variant = self._variants.get((index, profile))
+        if variant is None:
+            variant = self._variants[index, profile] = len(self.configs)
+            self.configs.append(
+                Config(
+                    str(config.project_root),
+                    **{**self._options, "profile": profile},
+                )
+            )
+        return variant
+
+    def _directory_index(self, this_file: Path) -> int:
+        root = self.configs[0]
+        if not root.nested_config:
+            return 0
+
+        # the directories passed on the way get the same config
+        unknown = []
+        for directory in (this_file.parent, *this_file.parent.parents):
+            index = self._by_directory.get(directory)
+            if index is not None:
+                break
+            if not directory.is_relative_to(root.project_root):
+                index = 0
+                break
+            unknown.append(directory)
+            if has_djlint_settings(directory):
+                index = len(self.configs)
+                self.configs.append(Config(str(directory), **self._options))
+                break
+        else:
+            index = 0
+
+        for directory in unknown:
+            self._by_directory[directory] = index
+        return index
+
+    def config(self, this_file: Path) -> Config:
+        """Return the config that checks a resolved file path."""
+        return self.configs[self.index(this_file)]
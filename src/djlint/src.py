@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import os
 import sys
+from fnmatch import translate
+from pathlib import Path
 from types import MappingProxyType
 from typing import TYPE_CHECKING
 
 import regex as re
-from click import echo, style
+from click import UsageError, echo, style
 
 if sys.version_info >= (3, 13):
     from typing import NamedTuple
@@ -15,11 +18,20 @@ else:
     from typing_extensions import NamedTuple
 
 if TYPE_CHECKING:
-    from collections.abc import Iterable
-    from pathlib import Path
+    from collections.abc import Collection, Iterable, Iterator
     from typing import Final
 
-    from djlint.settings import Config
+    from djlint.settings import Config, ConfigTree
+
+# threads that read directories, when a level of the walk has many. They
+# wait on the disk rather than use the CPU, so there are more than cores.
+_WALK_THREADS: Final = 8
+
+# the assertions of an exclude pattern that look past where a match ends,
+# at whatever comes after it. Loose on purpose: an escaped "$" counts too.
+_LOOKS_AHEAD: Final = re.compile(
+    r"\(\?[=!]|\$|\\[bBmMzZ<>]", cache_pattern=False
+)
 
 
 class SrcFiles(NamedTuple):
@@ -28,7 +40,9 @@ class SrcFiles(NamedTuple):
     An empty ``paths`` with ``excluded`` set means candidates were found
     and every one of them was deliberately skipped by the configuration -
     a successful no-op. An empty ``paths`` without it means nothing
-    matched the requested paths at all, which is a usage error.
+    matched the requested paths at all, which is a usage error. With
+    ``paths`` found, ``excluded`` may be left unset, as finding out means
+    reading the directories that were pruned.
     """
 
     paths: list[Path]
@@ -49,38 +63,367 @@ def _gitignore_match(config: Config, filepath: Path) -> bool:
     return config.gitignore.match_file(rel)
 
 
+def _exclude_relative(
+    config: Config, in_project: str | None, in_root: str | None
+) -> bool:
+    """Check posix paths, relative to the project and the searched path."""
+    pattern = config.exclude_pattern
+    if in_project is not None and (
+        pattern.search(in_project) or pattern.search(f"/{in_project}")
+    ):
+        return True
+    return in_root is not None and pattern.search(in_root) is not None
+
+
 def _exclude_match(config: Config, filepath: Path, root: Path) -> bool:
     """Check if a file matches exclude patterns using relative paths."""
-    relative_roots = (
-        (config.project_root,)
-        if config.project_root == root
-        else (config.project_root, root)
-    )
-    for relative_root in relative_roots:
+    try:
+        in_project = filepath.relative_to(config.project_root).as_posix()
+    except ValueError:
+        in_project = None
+    in_root = None
+    if root != config.project_root:
         try:
-            rel = filepath.relative_to(relative_root)
+            in_root = filepath.relative_to(root).as_posix()
         except ValueError:
-            continue
-        rel_path = rel.as_posix()
-        if config.exclude_pattern.search(rel_path):
-            return True
-        if (
-            relative_root == config.project_root
-            and config.exclude_pattern.search(f"/{rel_path}")
-        ):
-            return True
-    return False
+            pass
+    return _exclude_relative(config, in_project, in_root)
+
 
+def _included(config: Config, filepath: Path, *, pragma: bool = True) -> bool:
+    """Check a file against the filters that need it to exist on disk.
 
-def _included(config: Config, filepath: Path) -> bool:
-    """Check a file against the filters that need it to exist on disk."""
-    return no_pragma(config, filepath) and (
+    Without pragma, require_pragma is left for the caller to check.
+    """
+    return (not pragma or no_pragma(config, filepath)) and (
         not config.use_gitignore or not _gitignore_match(config, filepath)
     )
 
 
-def get_src(src: Iterable[Path], config: Config) -> SrcFiles:
-    """Get source files."""
+def _owner_includes(root: Config, owner: Config, filepath: Path) -> bool:
+    """Check a file against the config it is checked with.
+
+    Files are found with the root config's settings, so a nested config's
+    exclude and .gitignore settings are checked again here, and
+    require_pragma, which was left out of the search, for every file.
+    """
+    if owner is root:
+        return no_pragma(root, filepath)
+    return not _exclude_match(owner, filepath, owner.project_root) and (
+        _included(owner, filepath)
+    )
+
+
+def _git(root: Path, *args: str) -> str:
+    import subprocess  # noqa: PLC0415
+
+    try:
+        result = subprocess.run(  # noqa: S603
+            ("git", "-C", str(root), *args),  # noqa: S607
+            capture_output=True,
+            check=True,
+            encoding="utf-8",
+        )
+    except FileNotFoundError:
+        msg = "--changed-since and --staged need git, which was not found."
+        raise UsageError(msg) from None
+    except subprocess.CalledProcessError as e:
+        msg = f"git {args[0]} failed: {e.stderr.strip()}"
+        raise UsageError(msg) from None
+    return result.stdout
+
+
+def git_changed_files(
+    root: Path, *, since: str | None, staged: bool
+) -> frozenset[Path]:
+    """Ask git which files changed, as resolved paths.
+
+    Changes since a ref include uncommitted and untracked files, so a
+    template is checked from the moment it is written. Deleted files are
+    left out. Paths are asked for from the toplevel, whatever diff.relative
+    is set to.
+    """
+    toplevel = Path(_git(root, "rev-parse", "--show-toplevel").strip())
+    names: list[str] = []
+    if since is not None:
+        names.extend(
+            _git(
+                root,
+                "diff",
+                "--no-relative",
+                "--name-only",
+                "-z",
+                "--diff-filter=d",
+                "--end-of-options",
+                since,
+                "--",
+            ).split("\0")
+        )
+        names.extend(
+            _git(
+                root,
+                "ls-files",
+                "--others",
+                "--exclude-standard",
+                "--full-name",
+                "-z",
+            ).split("\0")
+        )
+    if staged:
+        names.extend(
+            _git(
+                root,
+                "diff",
+                "--cached",
+                "--no-relative",
+                "--name-only",
+                "-z",
+                "--diff-filter=d",
+            ).split("\0")
+        )
+
+    toplevel = toplevel.resolve()
+    return frozenset(toplevel / name for name in names if name)
+
+
+def _changed_under(
+    directory: Path, changed: Collection[Path], names: re.Pattern[str]
+) -> Iterator[Path]:
+    """Yield the changed files the walk would find in directory."""
+    for path in sorted(changed):
+        if names.match(path.name) and path.is_relative_to(directory):
+            yield path
+
+
+def _name_pattern(extensions: Iterable[str]) -> re.Pattern[str]:
+    """Match the file names ending in any of the extensions.
+
+    An extension is a glob, as it was when files were found with
+    ``Path.glob("**/*.{extension}")``, so one such as ``htm*`` still works.
+    """
+    return re.compile(
+        "|".join(translate(f"*.{x.removeprefix('.')}") for x in extensions),
+        # file names are compared the way the file system compares them
+        re.I if os.path.normcase("A") == "a" else 0,
+        cache_pattern=False,
+    )
+
+
+class _Directory(NamedTuple):
+    """A directory to walk.
+
+    Its posix paths relative to the project and to the searched path are
+    each empty or end in a slash, and are None where they do not apply.
+    """
+
+    path: str
+    in_project: str | None
+    in_root: str | None
+
+
+def _list_directory(directory: str) -> list[os.DirEntry[str]]:
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except OSError:
+        # unreadable, or gone since its parent was read
+        return []
+
+
+def _list_directories(
+    directories: Iterable[_Directory],
+) -> list[list[os.DirEntry[str]]]:
+    return [_list_directory(x.path) for x in directories]
+
+
+def _is_entry(entry: os.DirEntry[str], *, directory: bool) -> bool:
+    """Whether an entry is a directory, not followed, or a file, followed."""
+    try:
+        return (
+            entry.is_dir(follow_symlinks=False)
+            if directory
+            else entry.is_file()
+        )
+    except OSError:
+        # gone, or unreadable, since its directory was read
+        return False
+
+
+class _Walk:
+    """Find the files under the searched directories.
+
+    Directories that the exclude pattern or .gitignore match are pruned
+    before they are read, as are .git, node_modules and the others the
+    default exclude pattern names. A directory is matched with a trailing
+    slash, which is how the path of every file in it starts. A match there
+    is a match of each file's path too, unless the pattern looks ahead past
+    the slash: "foo/(?!keep)" matches "foo/" but not "foo/keep.html". The
+    directories of such a pattern are walked, and their files excluded one
+    by one.
+    Symlinked directories are not followed, as Path.glob did not follow
+    them either.
+
+    A directory is walked a level at a time. os.scandir does not hold the
+    GIL while it reads a directory, so a level with many directories is
+    read by a thread pool, a slice per thread, while the entries are
+    sorted out on this one. That pays off on a cold disk cache or a network
+    file system, where reading the directories is most of the walk.
+    """
+
+    __slots__ = (
+        "_gitignore",
+        "_prune_excluded",
+        "config",
+        "excluded",
+        "names",
+        "pragma",
+        "pruned",
+    )
+
+    def __init__(
+        self, config: Config, names: re.Pattern[str], *, pragma: bool
+    ) -> None:
+        self.config = config
+        self.names = names
+        # whether to check require_pragma
+        self.pragma = pragma
+        self._gitignore = config.gitignore if config.use_gitignore else None
+        self._prune_excluded = not _LOOKS_AHEAD.search(config.exclude)
+        # whether a file that matched was skipped
+        self.excluded = False
+        # directories left out, without looking inside
+        self.pruned: list[str] = []
+
+    def _ignored(self, in_project: str | None) -> bool:
+        return (
+            self._gitignore is not None
+            and in_project is not None
+            and self._gitignore.match_file(in_project)
+        )
+
+    def walk(self, root: Path) -> list[Path]:
+        """Return the files to check under a resolved directory."""
+        try:
+            in_project: str | None = root.relative_to(
+                self.config.project_root
+            ).as_posix()
+        except ValueError:
+            in_project = None
+        else:
+            in_project = "" if in_project == "." else f"{in_project}/"
+        # relative to the project root, the paths are matched already
+        in_root = "" if root != self.config.project_root else None
+
+        paths: list[Path] = []
+        level = [_Directory(str(root), in_project, in_root)]
+        pool = None
+        try:
+            while level:
+                if len(level) < _WALK_THREADS * 4:
+                    listed = _list_directories(level)
+                else:
+                    if pool is None:
+                        from concurrent.futures import (  # noqa: PLC0415
+                            ThreadPoolExecutor,
+                        )
+
+                        pool = ThreadPoolExecutor(
+                            _WALK_THREADS, thread_name_prefix="djlint-walk"
+                        )
+                    slices = pool.map(
+                        _list_directories,
+                        (level[x::_WALK_THREADS] for x in range(_WALK_THREADS)),
+                    )
+                    # put the slices back in the order of the level
+                    listed = [[]] * len(level)
+                    for start, entries in enumerate(slices):
+                        listed[start::_WALK_THREADS] = entries
+
+                next_level: list[_Directory] = []
+                for directory, entries in zip(level, listed, strict=True):
+                    for entry in entries:
+                        self._sort_out(directory, entry, paths, next_level)
+                level = next_level
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return paths
+
+    def _sort_out(
+        self,
+        directory: _Directory,
+        entry: os.DirEntry[str],
+        paths: list[Path],
+        directories: list[_Directory],
+    ) -> None:
+        """Add an entry to the files to check or the directories to walk."""
+        name = entry.name
+        in_project = (
+            None
+            if directory.in_project is None
+            else directory.in_project + name
+        )
+        in_root = (
+            None if directory.in_root is None else directory.in_root + name
+        )
+
+        if _is_entry(entry, directory=True):
+            in_project = None if in_project is None else f"{in_project}/"
+            in_root = None if in_root is None else f"{in_root}/"
+            if (
+                self._prune_excluded
+                and _exclude_relative(self.config, in_project, in_root)
+            ) or self._ignored(in_project):
+                self.pruned.append(entry.path)
+            else:
+                directories.append(_Directory(entry.path, in_project, in_root))
+            return
+
+        if not self.names.match(name):
+            return
+        # the exclude pattern is string work, so testing it first spares
+        # the stat of a symlink for everything it drops
+        if _exclude_relative(self.config, in_project, in_root):
+            self.excluded = True
+        elif not _is_entry(entry, directory=False):
+            return
+        elif self._ignored(in_project):
+            self.excluded = True
+        else:
+            path = Path(entry.path)
+            if self.pragma and not no_pragma(self.config, path):
+                self.excluded = True
+            else:
+                paths.append(path)
+
+
+def _holds_candidates(names: re.Pattern[str], directory: str) -> bool:
+    """Whether a pruned directory has anything the extension matches."""
+    if names.match(Path(directory).name):
+        return True
+    return any(
+        names.match(name)
+        for _, directories, files in os.walk(directory)
+        for name in (*directories, *files)
+    )
+
+
+def get_src(
+    src: Iterable[Path],
+    config: Config,
+    changed: Collection[Path] | None = None,
+    tree: ConfigTree | None = None,
+) -> SrcFiles:
+    """Get source files.
+
+    With changed, only those files are picked from the given paths, and
+    directories are not walked at all. With a tree of nested configs, each
+    file is also checked against the settings of the config it will be
+    checked with.
+    """
+    nested = tree is not None and config.nested_config
+    names = _name_pattern(config.extensions)
+    walk = _Walk(config, names, pragma=not nested)
     paths = []
     excluded = False
     for item in src:
@@ -89,32 +432,41 @@ def get_src(src: Iterable[Path], config: Config) -> SrcFiles:
         normalized_item = item.resolve()
 
         if normalized_item.is_file():
+            if changed is not None and normalized_item not in changed:
+                continue
             if _exclude_match(
                 config, normalized_item, config.project_root
-            ) or not _included(config, normalized_item):
+            ) or not _included(config, normalized_item, pragma=not nested):
                 excluded = True
             else:
                 paths.append(normalized_item)
             continue
 
-        # remove leading . from extension
-        extension = config.extension.removeprefix(".")
+        if changed is None:
+            paths.extend(walk.walk(normalized_item))
+            continue
 
-        for candidate in normalized_item.glob(f"**/*.{extension}"):
+        for candidate in _changed_under(normalized_item, changed, names):
             if _exclude_match(config, candidate, normalized_item):
                 excluded = True
+            elif not candidate.is_file():
                 continue
-            # a directory can match the extension glob too, and it is not a
-            # candidate at all: opening one raises rather than excluding it.
-            # The exclude pattern above is pure string work, so testing it
-            # first spares this syscall for everything the pattern drops.
-            if not candidate.is_file():
-                continue
-            if _included(config, candidate):
+            elif _included(config, candidate, pragma=not nested):
                 paths.append(candidate)
             else:
                 excluded = True
 
+    if tree is not None and nested:
+        kept = [x for x in paths if _owner_includes(config, tree.config(x), x)]
+        excluded |= len(kept) < len(paths)
+        paths = kept
+
+    # a run that found nothing says whether the configuration skipped
+    # something, which is only known for pruned directories by looking in
+    excluded |= walk.excluded
+    if not paths and not excluded:
+        excluded = any(_holds_candidates(names, x) for x in walk.pruned)
+
     return SrcFiles(paths, excluded)
 
 
@@ -13,6 +13,16 @@ class LintError(TypedDict):
 class ProcessResult(TypedDict, total=False):
     format_message: dict[str, tuple[str, ...]]
     lint_message: dict[str, list[LintError]]
+    # why a file was not checked, such as running past --file-timeout
+    skipped: dict[str, str]
+    # seconds and peak memory per stage and rule, with --profile-stages
+    profile: dict[str, FileProfile]
+
+@type_check_only
+class FileProfile(TypedDict):
+    # the memory is None for a file checked in a thread
+    stages: dict[str, tuple[float, int | None]]
+    rules: dict[str, tuple[float, int | None]]
 
 @type_check_only
 class SpanMatch(Protocol):
@@ -26,11 +26,19 @@ if TYPE_CHECKING:
     from djlint.types import LintError
 
 
+@pytest.fixture(autouse=True)
+def _isolate_cache(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """Keep result caches out of the source tree and apart between tests."""
+    monkeypatch.setenv("DJLINT_CACHE_DIR", str(tmp_path / ".djlint_cache"))
+
+
 @pytest.fixture
-def runner(monkeypatch: pytest.MonkeyPatch) -> CliRunner:
+def runner(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> CliRunner:
     """Click runner for djlint tests."""
     monkeypatch.delenv("GITHUB_ACTIONS", raising=False)
     monkeypatch.delenv("NO_COLOR", raising=False)
+    # keep stdin tests away from a daemon the developer has running
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
     return CliRunner()
 
 
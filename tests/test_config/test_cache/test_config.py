@@ -0,0 +1,232 @@
+"""Djlint tests for the result cache.
+
+run::
+
+   pytest tests/test_config/test_cache/test_config.py --cov=src/djlint \
+     --cov-branch --cov-report xml:coverage.xml --cov-report term-missing
+
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from djlint import main as djlint
+from djlint.cache import config_fingerprint, prune_cache
+from djlint.reformat import reformat_string
+from djlint.settings import Config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from click.testing import CliRunner
+
+
+@pytest.fixture(autouse=True)
+def _isolate_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Use the cache location the project configures, as a real run does."""
+    monkeypatch.delenv("DJLINT_CACHE_DIR", raising=False)
+
+
+# needs reformatting and has an orphan tag (H025)
+UNFORMATTED = "<div><p>x</p>   </div><div>"
+
+
+def _project(tmp_path: Path, config: str = "") -> Path:
+    (tmp_path / "pyproject.toml").write_text(
+        f"[tool]\n[tool.djlint]\n{config}", encoding="utf-8"
+    )
+    template = tmp_path / "a.html"
+    template.write_text(UNFORMATTED, encoding="utf-8")
+    return template
+
+
+def _entries(cache_dir: Path) -> list[Path]:
+    return sorted(cache_dir.glob("*/*.json"))
+
+
+def test_unchanged_file_is_replayed(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+
+    first = runner.invoke(djlint, (str(template), "--check", "--lint"))
+    entries = _entries(tmp_path / ".djlint_cache")
+    assert len(entries) == 1
+
+    # a replayed result is only ever read from the entry, so editing the
+    # entry shows up in the output
+    entries[0].write_text(
+        entries[0].read_text(encoding="utf-8").replace("H025", "X999"),
+        encoding="utf-8",
+    )
+    second = runner.invoke(djlint, (str(template), "--check", "--lint"))
+
+    assert first.exit_code == second.exit_code == 1
+    assert "H025" in first.output
+    assert "X999" in second.output
+    assert second.output.replace("X999", "H025") == first.output
+
+
+def test_changed_file_misses(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+    runner.invoke(djlint, (str(template), "--check"))
+
+    template.write_text("<div></div>\n", encoding="utf-8")
+    result = runner.invoke(djlint, (str(template), "--check"))
+
+    assert result.exit_code == 0
+    assert len(_entries(tmp_path / ".djlint_cache")) == 2
+
+
+def test_changed_config_misses(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+    result = runner.invoke(djlint, (str(template), "--lint"))
+    assert "H025" in result.output
+
+    result = runner.invoke(djlint, (str(template), "--lint", "--ignore=H025"))
+
+    assert "H025" not in result.output
+    assert len(list((tmp_path / ".djlint_cache").glob("*/"))) == 2
+
+
+def test_cached_check_still_reformats(
+    runner: CliRunner, tmp_path: Path
+) -> None:
+    template = _project(tmp_path)
+    runner.invoke(djlint, (str(template), "--check"))
+
+    result = runner.invoke(djlint, (str(template), "--reformat"))
+
+    assert result.exit_code == 1
+    assert "1 file was updated." in result.output
+    assert template.read_text(encoding="utf-8") == (
+        "<div>\n    <p>x</p>\n</div>\n<div>\n"
+    )
+
+
+def test_no_cache(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+
+    result = runner.invoke(djlint, (str(template), "--check", "--no-cache"))
+
+    assert result.exit_code == 1
+    assert not (tmp_path / ".djlint_cache").exists()
+
+
+def test_no_cache_config(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path, "no_cache = true\n")
+
+    runner.invoke(djlint, (str(template), "--check"))
+
+    assert not (tmp_path / ".djlint_cache").exists()
+
+
+def test_cache_dir(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+    cache_dir = tmp_path / "elsewhere"
+
+    runner.invoke(
+        djlint, (str(template), "--check", "--cache-dir", str(cache_dir))
+    )
+
+    assert len(_entries(cache_dir)) == 1
+    assert (cache_dir / ".gitignore").exists()
+    assert not (tmp_path / ".djlint_cache").exists()
+
+
+def test_cache_dir_config(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path, 'cache_dir = "build/cache"\n')
+
+    runner.invoke(djlint, (str(template), "--check"))
+
+    assert len(_entries(tmp_path / "build" / "cache")) == 1
+
+
+def test_prune_cache(tmp_path: Path) -> None:
+    namespace = tmp_path / "0123456789abcdef"
+    namespace.mkdir()
+    now = time.time()
+    ages = {"old": 40, "older": 20, "newer": 10, "new": 0}
+    for name, days in ages.items():
+        entry = namespace / f"{name}.json"
+        entry.write_bytes(b"x" * 100)
+        mtime = now - days * 24 * 60 * 60
+        os.utime(entry, (mtime, mtime))
+    stale = tmp_path / "fedcba9876543210"
+    stale.mkdir()
+    old_entry = stale / "old.json"
+    old_entry.write_bytes(b"x")
+    os.utime(old_entry, (now - 10**8, now - 10**8))
+
+    prune_cache(tmp_path, max_size=200)
+
+    assert sorted(x.name for x in namespace.iterdir()) == [
+        "new.json",
+        "newer.json",
+    ]
+    assert not stale.exists()
+
+    # pruning again straight away is skipped
+    (namespace / "new.json").write_bytes(b"x" * 1000)
+    prune_cache(tmp_path, max_size=200)
+    assert len(list(namespace.iterdir())) == 2
+
+
+def test_cache_dir_environment(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    template = _project(tmp_path)
+    cache_dir = tmp_path / "from-env"
+    monkeypatch.setenv("DJLINT_CACHE_DIR", str(cache_dir))
+
+    runner.invoke(djlint, (str(template), "--check"))
+
+    assert len(_entries(cache_dir)) == 1
+
+
+def test_compiled_patterns_not_fingerprinted(tmp_path: Path) -> None:
+    config = Config(str(tmp_path), reformat=True)
+    fingerprint = config_fingerprint(config)
+
+    # formatting compiles the config's patterns onto it
+    reformat_string(config, UNFORMATTED, "a.html")
+    assert config.formatter_patterns
+    assert config_fingerprint(config) == fingerprint
+
+
+def test_project_root_fingerprinted(tmp_path: Path) -> None:
+    """Paths in the settings are matched relative to the project root."""
+    for name in ("one", "two"):
+        (tmp_path / name).mkdir()
+        _project(tmp_path / name, 'per-file-ignores = { "a.html" = "H025" }')
+
+    assert config_fingerprint(Config(str(tmp_path / "one"))) != (
+        config_fingerprint(Config(str(tmp_path / "two")))
+    )
+
+
+def test_fingerprint_stable_between_processes(tmp_path: Path) -> None:
+    """Each run is a new process, with its own hash seed."""
+    _project(tmp_path)
+    script = (
+        "import sys\n"
+        "from djlint.cache import config_fingerprint\n"
+        "from djlint.settings import Config\n"
+        "print(config_fingerprint(Config(sys.argv[1], reformat=True)))\n"
+    )
+    fingerprints = {
+        subprocess.run(  # noqa: S603
+            (sys.executable, "-c", script, str(tmp_path)),
+            capture_output=True,
+            check=True,
+            env={**os.environ, "PYTHONHASHSEED": seed},
+            text=True,
+        ).stdout
+        for seed in ("1", "2", "3")
+    }
+    assert len(fingerprints) == 1
@@ -0,0 +1,125 @@
+"""Test for the per-file time budget.
+
+uv run pytest tests/test_config/test_file_timeout.py
+"""
+
+from __future__ import annotations
+
+import signal
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import regex as re
+
+from djlint import main as djlint
+from djlint.deadline import FileTimeout, deadline, paused
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from click.testing import CliRunner
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(signal, "setitimer"), reason="needs interval timers"
+)
+
+
+def _stall(*_args: object) -> str:
+    time.sleep(10)
+    return ""
+
+
+def test_runaway_match_interrupted() -> None:
+    start = time.monotonic()
+    with pytest.raises(FileTimeout), deadline(0.1):
+        re.search(r"(\w*)*\d(?<=x)", "a" * 5000)
+    assert time.monotonic() - start < 5
+
+    # the timer and handler are gone once the block is left
+    assert signal.getitimer(signal.ITIMER_REAL) == (0.0, 0.0)
+    assert signal.getsignal(signal.SIGALRM) is signal.SIG_DFL
+
+
+def test_paused_deadline() -> None:
+    with deadline(0.2), paused():
+        time.sleep(0.3)
+
+
+def test_file_skipped(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("djlint.reformat.formatter", _stall)
+    template = tmp_path / "a.html"
+    template.write_text("<div><p>x</p>   </div>", encoding="utf-8")
+
+    result = runner.invoke(
+        djlint, (str(template), "--reformat", "--file-timeout", "0.1")
+    )
+    assert result.exit_code == 0
+    assert "a.html skipped: timeout" in result.output
+    assert "Skipped 1 file." in result.output
+    assert template.read_text(encoding="utf-8") == "<div><p>x</p>   </div>"
+
+
+def test_stdin_skipped(
+    runner: CliRunner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("djlint.reformat.formatter", _stall)
+    result = runner.invoke(
+        djlint,
+        ("-", "--reformat", "--file-timeout", "0.1"),
+        input="<div><p>x</p>   </div>",
+    )
+    # the input comes back as it was
+    assert result.stdout == "<div><p>x</p>   </div>"
+    assert "- skipped: timeout" in result.stderr
+
+
+@pytest.mark.parametrize("mode", ["--check", "--lint"])
+def test_skipped_file_fails_the_run(
+    runner: CliRunner,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str,
+) -> None:
+    monkeypatch.setattr("djlint.reformat.formatter", _stall)
+    monkeypatch.setattr("djlint.lint.linter", _stall)
+    template = tmp_path / "a.html"
+    template.write_text("<div></div>\n", encoding="utf-8")
+
+    # the file was never checked, so the run cannot pass
+    result = runner.invoke(
+        djlint, (str(template), mode, "--file-timeout", "0.1")
+    )
+    assert "a.html skipped: timeout" in result.output
+    assert result.exit_code == 1
+
+    result = runner.invoke(
+        djlint,
+        (str(template), mode, "--file-timeout", "0.1", "--github-output"),
+    )
+    assert result.exit_code == 1
+
+    result = runner.invoke(
+        djlint, (str(template), mode, "--file-timeout", "0.1", "--warn")
+    )
+    assert result.exit_code == 0
+
+
+def test_unenforced_timeout_warned(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr("djlint.process_cpu_count", lambda: 2)
+    monkeypatch.setattr("djlint._is_free_threaded_python", lambda: True)
+    for name in ("a.html", "b.html"):
+        (tmp_path / name).write_text("<div></div>\n", encoding="utf-8")
+
+    # once per run, not once per file or worker
+    result = runner.invoke(djlint, (str(tmp_path), "--file-timeout", "10"))
+    assert result.stderr.count("--file-timeout is not enforced") == 1
+
+    # the main thread keeps to the budget, and says nothing
+    monkeypatch.setattr("djlint.process_cpu_count", lambda: 1)
+    result = runner.invoke(djlint, (str(tmp_path), "--file-timeout", "10"))
+    assert "--file-timeout is not enforced" not in result.stderr
@@ -12,6 +12,7 @@ from typing import TYPE_CHECKING
 
 import pytest
 
+from djlint.formatter.embedded import _cached_beautify_block  # noqa: PLC2701
 from djlint.reformat import formatter
 from tests.conftest import config_builder, printer
 
@@ -247,6 +248,29 @@ test_data = [
         ({"format_js": True, "profile": "jinja"}),
         id="template tags",
     ),
+    pytest.param(
+        (
+            "<div><div><script>"
+            "function f(){if(a){return `a\n  b`}}"
+            "</script></div></div>"
+        ),
+        (
+            "<div>\n"
+            "    <div>\n"
+            "        <script>\n"
+            "          function f() {\n"
+            "            if (a) {\n"
+            "              return `a\n"
+            "  b`\n"
+            "            }\n"
+            "          }\n"
+            "        </script>\n"
+            "    </div>\n"
+            "</div>\n"
+        ),
+        ({"format_js": True, "indent_js": 2}),
+        id="nested levels and multiline string",
+    ),
 ]
 
 
@@ -256,3 +280,19 @@ def test_base(source: str, expected: str, args: dict[str, Any]) -> None:
 
     printer(expected, source, output)
     assert expected == output
+
+
+def test_config_not_changed() -> None:
+    config = config_builder({"format_js": True, "indent_js": 2})
+    formatter(config, "<script>a()</script><script>b()</script>")
+    assert config.js_config == {"indent_size": 2}
+
+
+def test_repeated_block_formatted_once() -> None:
+    config = config_builder({"format_js": True})
+    source = "<div><script>track('view')</script></div>\n" * 3
+    _cached_beautify_block.cache_clear()
+    formatter(config, source)
+    info = _cached_beautify_block.cache_info()
+    assert info.misses == 1
+    assert info.hits >= 2
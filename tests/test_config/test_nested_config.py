@@ -0,0 +1,154 @@
+"""Test nested configuration, resolved per directory.
+
+uv run pytest tests/test_config/test_nested_config.py
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from djlint import main as djlint
+from djlint.settings import Config, ConfigTree
+
+if TYPE_CHECKING:
+    import pytest
+    from click.testing import CliRunner
+
+TEMPLATE = '<a href="/about/">About</a>\n'
+
+
+def _monorepo(root: Path) -> dict[str, Path]:
+    """A django project with a jinja app, and an app without djLint config."""
+    (root / "pyproject.toml").write_text(
+        '[tool.djlint]\nprofile = "django"\nnested_config = true\n',
+        encoding="utf-8",
+    )
+    files = {}
+    for app, config in (
+        ("shop", ("djlint.toml", 'profile = "jinja"\n')),
+        # configures other tools only, so the root's config applies
+        ("blog", ("pyproject.toml", "[tool.black]\nline-length = 88\n")),
+        ("docs", None),
+    ):
+        templates = root / "apps" / app / "templates"
+        templates.mkdir(parents=True)
+        if config is not None:
+            (root / "apps" / app / config[0]).write_text(
+                config[1], encoding="utf-8"
+            )
+        files[app] = templates / "page.html"
+        files[app].write_text(TEMPLATE, encoding="utf-8")
+    files["root"] = root / "index.html"
+    files["root"].write_text(TEMPLATE, encoding="utf-8")
+    return files
+
+
+def test_nested_profiles(runner: CliRunner, tmp_path: Path) -> None:
+    files = _monorepo(tmp_path)
+
+    result = runner.invoke(djlint, (str(tmp_path), "--lint"))
+    assert result.exit_code == 1
+    sections = result.output.split("\n\n")
+    for app, code in (
+        ("shop", "J018"),
+        ("blog", "D018"),
+        ("docs", "D018"),
+        ("root", "D018"),
+    ):
+        name = str(files[app].relative_to(tmp_path))
+        section = next(x for x in sections if name in x)
+        assert code in section, app
+    assert "Linted 4 files, found 4 errors." in result.output
+
+
+def test_stdin_filename(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    files = _monorepo(tmp_path)
+    # stdin's project is the one it is run from
+    monkeypatch.chdir(tmp_path)
+
+    result = runner.invoke(
+        djlint,
+        (
+            "-",
+            "--lint",
+            "--stdin-filename",
+            str(files["shop"]),
+            "--configuration",
+            str(tmp_path / "pyproject.toml"),
+        ),
+        input=TEMPLATE,
+    )
+    # a config given on the command line is for every file
+    assert "D018" in result.output
+
+    result = runner.invoke(
+        djlint,
+        ("-", "--lint", "--stdin-filename", str(files["shop"])),
+        input=TEMPLATE,
+    )
+    assert "J018" in result.output
+
+
+def test_configs_shared(tmp_path: Path) -> None:
+    files = _monorepo(tmp_path)
+    for number in range(20):
+        (files["shop"].parent / f"page_{number}.html").touch()
+        (files["docs"].parent / f"page_{number}.html").touch()
+
+    root = Config(str(tmp_path))
+    tree = ConfigTree(root, {})
+    indexes = {
+        this_file.parent.parent.name: tree.index(this_file)
+        for this_file in sorted(tmp_path.glob("apps/*/templates/*.html"))
+    }
+    assert indexes == {"blog": 0, "docs": 0, "shop": 1}
+    assert len(tree.configs) == 2
+    assert tree.configs[1].profile == "jinja"
+    assert tree.configs[1].project_root == files["shop"].parent.parent
+    # nested configs share the run's cache
+    assert tree.configs[1].cache_dir == root.cache_dir
+
+    # without the option, every file gets the root's config
+    (tmp_path / "pyproject.toml").write_text(
+        '[tool.djlint]\nprofile = "django"\n', encoding="utf-8"
+    )
+    root = Config(str(tmp_path))
+    assert ConfigTree(root, {}).index(files["shop"]) == 0
+    root = Config(str(tmp_path), nested_config=True)
+    assert ConfigTree(root, {}).index(files["shop"]) == 1
+
+
+def test_nested_file_selection(runner: CliRunner, tmp_path: Path) -> None:
+    """A nested config's exclude and require_pragma pick its files."""
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool.djlint]\nnested_config = true\nrequire_pragma = true\n",
+        encoding="utf-8",
+    )
+    app = tmp_path / "app"
+    (app / "vendor").mkdir(parents=True)
+    (app / "pyproject.toml").write_text(
+        '[tool.djlint]\nexclude = "vendor"\nrequire_pragma = true\n',
+        encoding="utf-8",
+    )
+    unformatted = "<div><p>x</p></div>\n"
+    (app / "a.html").write_text(unformatted, encoding="utf-8")
+    (app / "vendor" / "b.html").write_text(unformatted, encoding="utf-8")
+    (app / "c.html").write_text(
+        "<!-- djlint:on -->\n" + unformatted, encoding="utf-8"
+    )
+    # the root requires the pragma, the nested config does not
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "pyproject.toml").write_text(
+        '[tool.djlint]\nprofile = "html"\n', encoding="utf-8"
+    )
+    (other / "d.html").write_text(unformatted, encoding="utf-8")
+    (tmp_path / "e.html").write_text(unformatted, encoding="utf-8")
+
+    result = runner.invoke(djlint, (str(tmp_path), "--check"))
+    assert "2 files would be updated." in result.output
+    assert str(Path("app", "c.html")) in result.output
+    assert str(Path("other", "d.html")) in result.output
@@ -0,0 +1,125 @@
+"""Test checking several extensions, each with its own profile, in one run.
+
+uv run pytest tests/test_config/test_per_file_profiles.py
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from djlint import main as djlint
+from djlint.settings import Config, ConfigTree
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    import pytest
+    from click.testing import CliRunner
+
+TEMPLATE = '<a href="/about/">About</a>\n'
+
+PYPROJECT = """\
+[tool.djlint]
+profile = "django"
+extension = ["html", "jinja", "hbs"]
+
+[tool.djlint.per-file-profiles]
+"*.jinja" = "jinja"
+"*.hbs" = "handlebars"
+"emails/*.html" = "jinja"
+"""
+
+
+def _project(root: Path) -> None:
+    (root / "pyproject.toml").write_text(PYPROJECT, encoding="utf-8")
+    (root / "emails").mkdir()
+    for name in ("page.html", "page.jinja", "page.hbs", "page.txt"):
+        (root / name).write_text(TEMPLATE, encoding="utf-8")
+    (root / "emails" / "welcome.html").write_text(TEMPLATE, encoding="utf-8")
+
+
+def _codes(output: str) -> dict[str, str]:
+    """The lint code reported for each file."""
+    lines = output.splitlines()
+    # each file's name is underlined, and its first error follows
+    return {
+        lines[number - 1]: lines[number + 1].split(" ", 1)[0]
+        for number, line in enumerate(lines)
+        if line.startswith("─")
+    }
+
+
+def test_profiles_by_glob(runner: CliRunner, tmp_path: Path) -> None:
+    _project(tmp_path)
+
+    result = runner.invoke(djlint, (str(tmp_path), "--lint"))
+    assert result.exit_code == 1
+    assert "Linted 4 files, found 3 errors." in result.output
+    assert _codes(result.output) == {
+        "page.html": "D018",
+        "page.jinja": "J018",
+        "emails/welcome.html": "J018",
+    }
+
+    # the command line replaces both
+    result = runner.invoke(
+        djlint,
+        (
+            str(tmp_path),
+            "--lint",
+            "--extension",
+            "html,.txt",
+            "--per-file-profiles",
+            "*.txt",
+            "jinja",
+        ),
+    )
+    assert "Linted 3 files, found 3 errors." in result.output
+    assert _codes(result.output) == {
+        "page.html": "D018",
+        "page.txt": "J018",
+        "emails/welcome.html": "D018",
+    }
+
+
+def test_stdin_filename(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _project(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    result = runner.invoke(
+        djlint,
+        ("-", "--lint", "--stdin-filename", "emails/welcome.html"),
+        input=TEMPLATE,
+    )
+    assert "J018" in result.output
+
+
+def test_variants_shared(tmp_path: Path) -> None:
+    _project(tmp_path)
+    root = Config(str(tmp_path))
+    tree = ConfigTree(root, {})
+
+    indexes = [
+        tree.index(tmp_path / f"page_{number}.{extension}")
+        for number in range(50)
+        for extension in ("html", "jinja", "hbs")
+    ]
+    assert set(indexes) == {0, 1, 2}
+    assert [x.profile for x in tree.configs] == [
+        "django",
+        "jinja",
+        "handlebars",
+    ]
+    assert tree.index(tmp_path / "emails" / "welcome.html") == 1
+
+
+def test_invalid_profile(runner: CliRunner, tmp_path: Path) -> None:
+    _project(tmp_path)
+
+    result = runner.invoke(
+        djlint, (str(tmp_path), "--per-file-profiles", "*.hbs", "mustache")
+    )
+    assert result.exit_code == 2
+    assert "Invalid profile 'mustache'" in result.output
@@ -0,0 +1,156 @@
+"""Test for the stage and rule profile.
+
+uv run pytest tests/test_config/test_profile_stages.py
+"""
+
+from __future__ import annotations
+
+import json
+import signal
+import threading
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import pytest
+
+from djlint import main as djlint
+from djlint.profiling import stage, start_profile, stop_tracing
+from djlint.settings import Config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from click.testing import CliRunner
+
+    from djlint.types import FileProfile
+
+
+def _project(tmp_path: Path) -> Path:
+    (tmp_path / "pyproject.toml").write_text(
+        "[tool]\n[tool.djlint]\n", encoding="utf-8"
+    )
+    template = tmp_path / "a.html"
+    template.write_text("<div><p>x</p>   </div><img>", encoding="utf-8")
+    return template
+
+
+def test_profile_written(runner: CliRunner, tmp_path: Path) -> None:
+    template = _project(tmp_path)
+    report = tmp_path / "profile.json"
+
+    result = runner.invoke(
+        djlint,
+        (
+            str(template),
+            "--check",
+            "--lint",
+            "--format-css",
+            "--profile-stages",
+            str(report),
+        ),
+    )
+    assert "Slowest stages" in result.stderr
+    assert "Slowest rules" in result.stderr
+
+    profile = json.loads(report.read_text(encoding="utf-8"))
+    assert {x["name"] for x in profile["stages"]} == {
+        "mask_unformatted_blocks",
+        "compress_html",
+        "expand_html",
+        "clean_whitespace",
+        "indent_html",
+        "condense_html",
+        "format_css",
+    }
+    rules = {x["name"]: x for x in profile["rules"]}
+    assert rules["H013"]["kind"] == "pattern"
+    assert rules["H025"]["kind"] == "python_module"
+    assert rules["H025"]["files"] == 1
+
+    (file_profile,) = profile["files"]
+    assert file_profile["file"] == str(template)
+    assert set(file_profile["stages"]) == {x["name"] for x in profile["stages"]}
+
+    # a profiled run checks the file again instead of replaying the cache
+    assert not (tmp_path / ".djlint_cache").exists()
+
+
+@pytest.mark.skipif(
+    not hasattr(signal, "setitimer"), reason="needs interval timers"
+)
+def test_timed_out_stage_profiled(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    def stall(*_args: object) -> str:
+        time.sleep(10)
+        return ""
+
+    monkeypatch.setattr("djlint.reformat.indent_html", stall)
+    template = _project(tmp_path)
+    report = tmp_path / "profile.json"
+
+    runner.invoke(
+        djlint,
+        (
+            str(template),
+            "--check",
+            "--file-timeout",
+            "0.2",
+            "--profile-stages",
+            str(report),
+        ),
+    )
+    profile = json.loads(report.read_text(encoding="utf-8"))
+    # the stage the file was stuck in is the slowest
+    assert profile["stages"][0]["name"] == "indent_html"
+    assert "condense_html" not in profile["files"][0]["stages"]
+
+
+def test_threads_share_the_trace(tmp_path: Path) -> None:
+    """A file finishing in one thread leaves the others' numbers alone."""
+    config = Config(
+        str(tmp_path), lint=True, profile_stages=tmp_path / "profile.json"
+    )
+    started = threading.Barrier(2)
+    finished = threading.Event()
+    profiles: dict[str, FileProfile] = {}
+
+    def check(name: str) -> None:
+        profiler = start_profile(config)
+        assert profiler is not None
+        with stage("indent_html"):
+            started.wait(5)
+            if name == "slow":
+                # the quick file finishes while this stage still runs
+                finished.wait(5)
+            else:
+                finished.set()
+        profiles[name] = profiler.finish()
+
+    threads = [
+        threading.Thread(target=check, args=(x,)) for x in ("slow", "quick")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # time is kept, and memory left out rather than read off the other thread
+    for profile in profiles.values():
+        ((seconds, memory),) = profile["stages"].values()
+        assert seconds > 0
+        assert memory is None
+
+    # the main thread traces memory until the run is over
+    profiler = start_profile(config)
+    assert profiler is not None
+    with stage("indent_html"):
+        buffer = bytearray(1 << 20)
+    assert len(buffer) == 1 << 20
+    (_, memory) = profiler.finish()["stages"]["indent_html"]
+    assert memory is not None
+    assert memory >= 1 << 20
+    assert tracemalloc.is_tracing()
+    stop_tracing()
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,44 @@
+"""Test the benchmark corpus and comparator.
+
+uv run pytest tests/test_djlint/test_benchmarks.py
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.corpus import DIALECTS, template
+from benchmarks.suite import compare
+from djlint.reformat import formatter
+from djlint.settings import Config
+
+
+@pytest.mark.parametrize("profile", sorted(DIALECTS))
+def test_corpus(profile: str) -> None:
+    source = template(profile, 20, scripts=1, i18n=1, ignored=1)
+    dialect = DIALECTS[profile]
+    assert source == template(profile, 20, scripts=1, i18n=1, ignored=1)
+    assert source != template(profile, 20, seed=1)
+    for marker in (dialect.if_close, dialect.loop_close, dialect.on):
+        assert marker in source
+
+    # the formatter has work to do
+    config = Config("dummy/source.html", profile=profile)
+    assert formatter(config, source) != source
+
+
+def test_compare() -> None:
+    baseline = {"results": {"django": {"formatter": 100.0, "linter": 100.0}}}
+    current = {
+        "results": {
+            "django": {"formatter": 85.0, "linter": 95.0, "main": 10.0},
+            "jinja": {"formatter": 1.0},
+        }
+    }
+    changes = compare(baseline, current)
+    # only benchmarks measured in both runs are compared
+    assert [(x.profile, x.benchmark) for x in changes] == [
+        ("django", "formatter"),
+        ("django", "linter"),
+    ]
+    assert [x.regressed(0.1) for x in changes] == [True, False]
@@ -0,0 +1,181 @@
+"""Test the daemon answering stdin runs.
+
+run::
+
+    pytest tests/test_djlint/test_daemon.py
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from djlint import daemon as daemon_module, main as djlint
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    from click.testing import CliRunner
+
+pytestmark = pytest.mark.skipif(
+    not daemon_module.supported(), reason="needs unix sockets"
+)
+
+
+@pytest.fixture
+def daemon(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[Path]:
+    """Run a daemon in a thread, where stdin runs will find it."""
+    path = tmp_path / "djlint.sock"
+    monkeypatch.setattr(daemon_module, "default_socket_path", lambda: path)
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=daemon_module.serve, args=(path,), kwargs={"stop": stop}
+    )
+    thread.start()
+    deadline = time.monotonic() + 10
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        yield path
+    finally:
+        stop.set()
+        thread.join()
+
+
+@pytest.fixture
+def requests(monkeypatch: pytest.MonkeyPatch) -> list[object]:
+    """Record the requests the daemon answers."""
+    answered: list[object] = []
+    respond = daemon_module.DaemonState.respond
+
+    def record(
+        self: daemon_module.DaemonState, request: dict[str, object]
+    ) -> dict[str, object]:
+        response = respond(self, request)
+        answered.append(response)
+        return response
+
+    monkeypatch.setattr(daemon_module.DaemonState, "respond", record)
+    return answered
+
+
+@pytest.mark.usefixtures("daemon")
+def test_daemon_matches_local_run(
+    runner: CliRunner, requests: list[object]
+) -> None:
+    args = ("-", "--check", "--indent", "2")
+    source = "<div><p>nice stuff here</p></div>"
+    result = runner.invoke(djlint, args, input=source)
+
+    assert len(requests) == 1
+    assert result.exit_code == 1
+    assert result.stdout == "<div>\n  <p>nice stuff here</p>\n</div>\n"
+
+    # the second run reuses the config
+    result = runner.invoke(djlint, ("-",), input='<img src="a.png">')
+    assert len(requests) == 2
+    assert result.exit_code == 1
+    assert "H013" in result.stdout
+
+
+def test_daemon_reloads_changed_config(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    state = daemon_module.DaemonState()
+    request = {
+        "version": state.version,
+        "cwd": str(tmp_path),
+        "options": {"reformat": True},
+        "stdin": "<div><p>x</p></div>",
+        "color": False,
+        "columns": 80,
+    }
+
+    (tmp_path / "pyproject.toml").write_text("[tool.djlint]\nindent = 2\n")
+    response = state.respond(request)
+    assert response["stdout"] == "<div>\n  <p>x</p>\n</div>\n"
+
+    (tmp_path / "pyproject.toml").write_text("[tool.djlint]\nindent = 3\n")
+    response = state.respond(request)
+    assert response["stdout"] == "<div>\n   <p>x</p>\n</div>\n"
+
+
+def test_daemon_declines_other_versions() -> None:
+    state = daemon_module.DaemonState()
+    assert state.respond({"version": "0.0.0"}) == {"fallback": True}
+
+
+def test_stale_socket_runs_locally(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # a socket file nothing listens on, as a killed daemon leaves behind
+    path = tmp_path / "djlint.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+    monkeypatch.setattr(daemon_module, "default_socket_path", lambda: path)
+
+    result = runner.invoke(djlint, ("-", "--reformat"), input="<div></div>")
+
+    assert result.exit_code == 0
+    assert result.stdout == "<div></div>\n"
+
+
+def test_daemon_replaces_stale_socket(tmp_path: Path) -> None:
+    path = tmp_path / "djlint.sock"
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(path))
+
+    stop = threading.Event()
+    stop.set()
+    daemon_module.serve(path, stop=stop)
+    assert not path.exists()
+
+
+def test_socket_is_private(daemon: Path) -> None:
+    assert daemon.stat().st_mode & 0o777 == 0o600
+    assert os.access(daemon, os.R_OK | os.W_OK)
+
+
+def test_socket_directory_is_per_user(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    path = daemon_module.default_socket_path()
+    assert path.parent.name == f"djlint-{os.getuid()}"
+
+
+def test_untrusted_socket_runs_locally(
+    runner: CliRunner, daemon: Path, requests: list[object]
+) -> None:
+    # anyone could have put a socket in a directory others can write to
+    daemon.parent.chmod(0o777)
+    try:
+        result = runner.invoke(djlint, ("-", "--reformat"), input="<div></div>")
+    finally:
+        daemon.parent.chmod(0o700)
+
+    assert not requests
+    assert result.exit_code == 0
+    assert result.stdout == "<div></div>\n"
+
+
+def test_daemon_refuses_shared_directory(tmp_path: Path) -> None:
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+
+    stop = threading.Event()
+    stop.set()
+    with pytest.raises(RuntimeError, match="writable by nobody else"):
+        daemon_module.serve(shared / "djlint.sock", stop=stop)
+
+
+def test_src_required_without_daemon(runner: CliRunner) -> None:
+    result = runner.invoke(djlint, ())
+    assert result.exit_code == 2
+    assert "Missing argument 'SRC ...'" in result.output
@@ -17,6 +17,7 @@ from __future__ import annotations
 import subprocess
 import sys
 import tempfile
+import threading
 from importlib import metadata
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -26,6 +27,7 @@ from djlint import main as djlint
 from tests.conftest import write_to_file
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from tempfile import _TemporaryFileWrapper
 
     import pytest
@@ -80,6 +82,73 @@ def test_multiple_files(runner: CliRunner) -> None:
     assert "3 files would be updated." in result.output
 
 
+def test_many_files_in_chunks(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # 2 workers and 40 files make chunks of 5, the last one short
+    monkeypatch.setattr(djlint_module, "process_cpu_count", lambda: 2)
+    for index in range(38):
+        (tmp_path / f"{index}.html").write_text("<div></div>\n")
+    (tmp_path / "x.html").write_text("<div><p>x</p></div>")
+    (tmp_path / "y.html").write_text("<div><p>y</p></div>")
+
+    result = runner.invoke(djlint, (str(tmp_path), "--check", "--no-cache"))
+
+    assert result.exit_code == 1
+    assert "Checking 40/40 files" in result.output
+    assert "2 files would be updated." in result.output
+
+
+def test_stream_prints_as_a_finished_run_would(
+    runner: CliRunner, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(djlint_module, "process_cpu_count", lambda: 2)
+    for index in range(12):
+        (tmp_path / f"{index}.html").write_text(f'<img src="{index}.png">')
+    args = (str(tmp_path), "--check", "--lint", "--statistics", "--no-cache")
+
+    result = runner.invoke(djlint, args)
+    streamed = runner.invoke(djlint, (*args, "--stream"))
+
+    assert streamed.exit_code == result.exit_code == 1
+    # the progress bar is left out, as the results show the progress
+    assert "Checking and Linting 12/12 files" not in streamed.output
+    assert streamed.output == result.output.replace(
+        "Checking and Linting 12/12 files\n", ""
+    )
+    assert "H013 12" in streamed.output
+
+
+def test_slow_chunk_does_not_hold_back_others(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Without --stream, the other workers go on past a slow chunk."""
+    monkeypatch.setattr(djlint_module, "process_cpu_count", lambda: 2)
+    monkeypatch.setattr(djlint_module, "_is_free_threaded_python", lambda: True)
+    release = threading.Event()
+
+    def process_chunk(jobs: Sequence[tuple[int, Path]]) -> list[Path]:
+        # the first chunk waits until every other chunk has come back
+        if jobs[0][1].name == "0.html" and not release.wait(10):
+            msg = "the run waited on the slow chunk"
+            raise AssertionError(msg)
+        return [this_file for _, this_file in jobs]
+
+    monkeypatch.setattr(djlint_module, "_process_chunk", process_chunk)
+    # 1,000 files make 16 chunks, more than the 8 --stream queues at once
+    jobs = [(0, Path(f"{index}.html")) for index in range(1000)]
+    chunks = djlint_module._process_files(  # noqa: SLF001
+        (), jobs, (None,), ordered=False
+    )
+
+    found: list[str] = []
+    for chunk in chunks:
+        found.extend(map(str, chunk))
+        if len(found) == 1000 - 64:
+            release.set()
+    assert sorted(found) == sorted(str(x) for _, x in jobs)
+
+
 def test_bad_path(runner: CliRunner) -> None:
     result = runner.invoke(djlint, ("tests/nowhere",))
     assert result.exit_code == 2
@@ -0,0 +1,219 @@
+"""Test the protected regions kept per document.
+
+uv run pytest tests/test_djlint/test_document_spans.py
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+
+import pytest
+import regex as re
+
+from djlint.helpers import (
+    MAY_BE_SAFE_CLOSING_TAG,
+    MAY_CLOSE_IGNORED_BLOCK,
+    MAY_CLOSE_SCRIPT_STYLE,
+    MAY_OPEN_IGNORED_BLOCK,
+    MAY_OPEN_SCRIPT_STYLE,
+    IntervalIndex,
+    document_spans,
+    inside_ignored_block,
+    inside_protected_trans_block,
+    is_ignored_block_closing,
+    is_ignored_block_opening,
+    is_safe_closing_tag,
+    is_script_style_block_closing,
+    is_script_style_block_opening,
+    line_features,
+    overlaps_ignored_block,
+)
+from djlint.settings import Config
+
+
+class _Span:
+    def __init__(self, start: int, end: int) -> None:
+        self._span = (start, end)
+
+    def span(self) -> tuple[int, int]:
+        return self._span
+
+
+def test_spans_found_once_per_document() -> None:
+    config = Config("dummy/source.html")
+    html = "<div><script>\n<p>x</p>\n</script></div>"
+    p_tag = _Span(html.index("<p>"), html.index("<p>") + 3)
+    closing_tag = _Span(html.index("</script>"), html.index("</script>") + 9)
+
+    spans = document_spans(html)
+    # the formatter's blocks stop short of the closing tag, the linter's do not
+    assert inside_ignored_block(config, html, p_tag)
+    assert not inside_ignored_block(config, html, closing_tag)
+    assert overlaps_ignored_block(config, html, closing_tag)
+    assert document_spans(html) is spans
+    assert document_spans(html[:-1]) is not spans
+
+    # an equal copy is not compared with the document, but scanned again
+    copy = html[:1] + html[1:]
+    assert copy == html
+    assert document_spans(copy) is not spans
+
+
+def test_spans_kept_per_thread() -> None:
+    documents = {"a": "<pre>a</pre>", "b": "<p>b</p>"}
+    barrier = threading.Barrier(len(documents))
+    found = {}
+
+    def check(name: str) -> None:
+        spans = document_spans(documents[name])
+        barrier.wait()
+        # the other thread asking about its document did not evict this one
+        found[name] = document_spans(documents[name]) is spans
+
+    threads = [threading.Thread(target=check, args=(x,)) for x in documents]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert found == {"a": True, "b": True}
+
+
+@pytest.mark.parametrize(
+    "spans",
+    [
+        pytest.param([], id="empty"),
+        pytest.param([(2, 5), (8, 12)], id="apart"),
+        pytest.param([(0, 20), (3, 6), (4, 5)], id="nested"),
+        pytest.param([(1, 7), (5, 10), (5, 5)], id="overlapping"),
+    ],
+)
+def test_interval_index(spans: list[tuple[int, int]]) -> None:
+    index = IntervalIndex(spans)
+    for start, end in itertools.combinations_with_replacement(range(22), 2):
+        assert index.covers(start, end) == any(
+            x <= start and end <= y for x, y in spans
+        )
+        assert index.encloses(start, end) == any(
+            x < start and end <= y for x, y in spans
+        )
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        pytest.param(
+            "{% blocktrans %}\na\n{% endblocktrans %}\n"
+            "{% blocktrans trimmed %}\nb\n{% endblocktrans %}\n",
+            id="closed",
+        ),
+        pytest.param(
+            "{% blocktrans %}a{% endblocktrans %}{% blocktrans %}\n"
+            "b {% endblocktrans %}\n",
+            id="inline",
+        ),
+        pytest.param(
+            "{% blocktranslate trimmed %}{% blocktrans %}\n"
+            "a{% endblocktrans %}\n{% endblocktranslate %}",
+            id="left open",
+        ),
+    ],
+)
+def test_trans_blocks_up_to_match(html: str) -> None:
+    config = Config("dummy/source.html", profile="django")
+    for match in re.finditer(r"^[ \t]*(.*?)([\n \t]*)$", html, flags=re.M):
+        # looking up the blocks ending by the match agrees with scanning the
+        # html cut off after it
+        assert inside_protected_trans_block(
+            config, html, match
+        ) == inside_protected_trans_block(config, html[: match.end()], match)
+
+
+def test_unformatted_blocks() -> None:
+    config = Config("dummy/source.html")
+    html = "{# <p> #}<div>\n{# djlint:off #}<p  >{# djlint:on #}</div>"
+    spans = document_spans(html)
+    assert spans.unformatted_block_spans(config) == (
+        (0, 9),
+        (html.index("{# djlint:off"), html.index("{# djlint:on")),
+    )
+
+    # comments only count once something is turned off
+    assert (
+        not document_spans("{# <p> #}").unformatted_blocks(config).covers(1, 2)
+    )
+    assert spans.unformatted_blocks(config).covers(1, 2)
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        pytest.param("", id="empty"),
+        pytest.param("<div><p>x</p></div>", id="no blocks"),
+        pytest.param(
+            "<!-- djlint:off -->\n<p  >\n<!-- djlint:on -->{# a #}<p>",
+            id="html",
+        ),
+        pytest.param(
+            "{# djlint:off #}<p  >{# djlint:on #}{{ x }}{# b #}", id="django"
+        ),
+        pytest.param(
+            "{% comment %} djlint:off {% endcomment %}<p  >"
+            "{% comment %} djlint:on {% endcomment %}",
+            id="comment tag",
+        ),
+        pytest.param(
+            "{{!-- djlint:off --}}<p  >{{!-- djlint:on --}}", id="hbs"
+        ),
+        pytest.param(
+            "{{/* djlint:off */}}<p  >{{/* djlint:on */}}", id="golang"
+        ),
+        pytest.param("---\ntitle: x\n---\n<p>", id="front matter"),
+        pytest.param("{{# x #}}{# djlint:off #}", id="left open"),
+    ],
+)
+def test_unformatted_blocks_pattern(html: str) -> None:
+    """The pattern finds the blocks the one it replaced did, and no gaps.
+
+    It used to open with an empty alternative, which matched an empty
+    string at every position where no block starts.
+    """
+    pattern = Config("dummy/source.html").unformatted_blocks_pattern
+    with_empty = re.compile("|" + pattern.pattern, pattern.flags)
+
+    spans = [x.span() for x in pattern.finditer(html)]
+    assert all(end > start for start, end in spans)
+    assert spans == [
+        x.span() for x in with_empty.finditer(html) if x.end() > x.start()
+    ]
+
+
+def test_line_features() -> None:
+    config = Config("dummy/source.html")
+    lines = [
+        '<div class="{{ x }}">',
+        "<SCRIPT>",
+        "</script>",
+        "<pre>a</pre>",
+        "{% blocktrans %}",
+        "{%- endschema -%}",
+        "{# djlint:on #}",
+        "{{- /* djlint:off */ -}}",
+        "x #} y",
+        "",
+    ]
+    checks = (
+        (is_ignored_block_opening, MAY_OPEN_IGNORED_BLOCK),
+        (is_ignored_block_closing, MAY_CLOSE_IGNORED_BLOCK),
+        (is_script_style_block_opening, MAY_OPEN_SCRIPT_STYLE),
+        (is_script_style_block_closing, MAY_CLOSE_SCRIPT_STYLE),
+        (is_safe_closing_tag, MAY_BE_SAFE_CLOSING_TAG),
+    )
+    features = line_features("\n".join(lines))
+    assert len(features) == len(lines)
+    assert features[0] == features[-1] == 0
+    for line, line_bits in zip(lines, features, strict=True):
+        for check, bit in checks:
+            # a line without the bit fails the check
+            assert line_bits & bit or not check(config, line), line
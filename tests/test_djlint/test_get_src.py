@@ -0,0 +1,126 @@
+"""Test how files are found under the directories given.
+
+uv run pytest tests/test_djlint/test_get_src.py
+"""
+
+from __future__ import annotations
+
+import os
+from typing import TYPE_CHECKING
+
+from djlint.settings import Config
+from djlint.src import get_src
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+    import pytest
+
+
+def _tree(root: Path, *names: str) -> None:
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("<div></div>\n", encoding="utf-8")
+
+
+def _found(root: Path, config: Config) -> set[str]:
+    return {
+        x.relative_to(root).as_posix() for x in get_src([root], config).paths
+    }
+
+
+def test_pruned_directories_are_not_read(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    _tree(
+        tmp_path,
+        "templates/index.html",
+        "node_modules/pkg/docs/index.html",
+        "build/page.html",
+        "generated/page.html",
+    )
+    (tmp_path / ".git").mkdir()
+    (tmp_path / ".gitignore").write_text("build/\n", encoding="utf-8")
+
+    read = []
+    scandir = os.scandir
+
+    def spy(path: str) -> Iterator[os.DirEntry[str]]:
+        read.append(os.path.relpath(path, tmp_path))
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", spy)
+    config = Config(
+        str(tmp_path), use_gitignore=True, extend_exclude="generated"
+    )
+    assert _found(tmp_path, config) == {"templates/index.html"}
+    assert sorted(read) == [".", "templates"]
+
+
+def test_excluded_when_only_pruned_directories_match(tmp_path: Path) -> None:
+    _tree(tmp_path, "node_modules/pkg/index.html", "static/app.js")
+
+    found = get_src([tmp_path], Config(str(tmp_path)))
+    assert not found.paths
+    assert found.excluded
+
+    found = get_src([tmp_path / "static"], Config(str(tmp_path)))
+    assert not found.paths
+    assert not found.excluded
+
+
+def test_wide_tree(tmp_path: Path) -> None:
+    names = {f"app_{x}/templates/page_{x}.html" for x in range(100)}
+    _tree(tmp_path, *names, "app_1/templates/page.txt")
+
+    # levels this wide are read by threads
+    assert _found(tmp_path, Config(str(tmp_path))) == names
+
+
+def test_extension_glob(tmp_path: Path) -> None:
+    _tree(tmp_path, "a.html", "b.htm", "c.txt", "d.html.txt", ".html")
+
+    # as Path.glob("**/*.htm*") found them
+    assert _found(tmp_path, Config(str(tmp_path), extension="htm*")) == {
+        "a.html",
+        "b.htm",
+        "d.html.txt",
+        ".html",
+    }
+    assert _found(tmp_path, Config(str(tmp_path), extension=".html")) == {
+        "a.html",
+        ".html",
+    }
+
+
+def test_symlinks(tmp_path: Path) -> None:
+    _tree(tmp_path, "project/templates/a.html", "elsewhere/b.html")
+    project = tmp_path / "project"
+    (project / "linked").symlink_to(tmp_path / "elsewhere")
+    (project / "c.html").symlink_to(tmp_path / "elsewhere" / "b.html")
+    (project / "broken.html").symlink_to(tmp_path / "missing.html")
+    # a directory named like a template is walked, not checked
+    (project / "d.html").mkdir()
+
+    # linked files are checked, linked directories not walked
+    assert _found(project, Config(str(project))) == {
+        "templates/a.html",
+        "c.html",
+    }
+
+
+def test_exclude_looking_past_a_directory(tmp_path: Path) -> None:
+    _tree(tmp_path, "foo/keep.html", "foo/drop.html", "bar/page.html")
+
+    # "foo/" matches, but not every path under it does
+    config = Config(str(tmp_path), exclude="foo/(?!keep)")
+    assert _found(tmp_path, config) == {"foo/keep.html", "bar/page.html"}
+
+    config = Config(str(tmp_path), exclude="foo/$")
+    assert _found(tmp_path, config) == {
+        "foo/keep.html",
+        "foo/drop.html",
+        "bar/page.html",
+    }
@@ -0,0 +1,138 @@
+"""Test --changed-since and --staged.
+
+run::
+
+    pytest tests/test_djlint/test_git_changed.py
+"""
+
+from __future__ import annotations
+
+import shutil
+import subprocess
+from typing import TYPE_CHECKING
+
+import pytest
+
+from djlint import main as djlint
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from click.testing import CliRunner
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="needs git")
+
+BAD = "<div><p>x</p>   </div>"
+
+
+def git(root: Path, *args: str) -> None:
+    subprocess.run(  # noqa: S603
+        ("git", "-C", str(root), *args),  # noqa: S607
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def repo(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """A repository with one committed template, run from inside it."""
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "djlint@example.com")
+    git(tmp_path, "config", "user.name", "djLint")
+    templates = tmp_path / "templates"
+    templates.mkdir()
+    (templates / "old.html").write_text(BAD, encoding="utf-8")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "initial")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_changed_since(runner: CliRunner, repo: Path) -> None:
+    result = runner.invoke(
+        djlint, (".", "--check", "--changed-since", "HEAD", "--no-cache")
+    )
+    assert result.exit_code == 0
+    assert "No files to check!" in result.stderr
+
+    (repo / "templates" / "new.html").write_text(BAD, encoding="utf-8")
+    (repo / "templates" / "new.txt").write_text(BAD, encoding="utf-8")
+    result = runner.invoke(
+        djlint, (".", "--check", "--changed-since", "HEAD", "--no-cache")
+    )
+    assert result.exit_code == 1
+    assert "new.html" in result.output
+    assert "old.html" not in result.output
+    assert "1 file would be updated." in result.output
+
+    # explicit files are filtered too
+    result = runner.invoke(
+        djlint,
+        (
+            "templates/old.html",
+            "--check",
+            "--changed-since",
+            "HEAD",
+            "--no-cache",
+        ),
+    )
+    assert result.exit_code == 0
+
+
+def test_changed_since_honors_exclude(runner: CliRunner, repo: Path) -> None:
+    (repo / "templates" / "new.html").write_text(BAD, encoding="utf-8")
+    result = runner.invoke(
+        djlint,
+        (
+            ".",
+            "--check",
+            "--changed-since",
+            "HEAD",
+            "--extend-exclude",
+            "templates",
+            "--no-cache",
+        ),
+    )
+    assert result.exit_code == 0
+    assert "skipped by the configuration" in result.stderr
+
+
+def test_staged(runner: CliRunner, repo: Path) -> None:
+    (repo / "templates" / "old.html").write_text(
+        BAD + "<p></p>", encoding="utf-8"
+    )
+    (repo / "templates" / "new.html").write_text(BAD, encoding="utf-8")
+    git(repo, "add", "templates/new.html")
+
+    result = runner.invoke(djlint, (".", "--check", "--staged", "--no-cache"))
+    assert result.exit_code == 1
+    assert "new.html" in result.output
+    assert "old.html" not in result.output
+
+
+@pytest.mark.usefixtures("repo")
+def test_bad_ref(runner: CliRunner) -> None:
+    result = runner.invoke(
+        djlint, (".", "--changed-since", "no-such-ref", "--no-cache")
+    )
+    assert result.exit_code == 2
+    assert "git diff failed" in result.output
+
+
+@pytest.mark.parametrize("option", ["--changed-since=HEAD", "--staged"])
+def test_relative_diff_config(
+    runner: CliRunner, repo: Path, monkeypatch: pytest.MonkeyPatch, option: str
+) -> None:
+    """Changed files are found when git diff prints paths from the cwd."""
+    git(repo, "config", "diff.relative", "true")
+    # a project below the toplevel, where git is run from
+    (repo / "templates" / "pyproject.toml").write_text(
+        "[tool]\n[tool.djlint]\n", encoding="utf-8"
+    )
+    (repo / "templates" / "new.html").write_text(BAD, encoding="utf-8")
+    git(repo, "add", "templates/new.html")
+    monkeypatch.chdir(repo / "templates")
+
+    result = runner.invoke(djlint, (".", "--check", option, "--no-cache"))
+    assert result.exit_code == 1
+    assert "new.html" in result.output
@@ -0,0 +1,74 @@
+"""Test what a stdin run imports and compiles before it reads the template.
+
+Editors format on save by piping the buffer through ``djlint -``, so each
+save starts python afresh. ``python -X importtime`` lists every module a run
+imported; these budgets keep the ones a run does not need out of it. The
+time itself is measured by the stdin benchmark, see benchmarks/README.md.
+
+uv run pytest tests/test_djlint/test_startup.py
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from typing import TYPE_CHECKING
+
+import pytest
+
+from djlint import settings
+from djlint.settings import Config
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# never needed to format or lint stdin, unless the config asks for them
+DEFERRED = frozenset({"asyncio", "json5", "pathspec", "tracemalloc", "yaml"})
+
+
+def _imports(tmp_path: Path, *args: str) -> set[str]:
+    """Modules imported by a stdin run, from python -X importtime."""
+    result = subprocess.run(  # noqa: S603
+        (sys.executable, "-X", "importtime", "-m", "djlint", "-", *args),
+        input="<div><p>text</p></div>\n",
+        capture_output=True,
+        check=False,
+        cwd=tmp_path,
+        # keep a running daemon from answering
+        env={**os.environ, "XDG_RUNTIME_DIR": str(tmp_path)},
+        text=True,
+    )
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "|" in line
+    }
+
+
+@pytest.mark.parametrize(
+    ("args", "used", "unused"),
+    [
+        pytest.param(
+            ("--reformat",), "djlint.reformat", "djlint.lint", id="reformat"
+        ),
+        pytest.param(("--lint",), "djlint.lint", "djlint.reformat", id="lint"),
+    ],
+)
+def test_stdin_imports(
+    tmp_path: Path, args: tuple[str, ...], used: str, unused: str
+) -> None:
+    imported = _imports(tmp_path, *args, "--no-cache")
+    assert used in imported
+    assert not (DEFERRED | {unused}) & imported
+
+
+def test_patterns_compiled_on_first_use() -> None:
+    settings._compiled.cache_clear()  # noqa: SLF001
+    config = Config("-", profile="tera")
+    assert settings._compiled.cache_info().currsize == 0  # noqa: SLF001
+
+    assert config.ignored_blocks_pattern is config.ignored_blocks_pattern
+    # the profile's own version, not the shared one
+    assert "component" in config.optional_single_line_template_pattern.pattern
+    assert settings._compiled.cache_info().currsize == 2  # noqa: SLF001
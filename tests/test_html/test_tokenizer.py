@@ -5,7 +5,13 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from djlint.formatter.compress import compress_html
-from djlint.formatter.tokenizer import tokenize_tags
+from djlint.formatter.tokenizer import (
+    CLOSING,
+    DECLARATION,
+    SELF_CLOSING,
+    TagTable,
+    tokenize_tags,
+)
 from djlint.reformat import formatter
 
 if TYPE_CHECKING:
@@ -40,6 +46,31 @@ def test_tokenize_tags_preserves_source_positions() -> None:
     )
 
 
+def test_tag_table_columns_match_tokens() -> None:
+    source = "<p><br/><!DOCTYPE html></P><img src=x />"
+    table = TagTable(source)
+
+    assert table.names == ["p", "br", "DOCTYPE", "P", "img"]
+    assert list(table.flags) == [
+        0,
+        SELF_CLOSING,
+        DECLARATION,
+        CLOSING,
+        SELF_CLOSING,
+    ]
+    assert [table[x].span() for x in range(len(table))] == [
+        (0, 3),
+        (3, 8),
+        (8, 23),
+        (23, 27),
+        (27, 40),
+    ]
+    # iterating builds the tokens once
+    assert table[1].self_closing
+    assert tuple(table) == table.tokens()
+    assert table[4] is table.tokens()[4]
+
+
 def test_template_comment_text_does_not_change_tokenization() -> None:
     source = "<script>{#</script><div></div>"
 
@@ -0,0 +1,74 @@
+"""Test that rules.json matches rules.yaml, and how rules are loaded.
+
+rules.json is what djLint loads; rules.yaml is what is edited. After
+changing rules.yaml, regenerate rules.json with::
+
+   uv run python -m scripts.generate_rules
+
+run::
+
+   pytest tests/test_linter/test_builtin_rules.py
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from djlint import settings
+from djlint.settings import Config, load_builtin_rules, validate_rules
+from scripts.generate_rules import generate
+
+if TYPE_CHECKING:
+    import pytest
+
+
+def test_rules_json_is_current() -> None:
+    rules_json = Path(settings.__file__).parent / "rules.json"
+    assert rules_json.read_text(encoding="utf-8") == generate(), (
+        "rules.json is out of date, run python -m scripts.generate_rules"
+    )
+
+
+def test_builtin_rules_are_valid(capsys: pytest.CaptureFixture[str]) -> None:
+    rules = load_builtin_rules()
+    assert tuple(validate_rules(rules)) == rules
+    assert not capsys.readouterr().err
+
+
+def test_rules_load_on_first_use(tmp_path: Path) -> None:
+    config = Config(str(tmp_path / "a.html"), ignore="H005")
+    assert config._linter_rules is None  # noqa: SLF001
+
+    names = {x["rule"]["name"] for x in config.linter_rules}
+    assert "H007" in names
+    assert "H005" not in names
+    assert config.linter_rules is config.linter_rules
+
+
+def test_custom_rules_parsed_once(tmp_path: Path) -> None:
+    rules = tmp_path / ".djlint_rules.yaml"
+    rules.write_text(
+        "- rule:\n    name: C901\n    message: One\n    patterns:\n    - one\n",
+        encoding="utf-8",
+    )
+
+    def names() -> set[str]:
+        config = Config(str(tmp_path / "a.html"), profile="django", rules=rules)
+        return {x["rule"]["name"] for x in config.linter_rules}
+
+    settings._parse_rules_file.cache_clear()  # noqa: SLF001
+    assert "C901" in names()
+    assert "C901" in names()
+    assert settings._parse_rules_file.cache_info().misses == 1  # noqa: SLF001
+
+    # an edit is picked up
+    rules.write_text(
+        "- rule:\n    name: C902\n    message: Two\n    patterns:\n    - two\n",
+        encoding="utf-8",
+    )
+    stat = rules.stat()
+    os.utime(rules, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert "C902" in names()
+    assert "C901" not in names()
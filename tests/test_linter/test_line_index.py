@@ -0,0 +1,61 @@
+"""Test finding the line of an offset.
+
+uv run pytest tests/test_linter/test_line_index.py
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from djlint.lint import LineIndex, get_line
+
+
+@pytest.mark.parametrize(
+    ("html", "lines"),
+    [
+        pytest.param("", [], id="empty"),
+        pytest.param("a", [(0, 1)], id="one line"),
+        pytest.param("a\n", [(0, 2)], id="final newline"),
+        pytest.param("a\n\nbc", [(0, 2), (2, 3), (3, 5)], id="blank line"),
+        pytest.param("\n\n", [(0, 1), (1, 2)], id="only newlines"),
+    ],
+)
+def test_reads_as_line_dicts(html: str, lines: list[tuple[int, int]]) -> None:
+    line_ends = LineIndex(html)
+    assert list(line_ends) == [{"start": s, "end": e} for s, e in lines]
+    assert len(line_ends) == len(lines)
+    if lines:
+        assert line_ends[-1] == {"start": lines[-1][0], "end": lines[-1][1]}
+
+
+def test_get_line() -> None:
+    html = "<div>\n  <p>\n\n</div>"
+    line_ends = LineIndex(html)
+    assert get_line(0, line_ends) == "1:0"
+    assert get_line(html.index("<p>"), line_ends) == "2:2"
+    assert get_line(html.index("</div>"), line_ends) == "4:0"
+
+    # rules written for older versions build their own list of dicts
+    assert get_line(html.index("<p>"), list(line_ends)) == "2:2"
+
+
+def test_list_idioms() -> None:
+    """Rules that copied the old get_line() index and slice line_ends."""
+    html = "a\nbc\n\nd"
+    line_ends = LineIndex(html)
+    lines = list(line_ends)
+
+    assert line_ends[1:3] == lines[1:3]
+    assert line_ends[::-1] == lines[::-1]
+    assert line_ends[:10] == lines
+    for number, line in enumerate(lines):
+        assert line_ends.index(line) == number
+    assert lines[2] in line_ends
+
+    line = next(x for x in line_ends if x["end"] > html.index("d"))
+    assert line_ends.index(line) == 3
+
+    with pytest.raises(ValueError, match="not in the lines"):
+        line_ends.index({"start": 1, "end": 2})
+    with pytest.raises(ValueError, match="not in the lines"):
+        line_ends.index(lines[0], 1)
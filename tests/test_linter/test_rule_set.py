@@ -0,0 +1,111 @@
+"""Test the compiled linter rule set.
+
+uv run pytest tests/test_linter/test_rule_set.py
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+import regex as re
+
+from djlint.lint import (
+    RulePattern,
+    _unique_errors,  # noqa: PLC2701
+    compile_rules,
+    document_tag_names,
+)
+from djlint.settings import Config
+
+if TYPE_CHECKING:
+    from typing_extensions import Any
+
+    from djlint.types import LintError
+
+
+@pytest.mark.parametrize(
+    ("source", "flags", "literals", "tag_names"),
+    [
+        pytest.param("<form[^>]*", re.S, ("<form",), (), id="tag"),
+        pytest.param(r"<img\b", re.I, (), ("img",), id="tag ignore case"),
+        pytest.param("<(?:a|div)\\s", re.S, ("<a", "<div"), (), id="tag group"),
+        pytest.param("<(meta)>", re.I, (), ("meta",), id="capturing group"),
+        pytest.param("<imgs?", re.S, ("<img",), (), id="optional letter"),
+        pytest.param("{%-?[ ]*", re.S, ("{%",), (), id="optional dash"),
+        pytest.param("</h\\d?>", re.S, ("</h",), (), id="escape"),
+        pytest.param("{{2,}", re.S, (), (), id="quantified brace"),
+        pytest.param("&amp;", re.I, (), (), id="letters ignore case"),
+        pytest.param("<img|<br", re.S, (), (), id="alternation"),
+        pytest.param("(<img|<br)", re.S, (), (), id="group"),
+        pytest.param("[<|]img", re.S, (), (), id="class"),
+        pytest.param("<img", re.X, (), (), id="verbose"),
+        pytest.param("(?i)<img", re.S, (), (), id="inline flags"),
+        pytest.param("(?<=<)img", re.S, (), (), id="lookbehind"),
+    ],
+)
+def test_pattern_prefix(
+    source: str,
+    flags: int,
+    literals: tuple[str, ...],
+    tag_names: tuple[str, ...],
+) -> None:
+    pattern = RulePattern.build(source, flags)
+    assert pattern.literals == literals
+    assert pattern.tag_names == tag_names
+
+
+DOCUMENTS = (
+    "",
+    "plain text",
+    '<IMG SRC="a.png">',
+    "<div><form action='x'></form></div>",
+    "<html lang='en'><meta name=x><br></html>",
+    "{% if x %}&nbsp;{{ y  }}{% endif %}",
+    "<İmg alt=x>",
+    "</h1><p>\n\n\n</p>",
+)
+
+
+@pytest.mark.parametrize("html", DOCUMENTS)
+def test_skipped_patterns_cannot_match(html: str) -> None:
+    config = Config("dummy/source.html", profile="all", include="H017,H035")
+    tag_names = document_tag_names(html)
+    for rule in compile_rules(config).rules:
+        for pattern in rule.patterns:
+            if not pattern.may_match(html, tag_names):
+                assert pattern.pattern.search(html) is None, rule.name
+
+
+def test_rules_compiled_once() -> None:
+    config = Config("dummy/source.html", profile="all")
+    rule_set = compile_rules(config)
+    assert compile_rules(config) is rule_set
+
+    # the django and jinja versions of a rule share their patterns
+    rules = {rule.name: rule for rule in rule_set.rules}
+    assert rules["D018"].patterns == rules["J018"].patterns
+
+
+def test_non_ascii_tag_names_are_not_gated() -> None:
+    assert document_tag_names("<div><IMG>") == frozenset(("div", "img"))
+    assert document_tag_names("<İmg>") is None
+
+
+def test_duplicate_errors_removed_in_order() -> None:
+    first: LintError = {
+        "code": "H006",
+        "line": "1:0",
+        "match": "<img",
+        "message": "a",
+    }
+    second: LintError = {**first, "line": "2:0"}
+    copy: LintError = {**first}
+    assert _unique_errors([first, second, copy, second]) == [first, second]
+
+    # a python_module rule may return values that cannot be hashed
+    unhashable: Any = {**first, "match": ["<img"]}
+    assert _unique_errors([unhashable, first, unhashable]) == [
+        unhashable,
+        first,
+    ]